@@ -0,0 +1,155 @@
+"""
+Compare the page-ready time and the bytes transferred by the scraping browsing profiles
+
+The job posting fixtures in benchmarks/fixtures are served from a local HTTP server that
+synthesizes the images, fonts, videos and tracker scripts they reference (with some latency, to
+mimic a real site), and the tracker domains are resolved to that server too, so the benchmark
+doesn't touch the network.
+
+Usage:
+    python benchmarks/browsing_profile_benchmark.py [--runs 5]
+"""
+import argparse
+from dataclasses import replace
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import statistics
+import threading
+import time
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from auto_cv.tools.browsing_profile import FULL_PROFILE, LIGHTWEIGHT_PROFILE, BrowsingProfile
+
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+# Size in bytes of the synthesized assets, by extension
+ASSET_SIZES = {
+    ".jpg": 250_000,
+    ".png": 40_000,
+    ".webp": 120_000,
+    ".woff2": 60_000,
+    ".mp4": 2_000_000,
+    ".js": 80_000,
+}
+
+# Simulated latency of each asset
+ASSET_DELAY_SECONDS = 0.15
+
+# Element whose presence means the job posting is ready to be extracted
+READY_MARKER = (By.ID, "job-details")
+
+
+class FixtureRequestHandler(SimpleHTTPRequestHandler):
+    """
+    Serves the fixtures, synthesizes the assets they reference and counts the bytes sent
+    """
+    
+    bytes_sent = 0
+    lock = threading.Lock()
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory=str(FIXTURES_DIR), **kwargs)
+    
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        is_script = path.endswith(".js") or path.startswith(("/gtag/", "/li.lms-analytics/"))
+        size = ASSET_SIZES[".js"] if is_script else next((size for extension, size in ASSET_SIZES.items() if path.endswith(extension)), None)
+        if size is None:
+            return super().do_GET()
+        
+        time.sleep(ASSET_DELAY_SECONDS)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/javascript" if is_script else "application/octet-stream")
+        self.send_header("Content-Length", str(size))
+        self.end_headers()
+        body = b"//" + b" " * (size - 2) if is_script else b"\0" * size
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The browser gave up on the asset (e.g. it navigated away)
+            return
+        self._count(size)
+    
+    def copyfile(self, source, outputfile):
+        data = source.read()
+        outputfile.write(data)
+        self._count(len(data))
+    
+    @classmethod
+    def _count(cls, size: int):
+        with cls.lock:
+            cls.bytes_sent += size
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def measure(profile: BrowsingProfile, base_url: str, port: int, runs: int) -> dict[str, float]:
+    """
+    Load each fixture several times with a profile
+    
+    Args:
+        profile (BrowsingProfile): Profile to benchmark
+        base_url (str): URL of the fixtures server
+        port (int): Port of the fixtures server, where the tracker domains are resolved
+        runs (int): Times each fixture is loaded
+    
+    Returns:
+        dict: Median and p90 page-ready time in ms, and mean KB transferred per page
+    """
+    host_rules = ",".join(f"MAP {domain} 127.0.0.1:{port},MAP *.{domain} 127.0.0.1:{port}"
+                          for domain in ("googletagmanager.com", "licdn.com"))
+    profile = replace(profile, chrome_arguments=profile.chrome_arguments + (f"--host-resolver-rules={host_rules}",))
+    driver = profile.create_driver()
+    ready_times, transferred = [], []
+    try:
+        for fixture in sorted(FIXTURES_DIR.glob("*.html")):
+            for _ in range(runs):
+                # Fresh cache each run, so both profiles download what they don't block
+                driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+                FixtureRequestHandler.bytes_sent = 0
+                start = time.perf_counter()
+                driver.get(f"{base_url}/{fixture.name}")
+                WebDriverWait(driver, 30).until(EC.presence_of_element_located(READY_MARKER))
+                ready_times.append(time.perf_counter() - start)
+                # Leave the page, so the assets still loading are cancelled before counting
+                driver.get("about:blank")
+                transferred.append(FixtureRequestHandler.bytes_sent)
+    finally:
+        driver.quit()
+    
+    return {
+        "ready_p50_ms": statistics.median(ready_times) * 1000,
+        "ready_p90_ms": statistics.quantiles(ready_times, n=10)[-1] * 1000 if len(ready_times) > 1 else ready_times[0] * 1000,
+        "kb_per_page": statistics.mean(transferred) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Times each fixture is loaded with each profile")
+    args = parser.parse_args()
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureRequestHandler)
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        results = {profile.name: measure(profile, f"http://127.0.0.1:{port}", port, args.runs)
+                   for profile in (FULL_PROFILE, LIGHTWEIGHT_PROFILE)}
+    finally:
+        server.shutdown()
+    
+    print(f"{'profile':<14}{'ready p50 (ms)':>16}{'ready p90 (ms)':>16}{'KB per page':>14}")
+    for name, result in results.items():
+        print(f"{name:<14}{result['ready_p50_ms']:>16.1f}{result['ready_p90_ms']:>16.1f}{result['kb_per_page']:>14.1f}")
+    full, lightweight = results[FULL_PROFILE.name], results[LIGHTWEIGHT_PROFILE.name]
+    print(f"\n{LIGHTWEIGHT_PROFILE.name} profile: {full['ready_p50_ms'] / lightweight['ready_p50_ms']:.1f}x faster to ready, "
+          f"{100 * (1 - lightweight['kb_per_page'] / full['kb_per_page']):.0f}% fewer bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Check and time the plain-HTTP fast path for LinkedIn job postings
+
+The saved guest job postings in benchmarks/fixtures/linkedin_guest (<job id>.html) are served by a
+local HTTP server at the path of LinkedIn's guest endpoint. Each one is fetched through the shared
+HTTP session and parsed as the scraper does, checking the URL shapes we get resolve to the right
+job and that the parsed fields match the expected ones. The extractor is also run against the
+server, checking it takes the guest path, falls back to the browser when the guest page has no
+posting, and backs off LinkedIn without opening the browser when the guest page is blocked.
+
+Usage:
+    python benchmarks/linkedin_guest_benchmark.py [--runs 50]
+"""
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import os
+from pathlib import Path
+import statistics
+import tempfile
+import threading
+import time
+
+from auto_cv.cache import NegativeCache, UrlCanonicalizer, create_cache
+from auto_cv.tools.http_session import create_session
+from auto_cv.tools.linkedin_guest import linkedin_job_id, parse_linkedin_guest_job_posting
+
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "linkedin_guest"
+
+# URL shapes pointing to each fixture
+JOB_URLS = {
+    "4070067137": [
+        "https://www.linkedin.com/jobs/view/4070067137/",
+        "https://www.linkedin.com/jobs/view/senior-machine-learning-engineer-at-example-corp-4070067137?trk=public_jobs",
+        "https://www.linkedin.com/jobs/collections/recommended/?currentJobId=4070067137",
+        "https://www.linkedin.com/jobs/search/?currentJobId=4070067137&keywords=machine%20learning",
+    ],
+}
+
+# Fields expected from each fixture (the description is checked by its start)
+EXPECTED_FIELDS = {
+    "4070067137": {
+        "title": "Senior Machine Learning Engineer",
+        "company": "Example Corp",
+        "raw_description": "About the job",
+    },
+}
+
+GUEST_PATH = "/jobs-guest/jobs/api/jobPosting/"
+
+# Jobs without a fixture: the first one is answered with a 404, the second one with LinkedIn's 999
+MISSING_JOB_ID = "4000000404"
+BLOCKED_JOB_ID = "4000000999"
+
+
+class GuestJobRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves the saved guest job postings at the path of LinkedIn's guest endpoint
+    """
+    
+    def do_GET(self):
+        if self.path == f"{GUEST_PATH}{BLOCKED_JOB_ID}":
+            self.send_response(999)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        fixture = FIXTURES_DIR / f"{self.path.removeprefix(GUEST_PATH)}.html"
+        if not self.path.startswith(GUEST_PATH) or not fixture.is_file():
+            self.send_error(404)
+            return
+        body = fixture.read_bytes()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def check(guest_url: str) -> list[str]:
+    """
+    Check the job id resolution and the parsing of every fixture
+    
+    Args:
+        guest_url (str): Guest endpoint URL template of the local server
+    
+    Returns:
+        list[str]: Problems found (empty if everything matched)
+    """
+    problems = []
+    session = create_session()
+    for job_id, urls in JOB_URLS.items():
+        problems += [f"{url} resolved to job {linkedin_job_id(url)}" for url in urls if linkedin_job_id(url) != job_id]
+        fields = parse_linkedin_guest_job_posting(session.get(guest_url.format(job_id=job_id), timeout=10).text) or {}
+        for name, expected in EXPECTED_FIELDS[job_id].items():
+            if not fields.get(name, "").startswith(expected):
+                problems.append(f"Job {job_id} {name}: expected {expected!r}, got {fields.get(name)!r}")
+    if parse_linkedin_guest_job_posting("<html><body><form class='login'></form></body></html>") is not None:
+        problems.append("A page without a job description was parsed as a job posting")
+    return problems
+
+
+def check_extractor(guest_url: str) -> list[str]:
+    """
+    Check the paths the extractor takes for a posting with a guest page, one without it and a blocked one
+    
+    The browser path is replaced by a stub recording its calls, and each case gets its own caches.
+    
+    Args:
+        guest_url (str): Guest endpoint URL template of the local server
+    
+    Returns:
+        list[str]: Problems found (empty if everything matched)
+    """
+    # Imported here, as the scraper needs the .env file of the project
+    from auto_cv.tools.session_store import SessionCookieStore
+    from auto_cv.tools.web_scraper import JobPostingExtractor
+    
+    os.environ.setdefault("LINKEDIN_USERNAME", "benchmark")
+    os.environ.setdefault("LINKEDIN_PASSWORD", "benchmark")
+    
+    problems = []
+    # (job id, whether the guest page has the posting, whether the browser must be used, whether LinkedIn must be backed off)
+    cases = [(job_id, True, False, False) for job_id in JOB_URLS]
+    cases += [(MISSING_JOB_ID, False, True, False), (BLOCKED_JOB_ID, False, False, True)]
+    for job_id, extracted, uses_browser, backs_off in cases:
+        cache_dir = tempfile.mkdtemp(prefix="linkedin-guest-benchmark-")
+        extractor = JobPostingExtractor(
+            linkedin_guest_url=guest_url,
+            store_html_snapshots=False,
+            _url_canonicalizer=UrlCanonicalizer(),
+            _job_description_cache=create_cache("auto-cv", "raw", "raw.jsonl", cache_key_name="url", base_cache_dir=cache_dir),
+            _negative_cache=NegativeCache(create_cache("auto-cv", "failed", "failed.jsonl", cache_key_name="key", base_cache_dir=cache_dir)),
+            _linkedin_sessions=SessionCookieStore("linkedin", base_cache_dir=cache_dir),
+            _http_session=create_session(),
+        )
+        browser_calls = []
+        extractor.extract_linkedin_job_description = lambda url, *credentials: browser_calls.append(url) or {}
+        
+        url = f"https://www.linkedin.com/jobs/view/{job_id}"
+        job_details, _ = extractor.extract_raw_info_from(url)
+        if bool(job_details) != extracted:
+            problems.append(f"Job {job_id}: {'not ' if extracted else ''}expected to be extracted from its guest page")
+        if bool(browser_calls) != uses_browser:
+            problems.append(f"Job {job_id}: the browser was {'not ' if uses_browser else ''}used")
+        if bool(extractor._negative_cache.blocked(url)) != backs_off:
+            problems.append(f"Job {job_id}: LinkedIn was {'not ' if backs_off else ''}backed off")
+    return problems
+
+
+def measure(guest_url: str, runs: int) -> dict[str, float]:
+    """
+    Time fetching and parsing the fixtures
+    
+    Args:
+        guest_url (str): Guest endpoint URL template of the local server
+        runs (int): Times each fixture is extracted
+    
+    Returns:
+        dict: Median and p90 time in ms of the fetch and of the parsing
+    """
+    session = create_session()
+    fetch_times, parse_times = [], []
+    for job_id in JOB_URLS:
+        for _ in range(runs):
+            start = time.perf_counter()
+            html = session.get(guest_url.format(job_id=job_id), timeout=10).text
+            fetched = time.perf_counter()
+            parse_linkedin_guest_job_posting(html)
+            fetch_times.append(fetched - start)
+            parse_times.append(time.perf_counter() - fetched)
+    
+    def percentiles(times: list[float]) -> tuple[float, float]:
+        p90 = statistics.quantiles(times, n=10)[-1] if len(times) > 1 else times[0]
+        return statistics.median(times) * 1000, p90 * 1000
+    
+    (fetch_p50, fetch_p90), (parse_p50, parse_p90) = percentiles(fetch_times), percentiles(parse_times)
+    return {"fetch_p50_ms": fetch_p50, "fetch_p90_ms": fetch_p90, "parse_p50_ms": parse_p50, "parse_p90_ms": parse_p90}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=50, help="Times each fixture is extracted")
+    args = parser.parse_args()
+    
+    server = ThreadingHTTPServer(("127.0.0.1", 0), GuestJobRequestHandler)
+    guest_url = f"http://127.0.0.1:{server.server_address[1]}{GUEST_PATH}{{job_id}}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        problems = check(guest_url) + check_extractor(guest_url)
+        results = measure(guest_url, args.runs)
+    finally:
+        server.shutdown()
+    
+    for problem in problems:
+        print(f"FAILED: {problem}")
+    print(f"{'stage':<8}{'p50 (ms)':>12}{'p90 (ms)':>12}")
+    for stage in ("fetch", "parse"):
+        print(f"{stage:<8}{results[f'{stage}_p50_ms']:>12.2f}{results[f'{stage}_p90_ms']:>12.2f}")
+    raise SystemExit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
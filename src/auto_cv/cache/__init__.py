@@ -0,0 +1,88 @@
+import os
+from typing import Any
+
+from llm_foundation import logger
+
+from auto_cv.cache.base import (
+    EXTRACTED_JOB_DESCRIPTION_CACHE,
+    FAILED_JOB_DESCRIPTION_CACHE,
+    HTML_SNAPSHOT_CACHE,
+    JOB_DESCRIPTION_CACHES,
+    RAW_JOB_DESCRIPTION_CACHE,
+    URL_ALIAS_CACHE,
+    Cache,
+    resolve_cache_dir,
+)
+from auto_cv.cache.canonical import CanonicalKeyCache, UrlCanonicalizer, canonical_url
+from auto_cv.cache.html_snapshots import HtmlSnapshotStore
+from auto_cv.cache.in_memory import BasicInMemoryCache
+from auto_cv.cache.negative import NegativeCache
+from auto_cv.cache.server import CacheClient, CacheServer
+from auto_cv.cache.sqlite import SQLiteCache, migrate_jsonl_to_sqlite, sqlite_cache_file
+
+
+# Environment variable selecting the storage backend of the caches ("jsonl", "sqlite" or "server")
+CACHE_BACKEND_ENV_VAR = "AUTO_CV_CACHE_BACKEND"
+
+
+def create_cache(app_name: str, 
+                 cache_subdir: str, 
+                 cache_file: str, 
+                 cache_key_name: str, 
+                 base_cache_dir: str | None = None,
+                 backend: str | None = None,
+                 **jsonl_options: Any) -> Cache:
+    """
+    Create a cache with the selected storage backend
+    
+    Args:
+        app_name (str): Name of the application
+        cache_subdir (str): Subdirectory for cache storage
+        cache_file (str): Name of the JSONL cache file (the SQLite backend uses the same name with .sqlite suffix)
+        cache_key_name (str): Name of the key to use for finding elements in the cache
+        base_cache_dir (str, optional): Base directory for cache storage
+        backend (str, optional): "jsonl", "sqlite" or "server" (a JSONL cache shared through the local cache 
+            server). Defaults to the AUTO_CV_CACHE_BACKEND env var or "jsonl"
+        **jsonl_options: Extra options for the BasicInMemoryCache (ignored by the SQLite backend)
+    
+    Returns:
+        Cache: The cache instance
+    """
+    backend = (backend or os.getenv(CACHE_BACKEND_ENV_VAR) or "jsonl").lower()
+    match backend:
+        case "jsonl":
+            return BasicInMemoryCache(app_name, cache_subdir, cache_file, cache_key_name, base_cache_dir, **jsonl_options)
+        case "sqlite":
+            if jsonl_options:
+                logger.debug(f"Ignoring JSONL cache options for SQLite backend: {list(jsonl_options)}")
+            return SQLiteCache(app_name, cache_subdir, sqlite_cache_file(cache_file), cache_key_name, base_cache_dir)
+        case "server":
+            # Follow mode is pointless when the server is the only reader and writer of the file
+            jsonl_options.pop("follow", None)
+            return CacheClient(app_name, cache_subdir, cache_file, cache_key_name, base_cache_dir, **jsonl_options)
+        case _:
+            raise ValueError(f"Unknown cache backend '{backend}'. Use 'jsonl', 'sqlite' or 'server'")
+
+
+__all__ = [
+    "EXTRACTED_JOB_DESCRIPTION_CACHE",
+    "FAILED_JOB_DESCRIPTION_CACHE",
+    "HTML_SNAPSHOT_CACHE",
+    "JOB_DESCRIPTION_CACHES",
+    "RAW_JOB_DESCRIPTION_CACHE",
+    "URL_ALIAS_CACHE",
+    "BasicInMemoryCache",
+    "Cache",
+    "CacheClient",
+    "CacheServer",
+    "CanonicalKeyCache",
+    "HtmlSnapshotStore",
+    "NegativeCache",
+    "SQLiteCache",
+    "UrlCanonicalizer",
+    "canonical_url",
+    "create_cache",
+    "migrate_jsonl_to_sqlite",
+    "resolve_cache_dir",
+    "sqlite_cache_file",
+]
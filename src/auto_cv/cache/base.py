@@ -0,0 +1,87 @@
+import hashlib
+import os
+from pathlib import Path
+from typing import Any, Iterable, Protocol
+
+
+# (cache_subdir, cache_file) of the job description caches shared by the scraper and the UI
+RAW_JOB_DESCRIPTION_CACHE = ("raw_job_description_cache", "raw_job_descriptions.jsonl")
+EXTRACTED_JOB_DESCRIPTION_CACHE = ("extracted_job_descriptions_cache", "extracted_job_descriptions.jsonl")
+JOB_DESCRIPTION_CACHES = [RAW_JOB_DESCRIPTION_CACHE, EXTRACTED_JOB_DESCRIPTION_CACHE]
+
+# (cache_subdir, cache_file) of the failed job description extractions (see NegativeCache)
+FAILED_JOB_DESCRIPTION_CACHE = ("failed_job_descriptions_cache", "failed_job_descriptions.jsonl")
+
+# (cache_subdir, cache_file) of the aliases of the job posting URLs (see UrlCanonicalizer)
+URL_ALIAS_CACHE = ("url_aliases_cache", "url_aliases.jsonl")
+
+# (cache_subdir, cache_file) of the index of the stored raw pages of the job postings (see HtmlSnapshotStore)
+HTML_SNAPSHOT_CACHE = ("html_snapshots", "html_snapshots.jsonl")
+
+# Bytes at the end of the covered part of a cache file used to check a derived snapshot still matches it
+FINGERPRINT_BYTES = 256
+
+class Cache(Protocol):
+    """
+    Interface shared by the cache storage backends
+    """
+    
+    cache_key_name: str
+    cache_file: Path
+    
+    @property
+    def keys(self) -> list[str]: ...
+    
+    def build_dict_with(self, *obj_attrs: str, sep: str = " - ", keys: Iterable[str] | None = None) -> dict: ...
+    
+    def is_empty(self) -> bool: ...
+    
+    def get(self, key: str) -> dict[str, Any] | None: ...
+    
+    def put(self, serializable_structure: dict[str, Any], overwrite: bool = False) -> bool: ...
+    
+    def put_many(self, serializable_structures: Iterable[dict[str, Any]], overwrite: bool = False) -> int: ...
+    
+    def exists(self, key_value: str) -> bool: ...
+    
+    def delete(self, key: str) -> bool: ...
+    
+    def stats(self) -> dict[str, Any]: ...
+
+
+def resolve_cache_dir(app_name: str, cache_subdir: str, base_cache_dir: str | None = None) -> Path:
+    """
+    Build the cache directory path (~/.<app_name>/<cache_subdir> by default) making sure it exists
+    
+    Args:
+        app_name (str): Name of the application
+        cache_subdir (str): Subdirectory for cache storage
+        base_cache_dir (str, optional): Base directory for cache storage
+    
+    Returns:
+        Path: Path of the cache directory
+    """
+    # Use a default cache directory if not provided
+    if base_cache_dir is None:
+        base_cache_dir = os.path.expanduser("~")
+    
+    cache_dir = Path(base_cache_dir, f".{app_name}", cache_subdir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir
+
+
+def file_fingerprint(path: Path, offset: int) -> str:
+    """
+    Hash of the bytes of a file right before an offset
+    
+    Args:
+        path (Path): File to read
+        offset (int): End of the fingerprinted region
+    
+    Returns:
+        str: Hex digest of the region
+    """
+    with open(path, mode='rb') as f:
+        start = max(0, offset - FINGERPRINT_BYTES)
+        f.seek(start)
+        return hashlib.sha1(f.read(offset - start)).hexdigest()
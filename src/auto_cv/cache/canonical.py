@@ -0,0 +1,285 @@
+from datetime import datetime
+import re
+from typing import Any, Callable, Iterable
+from urllib.parse import parse_qs, parse_qsl, urlencode, urlsplit, urlunsplit
+
+from llm_foundation import logger
+
+from auto_cv.cache.base import JOB_DESCRIPTION_CACHES, URL_ALIAS_CACHE, Cache
+from auto_cv.cache.negative import url_domain
+
+
+# Query parameters only used for tracking, which never change the posting a URL points to. Generic
+# names (ref, src...) are left alone, as some sites use them to pick the page they serve
+TRACKING_PARAMETERS = {
+    "fbclid", "gclid", "msclkid", "mc_cid", "mc_eid", "_hsenc", "_hsmi", "trk", "trkinfo", "trackingid", "lipi",
+    "gh_src", "lever-source", "lever-origin",
+}
+
+_LINKEDIN_JOB_VIEW_ID = re.compile(r"/jobs/view/(?:[^/?#]*-)?(\d+)")
+_GREENHOUSE_JOB = re.compile(r"/([^/]+)/jobs/(\d+)")
+_BOARD_POSTING = re.compile(r"/([^/]+)/([0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})", re.IGNORECASE)
+
+
+def linkedin_job_id(url: str) -> str | None:
+    """
+    Resolve the id of the job posting a LinkedIn URL points to
+    
+    Handles job view URLs (/jobs/view/<id> or /jobs/view/<slug>-<id>) and the search and
+    collection URLs showing a posting (?currentJobId=<id>).
+    
+    Args:
+        url (str): LinkedIn jobs URL
+    
+    Returns:
+        Optional[str]: Id of the job posting, or None if the URL doesn't point to one
+    """
+    parts = urlsplit(url)
+    current_job_id = parse_qs(parts.query).get("currentJobId", [""])[0]
+    if current_job_id.isdigit():
+        return current_job_id
+    match = _LINKEDIN_JOB_VIEW_ID.search(parts.path)
+    return match.group(1) if match else None
+
+
+def _canonical_linkedin(url: str) -> str | None:
+    job_id = linkedin_job_id(url)
+    return f"https://www.linkedin.com/jobs/view/{job_id}" if job_id else None
+
+
+def _canonical_greenhouse(url: str) -> str | None:
+    parts = urlsplit(url)
+    query = parse_qs(parts.query)
+    if "for" in query and "token" in query:
+        return f"https://boards.greenhouse.io/{query['for'][0]}/jobs/{query['token'][0]}"
+    match = _GREENHOUSE_JOB.match(parts.path)
+    return f"https://boards.greenhouse.io/{match.group(1)}/jobs/{match.group(2)}" if match else None
+
+
+def _canonical_board_posting(url: str) -> str | None:
+    # Lever and Ashby postings are /<company>/<uuid>, followed by /apply, /application...
+    parts = urlsplit(url)
+    match = _BOARD_POSTING.match(parts.path)
+    return f"https://{parts.netloc.lower()}/{match.group(1)}/{match.group(2).lower()}" if match else None
+
+
+# Canonicalizers of the sites with a stable job identity, by host pattern (a leading "." matches subdomains)
+SITE_CANONICALIZERS: dict[str, Callable[[str], str | None]] = {
+    "linkedin.com": _canonical_linkedin,
+    ".linkedin.com": _canonical_linkedin,
+    "boards.greenhouse.io": _canonical_greenhouse,
+    "job-boards.greenhouse.io": _canonical_greenhouse,
+    "job-boards.eu.greenhouse.io": _canonical_greenhouse,
+    "jobs.lever.co": _canonical_board_posting,
+    "jobs.eu.lever.co": _canonical_board_posting,
+    "jobs.ashbyhq.com": _canonical_board_posting,
+}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Site-independent normalization of a URL
+    
+    Lowercases the scheme and host, and drops default ports, fragments, tracking parameters
+    (utm_* and the ones in TRACKING_PARAMETERS) and trailing slashes. The other query parameters
+    are kept in their order, as some sites depend on it.
+    
+    Args:
+        url (str): URL to normalize
+    
+    Returns:
+        str: Normalized URL
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme, netloc.rsplit(":", 1)[-1]) in (("http", "80"), ("https", "443")):
+        netloc = netloc.rsplit(":", 1)[0]
+    query = [(name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+             if not name.lower().startswith("utm_") and name.lower() not in TRACKING_PARAMETERS]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((scheme, netloc, path, urlencode(query), ""))
+
+
+def canonical_url(url: str) -> str:
+    """
+    Canonical form of a job posting URL, shared by all the URLs pointing to the same posting
+    
+    Sites with a stable job identity (LinkedIn, Greenhouse, Lever, Ashby) are reduced to the URL
+    of the posting built from its id. Other URLs are just normalized.
+    
+    Args:
+        url (str): Job posting URL
+    
+    Returns:
+        str: Canonical URL
+    """
+    host = url_domain(url)
+    for pattern, canonicalizer in SITE_CANONICALIZERS.items():
+        if host == pattern or (pattern.startswith(".") and host.endswith(pattern)):
+            canonical = canonicalizer(url)
+            if canonical:
+                return canonical
+    return normalize_url(url)
+
+
+class UrlCanonicalizer:
+    """
+    Resolves job posting URLs to their canonical form, keeping a table of the aliases seen
+    
+    The alias table (a cache keyed by "alias") remembers the URLs each posting was stored under,
+    and can hold manual aliases the rules can't know about (e.g. a company career page pointing
+    to an ATS posting), which take precedence over the rules.
+    """
+    
+    def __init__(self, aliases: Cache | None = None):
+        """
+        Initialize the canonicalizer
+        
+        Args:
+            aliases (Cache, optional): Cache with the alias table. Without it, only the rules are used
+        """
+        self.aliases = aliases
+    
+    def canonicalize(self, url: str, record_alias: bool = False) -> str:
+        """
+        Canonical URL of a job posting
+        
+        Args:
+            url (str): Job posting URL
+            record_alias (bool, optional): Record the URL as an alias if it's not the canonical one.
+                Only meant for writes, so lookups don't write to the alias table
+        
+        Returns:
+            str: Canonical URL
+        """
+        if self.aliases is not None:
+            alias = self.aliases.get(url)
+            if alias:
+                return alias["url"]
+        canonical = canonical_url(url)
+        if record_alias and canonical != url and self.aliases is not None:
+            self.aliases.put({"alias": url, "url": canonical, "added_at": datetime.now().isoformat()})
+        return canonical
+    
+    def add_alias(self, alias: str, url: str):
+        """
+        Declare a URL as an alias of a job posting
+        
+        Args:
+            alias (str): URL to redirect
+            url (str): URL of the posting it points to (canonicalized too)
+        """
+        if self.aliases is None:
+            raise ValueError("The canonicalizer has no alias table")
+        self.aliases.put({"alias": alias, "url": self.canonicalize(url, record_alias=True), "added_at": datetime.now().isoformat()}, overwrite=True)
+    
+    def aliases_of(self, url: str) -> list[str]:
+        """
+        URLs known to point to a job posting
+        
+        Args:
+            url (str): URL of the job posting
+        
+        Returns:
+            list[str]: Aliases of its canonical URL
+        """
+        if self.aliases is None:
+            return []
+        canonical = self.canonicalize(url)
+        return [alias for alias in self.aliases.keys if (record := self.aliases.get(alias)) and record["url"] == canonical]
+
+
+class CanonicalKeyCache:
+    """
+    Cache wrapper keying the job postings by their canonical URL
+    
+    The keys given to get, exists and delete, and the key of the items put, are canonicalized,
+    so all the URLs of a posting share one entry. Only the keys of the items put are recorded as
+    aliases. Everything else goes to the wrapped cache.
+    """
+    
+    def __init__(self, cache: Cache, canonicalizer: UrlCanonicalizer):
+        """
+        Wrap a cache
+        
+        Args:
+            cache (Cache): Cache keyed by URL
+            canonicalizer (UrlCanonicalizer): Canonicalizer of the keys
+        """
+        self.cache = cache
+        self.canonicalizer = canonicalizer
+        self.cache_key_name = cache.cache_key_name
+        self.cache_file = cache.cache_file
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.cache, name)
+    
+    def _canonical_item(self, serializable_structure: dict[str, Any]) -> dict[str, Any]:
+        key = serializable_structure.get(self.cache_key_name)
+        if not key:
+            return serializable_structure
+        return {**serializable_structure, self.cache_key_name: self.canonicalizer.canonicalize(key, record_alias=True)}
+    
+    @property
+    def keys(self) -> list[str]:
+        return self.cache.keys
+    
+    def get(self, key: str) -> dict[str, Any] | None:
+        return self.cache.get(self.canonicalizer.canonicalize(key))
+    
+    def put(self, serializable_structure: dict[str, Any], overwrite: bool = False) -> bool:
+        return self.cache.put(self._canonical_item(serializable_structure), overwrite)
+    
+    def put_many(self, serializable_structures: Iterable[dict[str, Any]], overwrite: bool = False) -> int:
+        return self.cache.put_many([self._canonical_item(item) for item in serializable_structures], overwrite)
+    
+    def exists(self, key_value: str) -> bool:
+        return self.cache.exists(self.canonicalizer.canonicalize(key_value))
+    
+    def delete(self, key: str) -> bool:
+        return self.cache.delete(self.canonicalizer.canonicalize(key))
+
+
+def migrate_cache_keys(cache: Cache, canonicalizer: UrlCanonicalizer) -> int:
+    """
+    Re-key the entries of a cache keyed by URL with their canonical URLs
+    
+    When several entries collapse into the same posting, the most recently extracted one is kept.
+    The old keys are recorded as aliases.
+    
+    Args:
+        cache (Cache): Cache keyed by URL (not wrapped in a CanonicalKeyCache)
+        canonicalizer (UrlCanonicalizer): Canonicalizer of the keys
+    
+    Returns:
+        int: Number of entries re-keyed
+    """
+    migrated = 0
+    for key in cache.keys:
+        canonical = canonicalizer.canonicalize(key, record_alias=True)
+        if canonical == key:
+            continue
+        item = cache.get(key)
+        if item is None:
+            continue
+        existing = cache.get(canonical)
+        if existing is None or str(item.get("extracted_at", "")) > str(existing.get("extracted_at", "")):
+            cache.put({**item, cache.cache_key_name: canonical}, overwrite=True)
+        cache.delete(key)
+        migrated += 1
+    logger.info(f"Re-keyed {migrated} items of {cache.cache_file} with their canonical URLs")
+    return migrated
+
+
+def migrate():
+    """
+    One-shot migration of the keys of the job description caches to canonical URLs
+    """
+    # Imported here, as the cache package imports this module
+    from auto_cv.cache import create_cache
+    
+    canonicalizer = UrlCanonicalizer(create_cache("auto-cv", *URL_ALIAS_CACHE, cache_key_name="alias"))
+    for cache_subdir, cache_file in JOB_DESCRIPTION_CACHES:
+        cache = create_cache("auto-cv", cache_subdir, cache_file, cache_key_name="url", compaction_threshold=None)
+        migrate_cache_keys(cache, canonicalizer)
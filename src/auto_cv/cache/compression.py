@@ -0,0 +1,247 @@
+import base64
+from collections import Counter
+import hashlib
+import lzma
+import os
+from pathlib import Path
+import tempfile
+from typing import Any, Iterable
+import zlib
+
+from llm_foundation import logger
+
+
+# Key of the marker object that replaces a compressed field value
+COMPRESSED_MARKER = "$compressed"
+
+COMPRESSION_METHODS = ("zlib", "lzma")
+
+# zlib can only refer back to the last 32KB, so larger dictionaries are useless
+MAX_DICTIONARY_SIZE = 32 * 1024
+
+
+def train_dictionary(samples: Iterable[str], size: int = MAX_DICTIONARY_SIZE, phrase_words: int = 6) -> bytes:
+    """
+    Build a zlib preset dictionary from the lines and phrases that are common across sample texts
+    
+    Args:
+        samples (Iterable[str]): Sample texts (e.g. job descriptions)
+        size (int, optional): Maximum size of the dictionary in bytes
+        phrase_words (int, optional): Number of words of the phrases considered
+    
+    Returns:
+        bytes: Dictionary, with the most common segments at the end (where zlib finds them cheapest)
+    """
+    document_frequency: Counter[str] = Counter()
+    for text in samples:
+        segments = {line.strip() for line in text.splitlines() if len(line.strip()) > 20}
+        words = text.split()
+        segments.update(" ".join(words[i:i + phrase_words]) for i in range(0, max(0, len(words) - phrase_words + 1)))
+        document_frequency.update(segments)
+    
+    pieces: list[bytes] = []
+    total = 0
+    for segment, frequency in document_frequency.most_common():
+        if frequency < 2 or total >= size:
+            break
+        piece = (segment + "\n").encode("utf-8")
+        if total + len(piece) > size:
+            continue
+        pieces.append(piece)
+        total += len(piece)
+    return b"".join(reversed(pieces))
+
+
+def dictionary_id(dictionary: bytes) -> str:
+    """
+    Identifier of a dictionary, derived from its contents
+    
+    Args:
+        dictionary (bytes): Dictionary
+    
+    Returns:
+        str: Short hex digest of the dictionary
+    """
+    return hashlib.sha1(dictionary).hexdigest()[:12]
+
+
+class FieldCompressor:
+    """
+    Compresses the large string fields of the cached objects
+    
+    Each compressed value is replaced by a marker object holding the compression method, the id of
+    the preset dictionary used (zlib only) and the base64 encoded compressed bytes, so objects stay
+    JSON serializable and can be decompressed field by field.
+    """
+    
+    def __init__(self,
+                 fields: Iterable[str],
+                 method: str = "zlib",
+                 min_size: int = 512,
+                 dictionaries_dir: Path | None = None,
+                 dictionaries_prefix: str = ""):
+        """
+        Initialize the compressor, loading the dictionaries already trained for the cache
+        
+        Args:
+            fields (Iterable[str]): Fields to compress
+            method (str, optional): "zlib" or "lzma"
+            min_size (int, optional): Minimum length of a string to be compressed
+            dictionaries_dir (Path, optional): Directory where the trained dictionaries are stored
+            dictionaries_prefix (str, optional): Prefix of the dictionary file names
+        """
+        if method not in COMPRESSION_METHODS:
+            raise ValueError(f"Unknown compression method '{method}'. Use one of {COMPRESSION_METHODS}")
+        self.fields = set(fields)
+        self.method = method
+        self.min_size = min_size
+        self.dictionaries_dir = dictionaries_dir
+        self.dictionaries_prefix = dictionaries_prefix
+        self._dictionaries: dict[str, bytes] = {}
+        
+        # The newest dictionary on disk is the one used to compress
+        self._current_dictionary: str | None = self.load_dictionaries()
+    
+    def load_dictionaries(self) -> str | None:
+        """
+        Load the dictionaries stored for the cache that aren't loaded yet (e.g. trained by another process)
+        
+        Returns:
+            Optional[str]: Id of the newest dictionary on disk, or None if there's none
+        """
+        if self.dictionaries_dir is None:
+            return None
+        newest = None
+        paths = sorted(self.dictionaries_dir.glob(f"{self.dictionaries_prefix}*.zdict"), key=lambda path: path.stat().st_mtime)
+        for path in paths:
+            new_id = path.stem[len(self.dictionaries_prefix):]
+            if new_id not in self._dictionaries:
+                dictionary = path.read_bytes()
+                new_id = dictionary_id(dictionary)
+                self._dictionaries[new_id] = dictionary
+            newest = new_id
+        return newest
+    
+    @property
+    def has_dictionary(self) -> bool:
+        return self._current_dictionary is not None
+    
+    def add_dictionary(self, dictionary: bytes) -> str:
+        """
+        Store a new dictionary and use it for the next compressions
+        
+        Args:
+            dictionary (bytes): Dictionary
+        
+        Returns:
+            str: Id of the dictionary
+        """
+        new_id = dictionary_id(dictionary)
+        self._dictionaries[new_id] = dictionary
+        self._current_dictionary = new_id
+        if self.dictionaries_dir is not None:
+            # Written atomically, as other processes sharing the cache may load it at any time
+            path = self.dictionaries_dir / f"{self.dictionaries_prefix}{new_id}.zdict"
+            with tempfile.NamedTemporaryFile(mode='wb', dir=self.dictionaries_dir, prefix=f".{path.name}.", delete=False) as tmp:
+                tmp.write(dictionary)
+            os.replace(tmp.name, path)
+        return new_id
+    
+    @staticmethod
+    def is_compressed(value: Any) -> bool:
+        return isinstance(value, dict) and COMPRESSED_MARKER in value
+    
+    def compress_value(self, value: str) -> dict[str, Any]:
+        """
+        Compress a string into a marker object
+        
+        Args:
+            value (str): Text to compress
+        
+        Returns:
+            dict: Marker object
+        """
+        raw = value.encode("utf-8")
+        dictionary_key = None
+        if self.method == "lzma":
+            data = lzma.compress(raw)
+        elif self._current_dictionary is not None:
+            dictionary_key = self._current_dictionary
+            compressor = zlib.compressobj(level=9, zdict=self._dictionaries[dictionary_key])
+            data = compressor.compress(raw) + compressor.flush()
+        else:
+            data = zlib.compress(raw, level=9)
+        return {COMPRESSED_MARKER: self.method, "dict": dictionary_key, "data": base64.b64encode(data).decode("ascii")}
+    
+    def decompress_value(self, value: Any) -> Any:
+        """
+        Decompress a marker object, returning any other value unchanged
+        
+        Args:
+            value (Any): Field value
+        
+        Returns:
+            Any: Original value
+        """
+        if not self.is_compressed(value):
+            return value
+        data = base64.b64decode(value["data"])
+        if value[COMPRESSED_MARKER] == "lzma":
+            return lzma.decompress(data).decode("utf-8")
+        if value.get("dict") is None:
+            return zlib.decompress(data).decode("utf-8")
+        if value["dict"] not in self._dictionaries:
+            # Another process sharing the cache may have trained it since the dictionaries were loaded
+            self.load_dictionaries()
+        if value["dict"] not in self._dictionaries:
+            raise KeyError(f"Compression dictionary {value['dict']} not found in {self.dictionaries_dir}")
+        decompressor = zlib.decompressobj(zdict=self._dictionaries[value["dict"]])
+        return (decompressor.decompress(data) + decompressor.flush()).decode("utf-8")
+    
+    def compress(self, obj: dict[str, Any]) -> dict[str, Any]:
+        """
+        Copy of an object with its large string fields compressed
+        
+        Args:
+            obj (dict): Object to compress
+        
+        Returns:
+            dict: Object with compressed fields
+        """
+        return {field: self.compress_value(value)
+                if field in self.fields and isinstance(value, str) and len(value) >= self.min_size else value
+                for field, value in obj.items()}
+    
+    def decompress(self, obj: dict[str, Any]) -> dict[str, Any]:
+        """
+        Copy of an object with its compressed fields restored
+        
+        Args:
+            obj (dict): Object with compressed fields
+        
+        Returns:
+            dict: Original object
+        """
+        if not any(self.is_compressed(value) for value in obj.values()):
+            return obj
+        return {field: self.decompress_value(value) for field, value in obj.items()}
+    
+    def train(self, samples: Iterable[str]) -> str | None:
+        """
+        Train a new zlib dictionary from sample texts and use it for the next compressions
+        
+        Args:
+            samples (Iterable[str]): Sample texts
+        
+        Returns:
+            Optional[str]: Id of the new dictionary, or None if nothing could be learnt
+        """
+        if self.method != "zlib":
+            logger.warning(f"Dictionaries are only supported by zlib compression, not {self.method}")
+            return None
+        dictionary = train_dictionary(samples)
+        if not dictionary:
+            return None
+        new_id = self.add_dictionary(dictionary)
+        logger.info(f"Trained compression dictionary {new_id} ({len(dictionary)} bytes)")
+        return new_id
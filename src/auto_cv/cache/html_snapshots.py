@@ -0,0 +1,219 @@
+from datetime import datetime, timedelta
+import hashlib
+import os
+from pathlib import Path
+import tempfile
+import threading
+from typing import Any
+import zlib
+
+from llm_foundation import logger
+
+from auto_cv.cache.base import HTML_SNAPSHOT_CACHE, Cache
+from auto_cv.cache.canonical import canonical_url
+
+
+def read_snapshot_blob(path: str | Path) -> str:
+    """
+    Decompress a stored page (a module function, so worker processes can read blobs by path)
+    
+    Args:
+        path (str | Path): Path of the blob
+    
+    Returns:
+        str: HTML of the page
+    """
+    return zlib.decompress(Path(path).read_bytes()).decode("utf-8")
+
+
+class HtmlSnapshotStore:
+    """
+    Compressed, content-addressed store of the raw pages the job postings were extracted from
+    
+    Each page is stored once, compressed, in a blob named after the SHA-256 of its content (so
+    unchanged pages fetched again take no space). An index keyed by canonical URL lists the
+    snapshots of each posting by fetch time, with the extraction path that fetched it, so the
+    parsers can be run again over the stored pages without fetching them. A page fetched again
+    unchanged adds no snapshot, and only the most recent snapshots of each posting are kept (the
+    blobs no snapshot refers to anymore are deleted by prune).
+    """
+    
+    def __init__(self,
+                 index: Cache,
+                 blobs_dir: Path | None = None,
+                 compression_level: int = 9,
+                 max_snapshots: int = 10):
+        """
+        Initialize the store
+        
+        Args:
+            index (Cache): Cache with the snapshots of each posting, with "url" as cache key name
+            blobs_dir (Path, optional): Directory of the blobs. Defaults to blobs/ next to the index file
+            compression_level (int, optional): zlib compression level of the blobs
+            max_snapshots (int, optional): Snapshots kept per posting (the oldest ones are dropped)
+        """
+        self.index = index
+        self.blobs_dir = Path(blobs_dir) if blobs_dir else Path(index.cache_file).parent / "blobs"
+        self.blobs_dir.mkdir(parents=True, exist_ok=True)
+        self.compression_level = compression_level
+        self.max_snapshots = max_snapshots
+        # Serializes the read-modify-write of the index records
+        self._lock = threading.Lock()
+    
+    def blob_path(self, digest: str) -> Path:
+        """
+        Path of the blob of a page
+        
+        Args:
+            digest (str): SHA-256 of the page
+        
+        Returns:
+            Path: Path of the blob (in a subdirectory per digest prefix)
+        """
+        return self.blobs_dir / digest[:2] / f"{digest}.html.z"
+    
+    def save(self, url: str, html: str, source: str, fetched_at: datetime | None = None) -> str | None:
+        """
+        Store a fetched page, unless it's the same as the latest snapshot of the posting
+        
+        Args:
+            url (str): URL of the job posting
+            html (str): Content of the page
+            source (str): Extraction path that fetched it (tells which parser to run over it)
+            fetched_at (datetime, optional): Fetch time. Defaults to now
+        
+        Returns:
+            Optional[str]: SHA-256 of the page, or None if it couldn't be stored
+        """
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.blob_path(digest)
+        try:
+            if not path.exists():
+                path.parent.mkdir(exist_ok=True)
+                compressed = zlib.compress(data, self.compression_level)
+                with tempfile.NamedTemporaryFile(mode='wb', dir=path.parent, prefix=f".{digest}.", delete=False) as tmp:
+                    tmp.write(compressed)
+                os.replace(tmp.name, path)
+            
+            url = canonical_url(url)
+            with self._lock:
+                record = dict(self.index.get(url) or {"url": url, "snapshots": []})
+                if record["snapshots"] and record["snapshots"][-1]["sha256"] == digest:
+                    logger.debug(f"Page of {url} unchanged since its last snapshot {digest[:12]}")
+                    return digest
+                record["snapshots"] = (record["snapshots"] + [{
+                    "fetched_at": (fetched_at or datetime.now()).isoformat(),
+                    "sha256": digest,
+                    "source": source,
+                    "size": len(data),
+                }])[-self.max_snapshots:]
+                self.index.put(record, overwrite=True)
+        except Exception as e:
+            logger.error(f"Error storing the page of {url}: {e}")
+            return None
+        logger.debug(f"Stored {len(data)} bytes page of {url} as {digest[:12]}")
+        return digest
+    
+    def snapshots(self, url: str) -> list[dict[str, Any]]:
+        """
+        Snapshots of a job posting, oldest first
+        
+        Args:
+            url (str): URL of the job posting
+        
+        Returns:
+            list[dict]: fetched_at, sha256, source and size of each snapshot
+        """
+        record = self.index.get(canonical_url(url))
+        return list(record["snapshots"]) if record else []
+    
+    def latest(self, url: str) -> dict[str, Any] | None:
+        """
+        Most recent snapshot of a job posting
+        
+        Args:
+            url (str): URL of the job posting
+        
+        Returns:
+            Optional[dict]: The snapshot, or None if the posting has none
+        """
+        snapshots = self.snapshots(url)
+        return snapshots[-1] if snapshots else None
+    
+    def load(self, digest: str) -> str:
+        """
+        Content of a stored page
+        
+        Args:
+            digest (str): SHA-256 of the page
+        
+        Returns:
+            str: HTML of the page
+        """
+        return read_snapshot_blob(self.blob_path(digest))
+    
+    def urls(self) -> list[str]:
+        """
+        URLs of the job postings with snapshots
+        
+        Returns:
+            list[str]: Canonical URLs
+        """
+        return self.index.keys
+    
+    def prune(self, min_age: timedelta = timedelta(hours=1)) -> dict[str, int]:
+        """
+        Delete the blobs no snapshot refers to anymore (e.g. dropped from the history of their postings)
+        
+        Args:
+            min_age (timedelta, optional): Blobs (and leftover temporary files) modified more recently are
+                kept, as they may belong to a page being saved by another process
+        
+        Returns:
+            dict: Blobs deleted and bytes freed
+        """
+        referenced = {snapshot["sha256"] for url in self.urls() for snapshot in self.snapshots(url)}
+        cutoff = (datetime.now() - min_age).timestamp()
+        counts = {"deleted": 0, "freed_bytes": 0}
+        for path in self.blobs_dir.glob("*/*"):
+            digest = path.name.split(".")[1] if path.name.startswith(".") else path.name.split(".")[0]
+            try:
+                stat_result = path.stat()
+                if digest in referenced or stat_result.st_mtime > cutoff:
+                    continue
+                path.unlink()
+            except FileNotFoundError:
+                continue
+            counts["deleted"] += 1
+            counts["freed_bytes"] += stat_result.st_size
+        logger.info(f"Pruned {counts['deleted']} unreferenced page blobs ({counts['freed_bytes']} bytes) from {self.blobs_dir}")
+        return counts
+    
+    def stats(self) -> dict[str, Any]:
+        """
+        Retrieve the size of the store
+        
+        Returns:
+            dict: Postings, snapshots, distinct pages and their raw and compressed bytes
+        """
+        snapshots = [snapshot for url in self.urls() for snapshot in self.snapshots(url)]
+        pages = {snapshot["sha256"]: snapshot["size"] for snapshot in snapshots}
+        compressed = sum(path.stat().st_size for path in self.blobs_dir.glob("*/*.html.z"))
+        return {
+            "postings": len(self.urls()),
+            "snapshots": len(snapshots),
+            "pages": len(pages),
+            "raw_bytes": sum(pages.values()),
+            "compressed_bytes": compressed,
+        }
+
+
+def prune():
+    """
+    Delete the stored pages no snapshot of the HTML snapshot store refers to anymore
+    """
+    # Imported here, as the cache package imports this module
+    from auto_cv.cache import create_cache
+    
+    HtmlSnapshotStore(create_cache("auto-cv", *HTML_SNAPSHOT_CACHE, cache_key_name="url")).prune()
@@ -0,0 +1,1379 @@
+import atexit
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import fcntl
+import io
+import json
+import os
+from pathlib import Path
+import tempfile
+import threading
+import time
+from typing import Any, Iterable, Iterator
+import jsonlines
+
+from llm_foundation import logger
+
+from auto_cv.cache.base import resolve_cache_dir
+from auto_cv.cache.compression import FieldCompressor
+from auto_cv.cache.indexes import SortedFieldIndex, build_indexes
+from auto_cv.cache.metrics import LatencyHistogram
+from auto_cv.cache.search import FullTextIndex
+from auto_cv.cache.snapshot import read_snapshot, write_snapshot
+
+
+# Field marking a cache line as a tombstone for a deleted key
+TOMBSTONE_FIELD = "_deleted"
+
+# Offset used in the index for lines still in the write buffer
+PENDING_OFFSET = -1
+
+
+class BasicInMemoryCache:
+    """
+    Manages caching of json objects to prevent redundant actions
+    
+    The cache file is append-only: overwrites and deletions (tombstones) add new lines, and
+    the file is compacted (rewritten with only the live entries) when the ratio of stale lines
+    goes over the compaction threshold.
+    
+    The objects kept in memory can be bounded by number of entries and by serialized size, in
+    which case the least recently used ones are evicted (they can still be read back from disk).
+    Entries older than the configured TTL are considered expired and reported as misses.
+    
+    Writes can be grouped: lines are buffered and appended to the cache file in a single write
+    when the batch is full, when the flush interval elapses or on an explicit flush(). Using the
+    cache as a context manager flushes the buffer on exit.
+    
+    Secondary indexes can be declared on object fields (e.g. company or extracted_at) to look up
+    keys by exact value, prefix or range without scanning the whole cache. Text fields can also be
+    indexed for keyword search; that index is persisted next to the cache file and only the lines
+    appended since it was saved are indexed on startup.
+    
+    Optionally, a binary snapshot of the in-memory state is written periodically, so that on
+    startup only the tail of the cache file appended after the snapshot has to be parsed.
+    
+    In follow mode, the lines appended to the cache file by other processes are picked up on
+    access (or on file change notifications) without reloading the whole file.
+    
+    Large string fields (e.g. raw descriptions) can be stored compressed, both in the cache file and
+    in memory, using a zlib dictionary trained on the cached texts. They are decompressed on get().
+    """
+    
+    def __init__(self, 
+                app_name: str, 
+                cache_subdir: str, 
+                cache_file: str, 
+                cache_key_name: str,
+                base_cache_dir: str | None = None,
+                lazy: bool = False,
+                compaction_threshold: float | None = 0.5,
+                min_compaction_lines: int = 100,
+                max_entries: int | None = None,
+                max_bytes: int | None = None,
+                ttl: timedelta | None = None,
+                timestamp_field: str = "extracted_at",
+                write_batch_size: int = 1,
+                flush_interval: float | None = None,
+                durable: bool = False,
+                indexed_fields: Iterable[str] = (),
+                search_fields: Iterable[str] = (),
+                snapshot_every: int | None = None,
+                compress_snapshot: bool = True,
+                compressed_fields: Iterable[str] = (),
+                compression: str = "zlib",
+                compression_min_size: int = 512,
+                min_training_samples: int = 50,
+                follow: bool = False,
+                follow_interval: float = 1.0):
+        """
+        Initialize the job description cache
+        
+        Args:
+            app_name (str): Name of the application
+            cache_subdir (str): Subdirectory for cache storage
+            cache_file (str): Name of the cache file
+            cache_key_name (str): Name of the key to use for finding elements in the cache
+            base_cache_dir (str, optional): Base directory for cache storage
+            lazy (bool, optional): If True, only an index of key -> (byte offset, length) is kept
+                in memory and objects are read from the cache file on demand
+            compaction_threshold (float, optional): Ratio of stale lines (overwritten or deleted entries)
+                over total lines that triggers a compaction of the cache file. None disables auto compaction
+            min_compaction_lines (int, optional): Minimum number of lines in the cache file before
+                auto compaction is considered
+            max_entries (int, optional): Maximum number of objects kept in memory
+            max_bytes (int, optional): Maximum serialized size (in bytes) of the objects kept in memory
+            ttl (timedelta, optional): Time after which an entry is considered expired, based on its timestamp field
+            timestamp_field (str, optional): Name of the ISO formatted timestamp field used for the TTL
+            write_batch_size (int, optional): Number of buffered lines that triggers a write to the cache file.
+                The default of 1 writes every put straight away
+            flush_interval (float, optional): Maximum seconds a buffered line waits before being written
+            durable (bool, optional): If True, the cache file is fsynced after each written batch
+            indexed_fields (Iterable[str], optional): Object fields with a secondary index
+            search_fields (Iterable[str], optional): Text fields indexed for full-text search
+            snapshot_every (int, optional): Number of lines written to the cache file after which a new
+                binary snapshot is taken. None disables snapshots
+            compress_snapshot (bool, optional): Compress the snapshot with zlib
+            compressed_fields (Iterable[str], optional): String fields stored compressed
+            compression (str, optional): Compression method of those fields, "zlib" or "lzma"
+            compression_min_size (int, optional): Minimum length of a string to be compressed
+            min_training_samples (int, optional): Number of entries needed to train the zlib dictionary
+                automatically on startup
+            follow (bool, optional): If True, the lines appended to the cache file by other processes are
+                loaded when the cache is accessed (see also start_watching())
+            follow_interval (float, optional): Minimum seconds between checks of the cache file when following it
+        """
+        # Store the cache key name
+        self.cache_key_name = cache_key_name
+        self.lazy = lazy
+        self.compaction_threshold = compaction_threshold
+        self.min_compaction_lines = min_compaction_lines
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.timestamp_field = timestamp_field
+        self.write_batch_size = write_batch_size
+        self.flush_interval = flush_interval
+        self.durable = durable
+        
+        # Ensure cache directory exists
+        self.cache_dir = resolve_cache_dir(app_name, cache_subdir, base_cache_dir)
+        
+        # Cache file path
+        self.cache_file = self.cache_dir / cache_file
+        
+        # Lock file coordinating the processes sharing the cache file (see _file_lock)
+        self.lock_file = self.cache_file.with_suffix(".lock")
+        
+        # Location (byte offset, length) of the latest line of each key in the cache file
+        self._index: dict[str, tuple[int, int]] = {}
+        
+        # Follow mode: position up to which the file has been read, identity of the file and the
+        # ranges (start -> end) appended by this instance after that position
+        self.follow = follow
+        self.follow_interval = follow_interval
+        self._read_offset = 0
+        self._file_id: tuple[int, int] | None = None
+        self._own_writes: dict[int, int] = {}
+        self._last_refresh = time.monotonic()
+        
+        # Number of lines in the cache file, including stale ones and tombstones
+        self._line_count = 0
+        
+        # Secondary indexes of the declared fields
+        self._field_indexes: dict[str, SortedFieldIndex] = build_indexes(indexed_fields)
+        
+        # Full-text index of the search fields and its snapshot file
+        search_fields = list(search_fields)
+        self._search_index: FullTextIndex | None = FullTextIndex(search_fields) if search_fields else None
+        self.search_index_file = self.cache_file.with_suffix(".search.json")
+        
+        # Compressor of the large fields and the dictionaries it's been trained with
+        compressed_fields = list(compressed_fields)
+        self.min_training_samples = min_training_samples
+        self._compressor: FieldCompressor | None = None
+        if compressed_fields:
+            self._compressor = FieldCompressor(compressed_fields, 
+                                               compression, 
+                                               compression_min_size, 
+                                               dictionaries_dir=self.cache_dir, 
+                                               dictionaries_prefix=f"{self.cache_file.stem}.")
+        
+        # Binary snapshot of the in-memory state
+        self.snapshot_every = snapshot_every
+        self.compress_snapshot = compress_snapshot
+        self.snapshot_file = self.cache_file.with_suffix(".snapshot")
+        self._lines_since_snapshot = 0
+        
+        # Timestamps (in epoch seconds) of the entries, only tracked when a TTL is set
+        self._timestamps: dict[str, float] = {}
+        
+        # In-memory cache for faster lookups, in LRU order (stays empty in unbounded lazy mode)
+        self._cache: OrderedDict[str, Any] = OrderedDict()
+        self._resident_sizes: dict[str, int] = {}
+        self._resident_bytes = 0
+        
+        # Write buffer: serialized lines not yet in the cache file and the objects they hold
+        self._write_lock = threading.RLock()
+        self._pending: list[tuple[str, bytes]] = []
+        self._pending_objects: dict[str, dict[str, Any]] = {}
+        self._flush_timer: threading.Timer | None = None
+        if write_batch_size > 1 or flush_interval is not None:
+            atexit.register(self.flush)
+        if self._search_index is not None:
+            atexit.register(self.save_search_index)
+        if snapshot_every is not None:
+            atexit.register(self._save_snapshot_if_behind)
+        
+        # Counters
+        self._gets = 0
+        self._hits = 0
+        self._misses = 0
+        self._puts = 0
+        self._overwrites = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._bytes_read = 0
+        self._bytes_written = 0
+        self._load_seconds = 0.0
+        self._latencies = {operation: LatencyHistogram() for operation in ("get", "put", "flush")}
+        
+        self._load_cache()
+        self._maybe_compact()
+        
+        if (self._compressor is not None and self._compressor.method == "zlib" and 
+            not self._compressor.has_dictionary and len(self._index) >= self.min_training_samples):
+            self.train_compression_dictionary()
+
+    def _load_cache(self):
+        """
+        Load existing cache from JSONL file, building the offset index along the way
+        """
+        load_start = time.perf_counter()
+        self._index = {}
+        self._line_count = 0
+        self._read_offset = 0
+        self._file_id = None
+        self._own_writes = {}
+        
+        if not self.cache_file.exists():
+            return
+        
+        # Field values are gathered first and sorted once per index at the end
+        field_values: dict[str, dict[str, Any]] = {field: {} for field in self._field_indexes}
+        
+        # Only the lines after the ones covered by the search index snapshot need to be indexed
+        search_from = 0
+        if self._search_index is not None:
+            search_from = self._search_index.load(self.search_index_file, self.cache_file)
+        
+        # Restore the state covered by the snapshot and only parse the lines appended after it
+        start_offset = self._restore_snapshot(field_values) if self.snapshot_every is not None else 0
+        
+        # The search index may be missing or older than the snapshot (e.g. the process died between both saves)
+        search_updated = False
+        if self._search_index is not None and search_from < start_offset:
+            search_updated = self._replay_search_index(search_from, start_offset)
+        
+        search_updated = self._ingest(start_offset, field_values, search_from) or search_updated
+        
+        for field, values in field_values.items():
+            self._field_indexes[field].load(values)
+        
+        if search_updated:
+            self.save_search_index()
+        if self.snapshot_every is not None and (self._lines_since_snapshot >= self.snapshot_every or 
+                                                (self._lines_since_snapshot and not start_offset)):
+            self.save_snapshot()
+        
+        self._load_seconds = time.perf_counter() - load_start
+        logger.info(f"Loaded {len(self._index)} items from cache {self.cache_file} in {self._load_seconds:.3f}s (lazy: {self.lazy})")
+
+    def _ingest(self, 
+                start_offset: int, 
+                field_values: dict[str, dict[str, Any]] | None = None, 
+                search_from: int = 0) -> bool:
+        """
+        Parse the lines of the cache file from an offset on, applying them to the in-memory state
+        
+        Lines written by this same instance (while following the file) are skipped, and a trailing
+        line without new line (still being written by another process) is left for a later call.
+        
+        Args:
+            start_offset (int): Offset of the first line to parse
+            field_values (dict, optional): Values of the indexed fields per key, to be loaded in bulk 
+                afterwards. If None, the secondary indexes are updated line by line
+            search_from (int, optional): Offset from which lines are added to the full-text index
+        
+        Returns:
+            bool: True if the full-text index was updated
+        """
+        search_updated = False
+        offset = start_offset
+        try:
+            with open(self.cache_file, mode='rb') as f:
+                self._file_id = self._stat_file_id(os.fstat(f.fileno()))
+                f.seek(start_offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    line_offset, offset = offset, offset + len(line)
+                    self._bytes_read += len(line)
+                    if line_offset in self._own_writes:
+                        # Skip what this instance appended itself
+                        offset = self._own_writes.pop(line_offset)
+                        f.seek(offset)
+                        continue
+                    if not line.strip():
+                        continue
+                    try:
+                        obj = json.loads(line)
+                    except json.JSONDecodeError as e:
+                        logger.error(f"Skipping corrupted line at offset {line_offset} in {self.cache_file}: {e}")
+                        continue
+                    self._line_count += 1
+                    self._lines_since_snapshot += 1
+                    try:
+                        # Use the specified cache key name to create the cache index
+                        cache_index = obj.get(self.cache_key_name)
+                        if not cache_index:
+                            continue
+                        key = str(cache_index)
+                        if self._index.get(key, (None,))[0] == PENDING_OFFSET:
+                            # The buffered write of this instance supersedes the line
+                            continue
+                        indexes_search = self._search_index is not None and line_offset >= search_from
+                        if obj.get(TOMBSTONE_FIELD):
+                            self._forget(key)
+                            for values in (field_values or {}).values():
+                                values.pop(key, None)
+                            if indexes_search:
+                                self._search_index.remove(key)
+                                search_updated = True
+                            continue
+                        self._index[key] = (line_offset, len(line))
+                        if indexes_search:
+                            self._search_index.add(key, self._decompress(obj))
+                            search_updated = True
+                        for field, field_index in self._field_indexes.items():
+                            value = self._decompress_value(obj.get(field))
+                            if field_values is None:
+                                field_index.add(key, value)
+                            else:
+                                field_values[field][key] = value
+                        self._track_timestamp(key, obj)
+                        if not self.lazy:
+                            self._make_resident(key, obj)
+                        elif key in self._cache:
+                            # Drop the outdated copy
+                            del self._cache[key]
+                            self._resident_bytes -= self._resident_sizes.pop(key)
+                    except Exception as e:
+                        # A bad line (e.g. compressed with a dictionary that can't be found) doesn't stop the load
+                        logger.error(f"Skipping cache line at offset {line_offset} in {self.cache_file}: {e}")
+        except Exception as e:
+            logger.error(f"Error loading cache: {e}")
+        
+        self._read_offset = offset
+        return search_updated
+
+    def _replay_search_index(self, start_offset: int, end_offset: int) -> bool:
+        """
+        Bring the full-text index up to date with a range of the cache file already restored from the snapshot
+        
+        Only the lines the restored offset index points to are indexed, so overwritten and deleted
+        items in the range don't come back.
+        
+        Args:
+            start_offset (int): Offset the full-text index is up to date to
+            end_offset (int): Offset covered by the snapshot
+        
+        Returns:
+            bool: True if the full-text index was updated
+        """
+        search_updated = False
+        offset = start_offset
+        try:
+            with open(self.cache_file, mode='rb') as f:
+                f.seek(start_offset)
+                for line in f:
+                    line_offset, offset = offset, offset + len(line)
+                    if line_offset >= end_offset:
+                        break
+                    if not line.strip():
+                        continue
+                    self._bytes_read += len(line)
+                    try:
+                        obj = json.loads(line)
+                        key = str(obj.get(self.cache_key_name) or "")
+                        if not key:
+                            continue
+                        if self._index.get(key, (None,))[0] == line_offset:
+                            self._search_index.add(key, self._decompress(obj))
+                        elif key not in self._index:
+                            self._search_index.remove(key)
+                        search_updated = True
+                    except Exception as e:
+                        logger.error(f"Skipping cache line at offset {line_offset} in {self.cache_file}: {e}")
+        except Exception as e:
+            logger.error(f"Error rebuilding search index from {self.cache_file}: {e}")
+        return search_updated
+
+    @staticmethod
+    def _stat_file_id(stat_result: os.stat_result) -> tuple[int, int]:
+        return stat_result.st_dev, stat_result.st_ino
+
+    def refresh(self) -> bool:
+        """
+        Load the lines appended to the cache file by other processes since the last read
+        
+        If the file has been replaced (e.g. compacted by another process) the whole cache is reloaded.
+        
+        Returns:
+            bool: True if there were changes, False otherwise
+        """
+        with self._write_lock:
+            self._last_refresh = time.monotonic()
+            try:
+                stat_result = self.cache_file.stat()
+            except FileNotFoundError:
+                return False
+            
+            if self._stat_file_id(stat_result) != self._file_id or stat_result.st_size < self._read_offset:
+                logger.info(f"Cache file {self.cache_file} was replaced. Reloading it")
+                self._reload()
+                return True
+            return self._read_tail(stat_result)
+
+    def _read_tail(self, stat_result: os.stat_result | None = None) -> bool:
+        """
+        Parse the lines appended after the read offset, as long as the cache file hasn't been replaced
+        
+        Args:
+            stat_result (os.stat_result, optional): Current status of the cache file
+        
+        Returns:
+            bool: True if there were new lines, False otherwise
+        """
+        if stat_result is None:
+            try:
+                stat_result = self.cache_file.stat()
+            except FileNotFoundError:
+                return False
+        if self._stat_file_id(stat_result) != self._file_id or stat_result.st_size <= self._read_offset:
+            return False
+        
+        keys_before = len(self._index)
+        self._ingest(self._read_offset)
+        logger.info(f"Followed {self.cache_file} up to offset {self._read_offset} ({len(self._index) - keys_before:+} items)")
+        return True
+
+    def _catch_up(self) -> bool:
+        """
+        Load the lines other processes appended to the cache file (call it holding the file lock)
+        
+        Returns:
+            bool: True if the in-memory state now covers the cache file up to the read offset, False
+                if the file is missing or was replaced since it was loaded
+        """
+        try:
+            stat_result = self.cache_file.stat()
+        except FileNotFoundError:
+            return False
+        if self._stat_file_id(stat_result) != self._file_id:
+            return False
+        self._read_tail(stat_result)
+        return True
+
+    def _reload(self):
+        """
+        Discard the in-memory state and load the cache file again
+        """
+        self.flush()
+        self._index, self._timestamps, self._own_writes = {}, {}, {}
+        self._cache.clear()
+        self._resident_sizes.clear()
+        self._resident_bytes = 0
+        self._field_indexes = build_indexes(self._field_indexes)
+        if self._search_index is not None:
+            self._search_index = FullTextIndex(self._search_index.fields)
+        self._lines_since_snapshot = 0
+        self._load_cache()
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool = False) -> Iterator[None]:
+        """
+        Hold the inter-process lock of the cache file
+        
+        Appending to the file takes it shared, so several processes can append at the same time,
+        while replacing the file (compaction) takes it exclusive, so no line is appended to the
+        replaced file in the meantime.
+        
+        Args:
+            exclusive (bool, optional): Take the lock exclusively
+        """
+        with open(self.lock_file, mode='a') as lock:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+    def _maybe_refresh(self):
+        """
+        Refresh the cache from the file when following it and the refresh interval has elapsed
+        """
+        if self.follow and time.monotonic() - self._last_refresh >= self.follow_interval:
+            self.refresh()
+
+    def start_watching(self) -> threading.Thread:
+        """
+        Refresh the cache as soon as the cache file changes, using file system notifications
+        
+        Returns:
+            threading.Thread: Daemon thread watching the cache file
+        """
+        from watchfiles import watch
+        
+        def watch_cache_file():
+            for _ in watch(self.cache_dir, watch_filter=lambda _, path: Path(path) == self.cache_file):
+                self.refresh()
+        
+        watcher_thread = threading.Thread(target=watch_cache_file, daemon=True)
+        watcher_thread.start()
+        return watcher_thread
+
+    @property
+    def _snapshot_signature(self) -> dict[str, Any]:
+        """
+        Settings the contents of a snapshot depend on
+        """
+        return {
+            "cache_key_name": self.cache_key_name,
+            "indexed_fields": list(self._field_indexes),
+            "timestamp_field": self.timestamp_field if self.ttl is not None else None,
+        }
+
+    def _restore_snapshot(self, field_values: dict[str, dict[str, Any]]) -> int:
+        """
+        Restore the in-memory state from the binary snapshot, if there's a valid one
+        
+        Args:
+            field_values (dict): Values of the indexed fields per key, filled with the snapshot ones
+        
+        Returns:
+            int: Offset of the cache file covered by the snapshot (0 if it wasn't restored)
+        """
+        snapshot = read_snapshot(self.snapshot_file, self.cache_file, self._snapshot_signature)
+        if snapshot is None:
+            return 0
+        
+        covered_offset, line_count, records = snapshot
+        try:
+            for key, offset, length, timestamp, values, obj in records:
+                self._index[key] = (offset, length)
+                if timestamp is not None:
+                    self._timestamps[key] = timestamp
+                for field, field_value in values.items():
+                    field_values[field][key] = field_value
+                if not self.lazy and obj is not None:
+                    self._make_resident(key, obj)
+        except Exception as e:
+            logger.error(f"Error restoring cache snapshot {self.snapshot_file}: {e}")
+            self._index, self._timestamps = {}, {}
+            self._cache.clear()
+            self._resident_sizes.clear()
+            self._resident_bytes = 0
+            for values in field_values.values():
+                values.clear()
+            return 0
+        
+        self._line_count = line_count
+        logger.info(f"Restored {len(self._index)} items from snapshot {self.snapshot_file}")
+        return covered_offset
+
+    def save_snapshot(self) -> bool:
+        """
+        Write a binary snapshot of the in-memory state covering the cache file up to the read offset
+        
+        The full-text index, if any, is saved along with it.
+        
+        Returns:
+            bool: True if the snapshot was written, False otherwise
+        """
+        with self._write_lock:
+            if not self.flush():
+                return False
+            records = ((key, 
+                        offset, 
+                        length, 
+                        self._timestamps.get(key), 
+                        {field: field_index.value_of(key) for field, field_index in self._field_indexes.items()},
+                        None if self.lazy else self._cache.get(key))
+                       for key, (offset, length) in self._index.items())
+            try:
+                with self._file_lock():
+                    # Only the lines this instance has loaded are covered: catch up with the other writers first
+                    if not self._catch_up():
+                        return False
+                    write_snapshot(self.snapshot_file, 
+                                   self.cache_file, 
+                                   self._read_offset,
+                                   self._line_count, 
+                                   records, 
+                                   self._snapshot_signature, 
+                                   compress=self.compress_snapshot)
+                    # Covering the same offset, so the search index is never behind the snapshot
+                    if self._search_index is not None:
+                        self._search_index.save(self.search_index_file, self.cache_file, self._read_offset)
+            except Exception as e:
+                logger.error(f"Error writing cache snapshot {self.snapshot_file}: {e}")
+                return False
+            self._lines_since_snapshot = 0
+        logger.info(f"Saved snapshot of {len(self._index)} items to {self.snapshot_file}")
+        return True
+
+    def _save_snapshot_if_behind(self):
+        if self._lines_since_snapshot or self._pending:
+            self.save_snapshot()
+
+    def _decompress(self, obj: dict[str, Any]) -> dict[str, Any]:
+        return obj if self._compressor is None else self._compressor.decompress(obj)
+
+    def _decompress_value(self, value: Any) -> Any:
+        return value if self._compressor is None else self._compressor.decompress_value(value)
+
+    def train_compression_dictionary(self, sample_size: int = 200) -> bool:
+        """
+        Train a new zlib dictionary for the compressed fields from the most recent entries
+        
+        Entries written before keep referring to the dictionary they were compressed with; the next
+        compaction rewrites them with the new one.
+        
+        Args:
+            sample_size (int, optional): Number of entries used for training
+        
+        Returns:
+            bool: True if a new dictionary was trained, False otherwise
+        """
+        if self._compressor is None:
+            return False
+        sample_keys = list(self._index)[-sample_size:]
+        samples = [value for _, obj in self._iter_items(sample_keys) 
+                   for field, value in self._decompress(obj).items() 
+                   if field in self._compressor.fields and isinstance(value, str)]
+        return self._compressor.train(samples) is not None
+
+    @property
+    def _retains_objects(self) -> bool:
+        """
+        Whether objects read from disk are kept in memory
+        """
+        return not self.lazy or self.max_entries is not None or self.max_bytes is not None
+
+    def _make_resident(self, key: str, obj: dict[str, Any]):
+        """
+        Keep an object in memory as the most recently used one, evicting others if over budget
+        
+        Args:
+            key (str): Key of the object
+            obj (dict): Object to keep in memory
+        """
+        self._resident_bytes -= self._resident_sizes.get(key, 0)
+        self._cache[key] = obj
+        self._cache.move_to_end(key)
+        self._resident_sizes[key] = self._index[key][1]
+        self._resident_bytes += self._resident_sizes[key]
+        
+        while self._cache and ((self.max_entries is not None and len(self._cache) > self.max_entries) or
+                               (self.max_bytes is not None and self._resident_bytes > self.max_bytes)):
+            evicted_key, _ = self._cache.popitem(last=False)
+            self._resident_bytes -= self._resident_sizes.pop(evicted_key)
+            self._evictions += 1
+            logger.debug(f"Evicted {evicted_key} from in-memory cache")
+
+    def _forget(self, key: str):
+        """
+        Remove every in-memory trace of a key
+        
+        Args:
+            key (str): Key to remove
+        """
+        self._index.pop(key, None)
+        self._timestamps.pop(key, None)
+        self._pending_objects.pop(key, None)
+        for field_index in self._field_indexes.values():
+            field_index.remove(key)
+        if key in self._cache:
+            del self._cache[key]
+            self._resident_bytes -= self._resident_sizes.pop(key)
+
+    def _track_timestamp(self, key: str, obj: dict[str, Any]):
+        """
+        Remember the timestamp of an object when a TTL is configured
+        
+        Args:
+            key (str): Key of the object
+            obj (dict): Object holding the timestamp field
+        """
+        if self.ttl is None:
+            return
+        try:
+            self._timestamps[key] = datetime.fromisoformat(str(obj[self.timestamp_field])).timestamp()
+        except (KeyError, ValueError):
+            # Entries without a valid timestamp never expire
+            self._timestamps.pop(key, None)
+
+    def _is_expired(self, key: str) -> bool:
+        """
+        Check if an entry is older than the configured TTL
+        
+        Args:
+            key (str): Key of the entry
+        
+        Returns:
+            bool: True if the entry has expired, False otherwise
+        """
+        if self.ttl is None or key not in self._timestamps:
+            return False
+        return time.time() - self._timestamps[key] > self.ttl.total_seconds()
+
+    def _read_at(self, f, location: tuple[int, int]) -> dict[str, Any] | None:
+        """
+        Read and parse the object stored at the given location of an open cache file
+        
+        Args:
+            f: Cache file opened in binary mode
+            location (tuple[int, int]): Byte offset and length of the line to read
+        
+        Returns:
+            Optional[dict]: Parsed object or None if the line can't be read
+        """
+        offset, length = location
+        f.seek(offset)
+        self._bytes_read += length
+        try:
+            return json.loads(f.read(length))
+        except json.JSONDecodeError as e:
+            logger.error(f"Error reading cache line at offset {offset} in {self.cache_file}: {e}")
+            return None
+
+    def _open_indexed_file(self):
+        """
+        Open the cache file the offsets of the index point into
+        
+        If another process replaced the file since it was loaded (e.g. compacted it), the offsets
+        aren't valid anymore, so the cache is reloaded from the new file first.
+        
+        Returns:
+            Cache file opened in binary mode
+        """
+        f = open(self.cache_file, mode='rb')
+        if self._stat_file_id(os.fstat(f.fileno())) != self._file_id:
+            f.close()
+            logger.info(f"Cache file {self.cache_file} was replaced. Reloading it")
+            with self._write_lock:
+                self._reload()
+            f = open(self.cache_file, mode='rb')
+        return f
+
+    def _read_entry(self, key: str) -> dict[str, Any] | None:
+        """
+        Read the latest line of a key from the cache file, making sure the line holds that key
+        
+        Args:
+            key (str): Key to read
+        
+        Returns:
+            Optional[dict]: Parsed object or None if the key isn't in the file
+        """
+        for attempt in range(2):
+            with self._open_indexed_file() as f:
+                location = self._index.get(key)
+                if location is None or location[0] == PENDING_OFFSET:
+                    return None
+                obj = self._read_at(f, location)
+            if obj is not None and str(obj.get(self.cache_key_name)) == key:
+                return obj
+            if attempt == 0:
+                # The file changed under the index in a way its identity doesn't tell
+                logger.warning(f"Cache line of {key} not found at its offset in {self.cache_file}. Reloading it")
+                with self._write_lock:
+                    self._reload()
+        return None
+
+    @staticmethod
+    def _serialize(serializable_structure: dict[str, Any]) -> bytes:
+        """
+        Serialize an object as a JSONL line
+        
+        Args:
+            serializable_structure (dict): Serializable structure
+        
+        Returns:
+            bytes: UTF-8 encoded line, including the trailing new line
+        """
+        buffer = io.BytesIO()
+        with jsonlines.Writer(buffer) as writer:
+            writer.write(serializable_structure)
+        return buffer.getvalue()
+
+    def _enqueue(self, key: str, serializable_structure: dict[str, Any]) -> int:
+        """
+        Serialize an object as a JSONL line and add it to the write buffer
+        
+        Args:
+            key (str): Key of the object
+            serializable_structure (dict): Serializable structure to be written
+        
+        Returns:
+            int: Length in bytes of the serialized line
+        """
+        line = self._serialize(serializable_structure)
+        
+        self._pending.append((key, line))
+        self._line_count += 1
+        return len(line)
+
+    def _maybe_flush(self) -> bool:
+        """
+        Write the buffered lines if the batch is full, otherwise make sure a flush is scheduled
+        
+        Returns:
+            bool: False if a write was attempted and failed, True otherwise
+        """
+        if len(self._pending) >= self.write_batch_size:
+            return self.flush()
+        if self.flush_interval is not None and self._flush_timer is None:
+            self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+        return True
+
+    def flush(self) -> bool:
+        """
+        Append all the buffered lines to the cache file in a single write
+        
+        Lines that can't be written stay in the buffer and are retried on the next flush.
+        
+        Returns:
+            bool: True if the buffer was written (or was empty), False otherwise
+        """
+        with self._write_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._pending:
+                return True
+            
+            if self.follow:
+                # Catch up with other writers first, so the snapshots below cover what's in memory
+                self._read_tail()
+            
+            try:
+                with self._latencies["flush"].measure(), self._file_lock(), open(self.cache_file, mode='ab') as f:
+                    offset = f.tell()
+                    data = b"".join(line for _, line in self._pending)
+                    f.write(data)
+                    f.flush()
+                    if self.durable:
+                        os.fsync(f.fileno())
+                    file_id = self._stat_file_id(os.fstat(f.fileno()))
+                self._bytes_written += len(data)
+            except Exception as e:
+                logger.error(f"Error writing {len(self._pending)} buffered lines to cache {self.cache_file}: {e}")
+                return False
+            
+            # Point the index to the written lines (the last line of a key wins)
+            start_offset = offset
+            locations: dict[str, tuple[int, int]] = {}
+            for key, line in self._pending:
+                locations[key] = (offset, len(line))
+                offset += len(line)
+            if start_offset == self._read_offset:
+                self._read_offset, self._file_id = offset, file_id
+            else:
+                # Other processes appended lines in between, to be read on the next refresh
+                self._own_writes[start_offset] = offset
+            for key, location in locations.items():
+                if key in self._index and self._index[key][0] == PENDING_OFFSET:
+                    self._index[key] = location
+            
+            logger.debug(f"Flushed {len(self._pending)} lines to cache {self.cache_file}")
+            self._lines_since_snapshot += len(self._pending)
+            self._pending = []
+            self._pending_objects = {}
+            
+            if self.snapshot_every is not None and self._lines_since_snapshot >= self.snapshot_every:
+                self.save_snapshot()
+            return True
+
+    def __enter__(self) -> "BasicInMemoryCache":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
+
+    @property
+    def stale_ratio(self) -> float:
+        """
+        Ratio of lines in the cache file that don't correspond to a live entry
+        
+        Returns:
+            float: Stale lines over total lines (0.0 for an empty file)
+        """
+        if not self._line_count:
+            return 0.0
+        return (self._line_count - len(self._index)) / self._line_count
+
+    def _maybe_compact(self):
+        """
+        Compact the cache file if the stale ratio exceeds the configured threshold
+        """
+        if self.compaction_threshold is None or self._line_count < self.min_compaction_lines:
+            return
+        if self.stale_ratio > self.compaction_threshold:
+            self.compact()
+
+    def compact(self) -> bool:
+        """
+        Rewrite the cache file with only the live entries
+        
+        The live entries are written to a temporary file in the cache directory which then
+        atomically replaces the cache file, so readers never see a partially written file. The
+        file is locked against the other processes while it's rewritten, and the lines they
+        appended since it was last read are loaded first, so they're kept.
+        
+        Returns:
+            bool: True if the cache file was compacted, False otherwise
+        """
+        with self._write_lock:
+            if not self.flush() or not self.cache_file.exists():
+                return False
+            
+            lines_before = self._line_count
+            new_index: dict[str, tuple[int, int]] = {}
+            tmp_path = None
+            with self._file_lock(exclusive=True):
+                stat_result = self.cache_file.stat()
+                replaced = self._stat_file_id(stat_result) != self._file_id
+                if not replaced:
+                    self._read_tail(stat_result)
+                    try:
+                        with tempfile.NamedTemporaryFile(mode='wb', 
+                                                         dir=self.cache_dir, 
+                                                         prefix=f".{self.cache_file.name}.", 
+                                                         suffix=".compacting", 
+                                                         delete=False) as tmp:
+                            tmp_path = Path(tmp.name)
+                            with open(self.cache_file, mode='rb') as f:
+                                for key, (offset, length) in self._index.items():
+                                    f.seek(offset)
+                                    line = f.read(length)
+                                    if self._compressor is not None:
+                                        # Recompress with the current dictionary
+                                        stored = self._compressor.compress(self._decompress(json.loads(line)))
+                                        line = self._serialize(stored)
+                                    if not line.endswith(b"\n"):
+                                        line += b"\n"
+                                    new_index[key] = (tmp.tell(), len(line))
+                                    tmp.write(line)
+                                    self._bytes_written += len(line)
+                            tmp.flush()
+                            os.fsync(tmp.fileno())
+                        os.replace(tmp_path, self.cache_file)
+                    except Exception as e:
+                        logger.error(f"Error compacting cache {self.cache_file}: {e}")
+                        if tmp_path is not None:
+                            tmp_path.unlink(missing_ok=True)
+                        return False
+                    stat_result = self.cache_file.stat()
+            
+            if replaced:
+                # Another process compacted it first: pick up its layout instead
+                logger.info(f"Cache file {self.cache_file} was replaced. Reloading it")
+                self._reload()
+                return False
+            
+            self._index = new_index
+            self._line_count = len(new_index)
+            self._own_writes = {}
+            self._read_offset, self._file_id = stat_result.st_size, self._stat_file_id(stat_result)
+        logger.info(f"Compacted cache {self.cache_file} from {lines_before} to {self._line_count} lines")
+        
+        # The snapshots refer to the old file layout
+        self.save_search_index()
+        if self.snapshot_every is not None:
+            self.save_snapshot()
+        return True
+
+    def _iter_items(self, keys: Iterable[str] | None = None) -> Iterator[tuple[str, dict[str, Any]]]:
+        """
+        Iterate over the live (key, object) pairs in the cache, reading from disk the ones not in memory
+        
+        Args:
+            keys (Iterable[str], optional): Keys to iterate over. Defaults to all the keys in the cache
+        
+        Yields:
+            tuple[str, dict]: Cache key and its object
+        """
+        if not self._index or not self.flush():
+            return
+        
+        with self._open_indexed_file() as f:
+            for key in list(self._index if keys is None else keys):
+                location = self._index.get(key)
+                if location is None or self._is_expired(key):
+                    continue
+                obj = self._cache.get(key)
+                if obj is None:
+                    obj = self._read_at(f, location)
+                    if obj is not None and str(obj.get(self.cache_key_name)) != key:
+                        obj = self._read_entry(key)
+                if obj is not None:
+                    yield key, obj
+
+    @property
+    def keys(self) -> list[str]:
+        """
+        Retrieve all keys from the cache
+        
+        Returns:
+            list[str]: List of keys in the cache
+        """
+        self._maybe_refresh()
+        return [key for key in self._index if not self._is_expired(key)]
+        
+
+    def build_dict_with(self, *obj_attrs: str, sep: str = " - ", keys: Iterable[str] | None = None) -> dict:
+        """
+        Build a dictionary from the cache based on the specified object attributes
+        
+        When all the attributes have a secondary index, the values are taken from the indexes
+        and no object is read.
+        
+        Args:
+            *obj_attrs (str): Attributes of the object to use as keys in the dictionary
+            keys (Iterable[str], optional): Restrict the dictionary to these keys (e.g. the result of find())
+        
+        Returns:
+            dict: Dictionary with keys from the cache and values from the specified attributes
+        """
+        if all(attr in self._field_indexes for attr in obj_attrs):
+            selected = self.keys if keys is None else [key for key in keys if self.exists(key)]
+            return {key: sep.join(str(self._field_indexes[attr].value_of(key, "N/A")) for attr in obj_attrs) 
+                    for key in selected}
+        return {key: sep.join(self._decompress_value(obj.get(attr, "N/A")) for attr in obj_attrs) 
+                for key, obj in self._iter_items(keys)}
+
+    def search(self, query: str, limit: int | None = 10, match_all: bool = True) -> list[tuple[str, float]]:
+        """
+        Search the items whose text fields contain the query keywords, ranked by BM25
+        
+        E.g. all postings mentioning Kubernetes and Rust: cache.search("kubernetes rust", limit=None)
+        
+        Args:
+            query (str): Keywords to look for
+            limit (int, optional): Maximum number of results. None returns all of them
+            match_all (bool, optional): If True, only items containing all the keywords are returned
+        
+        Returns:
+            list[tuple[str, float]]: (key, score) pairs sorted by decreasing score
+        """
+        if self._search_index is None:
+            raise ValueError("Full-text search is not enabled for this cache. Set search_fields")
+        self._maybe_refresh()
+        results = [(key, score) for key, score in self._search_index.search(query, limit=None, match_all=match_all) 
+                   if self.exists(key)]
+        return results if limit is None else results[:limit]
+
+    def save_search_index(self) -> bool:
+        """
+        Persist the full-text index, so that it doesn't need to be rebuilt on startup
+        
+        Returns:
+            bool: True if the index was saved, False otherwise
+        """
+        if self._search_index is None:
+            return False
+        with self._write_lock:
+            if not self.flush():
+                return False
+            try:
+                with self._file_lock():
+                    # Only the lines this instance has indexed are covered: catch up with the other writers first
+                    if not self._catch_up():
+                        return False
+                    self._search_index.save(self.search_index_file, self.cache_file, self._read_offset)
+            except Exception as e:
+                logger.error(f"Error saving search index {self.search_index_file}: {e}")
+                return False
+        return True
+
+    def _field_index(self, field: str) -> SortedFieldIndex:
+        if field not in self._field_indexes:
+            raise KeyError(f"Field '{field}' has no secondary index. Indexed fields: {list(self._field_indexes)}")
+        return self._field_indexes[field]
+
+    def find(self, field: str, value: Any) -> list[str]:
+        """
+        Retrieve the keys of the items whose indexed field is equal to a value (case insensitive)
+        
+        Args:
+            field (str): Indexed field
+            value (Any): Value to look up
+        
+        Returns:
+            list[str]: Keys of the matching items
+        """
+        self._maybe_refresh()
+        return [key for key in self._field_index(field).find(value) if not self._is_expired(key)]
+
+    def find_prefix(self, field: str, prefix: str) -> list[str]:
+        """
+        Retrieve the keys of the items whose indexed field starts with a prefix (case insensitive)
+        
+        Args:
+            field (str): Indexed field
+            prefix (str): Prefix to look up
+        
+        Returns:
+            list[str]: Keys of the matching items, sorted by the field value
+        """
+        self._maybe_refresh()
+        return [key for key in self._field_index(field).find_prefix(prefix) if not self._is_expired(key)]
+
+    def find_range(self, field: str, low: Any | None = None, high: Any | None = None) -> list[str]:
+        """
+        Retrieve the keys of the items whose indexed field is in the range [low, high)
+        
+        E.g. postings from company X in the last 30 days:
+        
+            since = datetime.now() - timedelta(days=30)
+            set(cache.find("company", "X")) & set(cache.find_range("extracted_at", low=since))
+        
+        Args:
+            field (str): Indexed field
+            low (Any, optional): Inclusive lower bound. None means unbounded
+            high (Any, optional): Exclusive upper bound. None means unbounded
+        
+        Returns:
+            list[str]: Keys of the matching items, sorted by the field value
+        """
+        self._maybe_refresh()
+        return [key for key in self._field_index(field).find_range(low, high) if not self._is_expired(key)]
+
+    def is_empty(self) -> bool:
+        """
+        Check if the cache is empty
+        
+        Returns:
+            bool: True if the cache is empty, False otherwise
+        """
+        return not self.keys
+    
+    
+    def get(self, key: str) -> dict[str, Any] | None:
+        """
+        Retrieve a cached item by its key
+        
+        Args:
+            key (str): Key to look up in the cache
+        
+        Returns:
+            Optional[dict]: Cached item or None if not found or expired
+        """
+        self._gets += 1
+        with self._latencies["get"].measure():
+            return self._get(key)
+
+    def _get(self, key: str) -> dict[str, Any] | None:
+        """
+        Look up an item in memory, in the write buffer or in the cache file, updating the counters
+        
+        Args:
+            key (str): Key to look up in the cache
+        
+        Returns:
+            Optional[dict]: Cached item or None if not found or expired
+        """
+        self._maybe_refresh()
+        if key not in self._index:
+            self._misses += 1
+            return None
+        
+        if self._is_expired(key):
+            logger.info(f"Cached item with key {key} expired")
+            self._expirations += 1
+            self._misses += 1
+            return None
+        
+        obj = self._cache.get(key)
+        if obj is not None:
+            self._cache.move_to_end(key)
+            self._hits += 1
+            return self._decompress(obj)
+        
+        obj = self._pending_objects.get(key)
+        if obj is not None:
+            self._hits += 1
+            return self._decompress(obj)
+        
+        obj = self._read_entry(key)
+        if obj is None:
+            self._misses += 1
+            return None
+        
+        try:
+            decompressed = self._decompress(obj)
+        except KeyError as e:
+            logger.error(f"Can't decompress cached item with key {key}: {e}")
+            self._misses += 1
+            return None
+        self._hits += 1
+        if self._retains_objects:
+            self._make_resident(key, obj)
+        return decompressed
+    
+    def stats(self) -> dict[str, Any]:
+        """
+        Retrieve the usage counters of the cache
+        
+        Returns:
+            dict: Operation counts, hit rate, evictions, expirations, bytes read and written, load time,
+                in-memory footprint and the latency summary of gets, puts and flushes
+        """
+        return {
+            "entries": len(self._index),
+            "resident_entries": len(self._cache),
+            "resident_bytes": self._resident_bytes,
+            "gets": self._gets,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": self._hits / self._gets if self._gets else 0.0,
+            "puts": self._puts,
+            "overwrites": self._overwrites,
+            "evictions": self._evictions,
+            "expirations": self._expirations,
+            "bytes_read": self._bytes_read,
+            "bytes_written": self._bytes_written,
+            "load_seconds": self._load_seconds,
+            "latencies": {operation: histogram.summary() for operation, histogram in self._latencies.items()},
+        }
+    
+
+    def put(self, serializable_structure: dict[str, Any], overwrite: bool = False) -> bool:
+        """
+        Save an item to cache using the specified cache key name
+        
+        Args:
+            serializable_structure (dict): Serializable structure to be cached
+        
+        Returns:
+            bool: True if item was added to cache, False if item already exists
+        """
+        with self._latencies["put"].measure(), self._write_lock:
+            added = self._put(serializable_structure, overwrite)
+            if added and not self._maybe_flush():
+                return False
+        
+        if added:
+            self._maybe_compact()
+        return added
+
+    def put_many(self, serializable_structures: Iterable[dict[str, Any]], overwrite: bool = False) -> int:
+        """
+        Save several items to cache, writing them to the cache file in a single batch
+        
+        Args:
+            serializable_structures (Iterable[dict]): Serializable structures to be cached
+            overwrite (bool, optional): Replace the items that already exist
+        
+        Returns:
+            int: Number of items added to the cache
+        """
+        with self._write_lock:
+            added = sum(self._put(structure, overwrite) for structure in serializable_structures)
+            self.flush()
+        
+        self._maybe_compact()
+        return added
+
+    def _put(self, serializable_structure: dict[str, Any], overwrite: bool) -> bool:
+        """
+        Add an item to the in-memory structures and to the write buffer, without flushing it
+        
+        Args:
+            serializable_structure (dict): Serializable structure to be cached
+            overwrite (bool): Replace the item if it already exists
+        
+        Returns:
+            bool: True if item was added to cache, False if item already exists
+        """
+        # Get the cache index using the specified cache key name
+        if not self.cache_key_name in serializable_structure:
+            raise KeyError(f"Cache key name '{self.cache_key_name}' not found in serializable structure")
+        
+        cache_index = serializable_structure[self.cache_key_name]        
+        
+        try:                        
+            overwriting = self.exists(str(cache_index))
+            if overwriting:
+                if not overwrite:
+                    logger.warning(f"Value found ({cache_index}) for cache key name '{self.cache_key_name}' but we can't overwrite")
+                    return False
+                logger.warning(f"Item with key {cache_index} already exists in cache. Overwriting...")
+
+            # Large fields are kept compressed both in the file and in memory
+            stored = serializable_structure
+            if self._compressor is not None:
+                stored = self._compressor.compress(serializable_structure)
+            
+            # Buffer the new line; its location is known once it's flushed to the JSONL file
+            length = self._enqueue(str(cache_index), stored)
+            
+            # Update in-memory index and cache possibly overwriting them
+            self._index[str(cache_index)] = (PENDING_OFFSET, length)
+            self._pending_objects[str(cache_index)] = stored
+            for field, field_index in self._field_indexes.items():
+                field_index.add(str(cache_index), serializable_structure.get(field))
+            if self._search_index is not None:
+                self._search_index.add(str(cache_index), serializable_structure)
+            self._track_timestamp(str(cache_index), serializable_structure)
+            if self._retains_objects:
+                self._make_resident(str(cache_index), stored)
+            
+            logger.info(f"Cached new item with key: {cache_index}")
+        
+        except Exception as e:
+            logger.error(f"Error saving to cache: {e}")
+            return False
+        
+        self._puts += 1
+        self._overwrites += overwriting
+        
+        return True
+
+    def delete(self, key: str) -> bool:
+        """
+        Remove an item from the cache, appending a tombstone line to the cache file
+        
+        Args:
+            key (str): Key of the item to remove
+        
+        Returns:
+            bool: True if the item was removed, False if it wasn't in the cache
+        """
+        if not self.exists(key):
+            return False
+        
+        with self._write_lock:
+            try:
+                self._enqueue(key, {self.cache_key_name: key, TOMBSTONE_FIELD: True})
+            except Exception as e:
+                logger.error(f"Error deleting {key} from cache: {e}")
+                return False
+            
+            self._forget(key)
+            if self._search_index is not None:
+                self._search_index.remove(key)
+            logger.info(f"Deleted item with key: {key}")
+            if not self._maybe_flush():
+                return False
+        
+        self._maybe_compact()
+        return True
+                        
+    def exists(self, key_value: str) -> bool:
+        """
+        Check if an item exists in the cache based on the specified cache key
+        
+        Args:
+            key_value (str): Value of the cache key to look up
+        
+        Returns:
+            bool: True if item exists in cache (and hasn't expired), False otherwise
+        """
+        self._maybe_refresh()
+        return key_value in self._index and not self._is_expired(key_value)
@@ -0,0 +1,157 @@
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from typing import Any, Iterable
+
+
+def normalize_index_value(value: Any) -> str:
+    """
+    Normalize a field value so that it can be compared and sorted in a secondary index
+    
+    Strings are case folded (so lookups and prefix queries are case insensitive) and datetimes
+    are turned into ISO strings, which sort chronologically like the stored timestamps.
+    
+    Args:
+        value (Any): Value to normalize
+    
+    Returns:
+        str: Normalized value
+    """
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return str(value).strip().casefold()
+
+
+class SortedFieldIndex:
+    """
+    Secondary index over one field of the cached objects
+    
+    Keeps the (normalized value, key) pairs in a sorted list, so exact, prefix and range
+    lookups are binary searches plus the size of the result.
+    """
+    
+    def __init__(self, field: str):
+        """
+        Initialize an empty index
+        
+        Args:
+            field (str): Name of the indexed field
+        """
+        self.field = field
+        self._entries: list[tuple[str, str]] = []
+        # Original value of the field for each indexed key
+        self._values: dict[str, Any] = {}
+    
+    def __len__(self) -> int:
+        return len(self._values)
+    
+    def load(self, values: dict[str, Any]):
+        """
+        Replace the contents of the index, sorting all the entries at once
+        
+        Args:
+            values (dict): Field value of each key
+        """
+        self._values = {key: value for key, value in values.items() if value is not None}
+        self._entries = sorted((normalize_index_value(value), key) for key, value in self._values.items())
+    
+    def add(self, key: str, value: Any):
+        """
+        Index (or re-index) the field value of a key
+        
+        Args:
+            key (str): Cache key
+            value (Any): Value of the field. None removes the key from the index
+        """
+        self.remove(key)
+        if value is None:
+            return
+        self._values[key] = value
+        insort(self._entries, (normalize_index_value(value), key))
+    
+    def remove(self, key: str):
+        """
+        Remove a key from the index
+        
+        Args:
+            key (str): Cache key
+        """
+        if key not in self._values:
+            return
+        entry = (normalize_index_value(self._values.pop(key)), key)
+        position = bisect_left(self._entries, entry)
+        if position < len(self._entries) and self._entries[position] == entry:
+            del self._entries[position]
+    
+    def value_of(self, key: str, default: Any = None) -> Any:
+        """
+        Original value of the field for a key
+        
+        Args:
+            key (str): Cache key
+            default (Any, optional): Value returned if the key isn't indexed
+        
+        Returns:
+            Any: Value of the field
+        """
+        return self._values.get(key, default)
+    
+    def _slice(self, start: int, end: int) -> list[str]:
+        return [key for _, key in self._entries[start:end]]
+    
+    def find(self, value: Any) -> list[str]:
+        """
+        Keys whose field is equal to the given value
+        
+        Args:
+            value (Any): Value to look up
+        
+        Returns:
+            list[str]: Matching keys
+        """
+        normalized = normalize_index_value(value)
+        start = bisect_left(self._entries, (normalized,))
+        end = bisect_right(self._entries, (normalized, "\U0010ffff"))
+        return self._slice(start, end)
+    
+    def find_prefix(self, prefix: str) -> list[str]:
+        """
+        Keys whose field starts with the given prefix
+        
+        Args:
+            prefix (str): Prefix to look up
+        
+        Returns:
+            list[str]: Matching keys, sorted by field value
+        """
+        normalized = normalize_index_value(prefix)
+        start = bisect_left(self._entries, (normalized,))
+        end = bisect_left(self._entries, (normalized + "\U0010ffff",))
+        return self._slice(start, end)
+    
+    def find_range(self, low: Any | None = None, high: Any | None = None) -> list[str]:
+        """
+        Keys whose field is in the range [low, high)
+        
+        Args:
+            low (Any, optional): Inclusive lower bound. None means unbounded
+            high (Any, optional): Exclusive upper bound. None means unbounded
+        
+        Returns:
+            list[str]: Matching keys, sorted by field value
+        """
+        start = 0 if low is None else bisect_left(self._entries, (normalize_index_value(low),))
+        end = len(self._entries) if high is None else bisect_left(self._entries, (normalize_index_value(high),))
+        return self._slice(start, end)
+
+
+def build_indexes(fields: Iterable[str]) -> dict[str, SortedFieldIndex]:
+    """
+    Create an empty secondary index for each field
+    
+    Args:
+        fields (Iterable[str]): Names of the fields to index
+    
+    Returns:
+        dict[str, SortedFieldIndex]: Index of each field
+    """
+    return {field: SortedFieldIndex(field) for field in fields}
@@ -0,0 +1,104 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+import threading
+import time
+from typing import Any, Iterator
+
+
+# Upper bounds (in seconds) of the latency buckets, from 100µs to 10s
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class LatencyHistogram:
+    """
+    Histogram of operation latencies with fixed, roughly logarithmic buckets
+    
+    Percentiles are estimated with the upper bound of the bucket they fall in, which is
+    accurate enough to tell memory hits (µs) from disk reads (ms) or scraping (s).
+    """
+    
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        """
+        Initialize an empty histogram
+        
+        Args:
+            buckets (tuple[float, ...], optional): Sorted upper bounds of the buckets in seconds.
+                Slower operations go to an extra overflow bucket
+        """
+        self.buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self._count = 0
+        self._total = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+    
+    def record(self, seconds: float):
+        """
+        Add an observation to the histogram
+        
+        Args:
+            seconds (float): Latency of the operation
+        """
+        with self._lock:
+            self._counts[bisect_left(self.buckets, seconds)] += 1
+            self._count += 1
+            self._total += seconds
+            self._max = max(self._max, seconds)
+    
+    @contextmanager
+    def measure(self) -> Iterator[None]:
+        """
+        Record the time spent in a block of code
+        
+        E.g.:
+            
+            with histogram.measure():
+                do_something()
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(time.perf_counter() - start)
+    
+    def percentile(self, fraction: float) -> float:
+        """
+        Estimate a percentile of the recorded latencies
+        
+        Args:
+            fraction (float): Percentile as a fraction (e.g. 0.99)
+        
+        Returns:
+            float: Upper bound of the bucket of the percentile (the maximum for the overflow bucket),
+                or 0.0 if nothing was recorded
+        """
+        with self._lock:
+            if not self._count:
+                return 0.0
+            rank = fraction * self._count
+            accumulated = 0
+            for bucket, count in enumerate(self._counts):
+                accumulated += count
+                if accumulated >= rank and count:
+                    return min(self.buckets[bucket], self._max) if bucket < len(self.buckets) else self._max
+            return self._max
+    
+    def summary(self) -> dict[str, Any]:
+        """
+        Summarize the histogram
+        
+        Returns:
+            dict: Count, mean, p50, p90, p99 and max latencies (in milliseconds) and the count per bucket
+        """
+        with self._lock:
+            count, total, maximum, counts = self._count, self._total, self._max, list(self._counts)
+        bucket_labels = [f"<={bound * 1000:g}ms" for bound in self.buckets] + [f">{self.buckets[-1] * 1000:g}ms"]
+        return {
+            "count": count,
+            "mean_ms": total / count * 1000 if count else 0.0,
+            "p50_ms": self.percentile(0.5) * 1000,
+            "p90_ms": self.percentile(0.9) * 1000,
+            "p99_ms": self.percentile(0.99) * 1000,
+            "max_ms": maximum * 1000,
+            "buckets": {label: bucket_count for label, bucket_count in zip(bucket_labels, counts) if bucket_count},
+        }
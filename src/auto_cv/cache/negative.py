@@ -0,0 +1,168 @@
+from datetime import datetime, timedelta
+import threading
+from typing import Any
+from urllib.parse import urlsplit
+
+from llm_foundation import logger
+
+from auto_cv.cache.base import Cache
+
+
+# Prefix of the keys of the domain-wide failure records
+DOMAIN_KEY_PREFIX = "domain:"
+
+
+def url_domain(url: str) -> str:
+    """
+    Domain of a URL, without the www. prefix
+    
+    Args:
+        url (str): URL
+    
+    Returns:
+        str: Lowercase domain of the URL
+    """
+    domain = urlsplit(url).netloc.lower().split("@")[-1].split(":")[0]
+    return domain.removeprefix("www.")
+
+
+class NegativeCache:
+    """
+    Remembers failed extractions so that known-bad URLs and blocked domains fail fast
+    
+    Each failure opens a retry window that doubles with every consecutive failure (up to a
+    maximum). Failures are tracked per URL and per domain: a domain is backed off when it
+    reaches a number of consecutive failures, or straight away for failures that block the
+    whole site (e.g. rate limiting or a failed login). A success clears both records.
+    
+    The records (with the reason of the last failure) are stored in a regular cache keyed by
+    "key", so they survive restarts and are shared by the processes using the same cache.
+    """
+    
+    def __init__(self,
+                 cache: Cache,
+                 base_delay: timedelta = timedelta(minutes=5),
+                 max_delay: timedelta = timedelta(days=1),
+                 domain_failure_threshold: int = 3):
+        """
+        Initialize the negative cache
+        
+        Args:
+            cache (Cache): Cache storing the failure records, with "key" as cache key name
+            base_delay (timedelta, optional): Retry window after the first failure
+            max_delay (timedelta, optional): Maximum retry window
+            domain_failure_threshold (int, optional): Consecutive failures of the URLs of a domain
+                after which the whole domain is backed off
+        """
+        self.cache = cache
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.domain_failure_threshold = domain_failure_threshold
+        # Serializes the read-modify-write of the records by concurrent extractions
+        self._lock = threading.Lock()
+    
+    def retry_window(self, strikes: int) -> timedelta:
+        """
+        Retry window after a number of consecutive failures
+        
+        Args:
+            strikes (int): Consecutive failures (1 for the first one)
+        
+        Returns:
+            timedelta: Time to wait before retrying
+        """
+        if strikes <= 0:
+            return timedelta(0)
+        return min(self.base_delay * 2 ** min(strikes - 1, 32), self.max_delay)
+    
+    def blocked(self, url: str) -> dict[str, Any] | None:
+        """
+        Check whether a URL (or its domain) is still within a retry window
+        
+        Args:
+            url (str): URL to check
+        
+        Returns:
+            Optional[dict]: The failure record of the URL or of its domain if retries must wait,
+                None if the URL can be extracted
+        """
+        now = datetime.now()
+        for key in (url, DOMAIN_KEY_PREFIX + url_domain(url)):
+            record = self.cache.get(key)
+            if record and record.get("retry_after") and datetime.fromisoformat(record["retry_after"]) > now:
+                return record
+        return None
+    
+    def record_failure(self, url: str, reason: str, domain_wide: bool = False) -> dict[str, Any]:
+        """
+        Record a failed extraction, extending the retry windows of the URL and of its domain
+        
+        Args:
+            url (str): URL whose extraction failed
+            reason (str): Reason of the failure
+            domain_wide (bool, optional): If True, the failure affects the whole domain (e.g. the site
+                is rate limiting or blocking us) and the domain is backed off straight away
+        
+        Returns:
+            dict: Updated failure record of the URL
+        """
+        now = datetime.now()
+        domain_key = DOMAIN_KEY_PREFIX + url_domain(url)
+        with self._lock:
+            url_record = self._update(url, reason, now, count_strike=True)
+            domain_failures = (self.cache.get(domain_key) or {}).get("failures", 0) + 1
+            domain_record = self._update(domain_key,
+                                         reason,
+                                         now,
+                                         count_strike=domain_wide or domain_failures >= self.domain_failure_threshold)
+        
+        logger.warning(f"Extraction of {url} failed {url_record['failures']} times ({reason}). "
+                       f"Retrying after {url_record['retry_after']}")
+        if domain_record["retry_after"]:
+            logger.warning(f"Backing off domain {url_domain(url)} until {domain_record['retry_after']}")
+        return url_record
+    
+    def _update(self, key: str, reason: str, now: datetime, count_strike: bool) -> dict[str, Any]:
+        """
+        Add a failure to a record, opening a new retry window if it counts as a strike
+        
+        Args:
+            key (str): URL or domain key of the record
+            reason (str): Reason of the failure
+            now (datetime): Time of the failure
+            count_strike (bool): Whether the failure extends the retry window
+        
+        Returns:
+            dict: Updated record
+        """
+        record = dict(self.cache.get(key) or {"key": key, "failures": 0, "strikes": 0, "first_failed_at": now.isoformat()})
+        record["failures"] += 1
+        record["reason"] = reason
+        record["last_failed_at"] = now.isoformat()
+        if count_strike:
+            record["strikes"] += 1
+        window = self.retry_window(record["strikes"])
+        record["retry_after"] = (now + window).isoformat() if window else None
+        self.cache.put(record, overwrite=True)
+        return record
+    
+    def record_success(self, url: str):
+        """
+        Forget the failures of a URL and of its domain after a successful extraction
+        
+        Args:
+            url (str): URL successfully extracted
+        """
+        with self._lock:
+            for key in (url, DOMAIN_KEY_PREFIX + url_domain(url)):
+                if self.cache.exists(key):
+                    self.cache.delete(key)
+    
+    def failures(self) -> list[dict[str, Any]]:
+        """
+        Retrieve all the failure records
+        
+        Returns:
+            list[dict]: Failure records of URLs and domains
+        """
+        return [record for key in self.cache.keys if (record := self.cache.get(key))]
@@ -0,0 +1,190 @@
+from collections import Counter
+import json
+import math
+import os
+from pathlib import Path
+import re
+import tempfile
+from typing import Any, Iterable
+
+from llm_foundation import logger
+
+from auto_cv.cache.base import file_fingerprint
+
+
+SEARCH_INDEX_VERSION = 1
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[+#]+)?")
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Split a text in lowercase terms (keeping suffixes like in c++ or c#)
+    
+    Args:
+        text (str): Text to tokenize
+    
+    Returns:
+        list[str]: Terms of the text
+    """
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class FullTextIndex:
+    """
+    Incremental inverted index with BM25 ranking over some text fields of the cached objects
+    
+    The index can be persisted to a snapshot file together with the size of the cache file it
+    covers, so on startup only the cache lines appended after the snapshot need to be indexed.
+    """
+    
+    def __init__(self, fields: Iterable[str], k1: float = 1.5, b: float = 0.75):
+        """
+        Initialize an empty index
+        
+        Args:
+            fields (Iterable[str]): Object fields whose text is indexed
+            k1 (float, optional): BM25 term frequency saturation
+            b (float, optional): BM25 document length normalization
+        """
+        self.fields = list(fields)
+        self.k1 = k1
+        self.b = b
+        self._postings: dict[str, dict[str, int]] = {}
+        self._documents: dict[str, dict[str, int]] = {}
+        self._doc_lengths: dict[str, int] = {}
+        self._total_length = 0
+    
+    def __len__(self) -> int:
+        return len(self._documents)
+    
+    def add(self, key: str, obj: dict[str, Any]):
+        """
+        Index (or re-index) the text fields of an object
+        
+        Args:
+            key (str): Cache key of the object
+            obj (dict): Object to index
+        """
+        self.remove(key)
+        text = "\n".join(str(obj[field]) for field in self.fields if obj.get(field))
+        self._add_terms(key, Counter(tokenize(text)))
+    
+    def _add_terms(self, key: str, term_frequencies: dict[str, int]):
+        self._documents[key] = dict(term_frequencies)
+        length = sum(term_frequencies.values())
+        self._doc_lengths[key] = length
+        self._total_length += length
+        for term, frequency in term_frequencies.items():
+            self._postings.setdefault(term, {})[key] = frequency
+    
+    def remove(self, key: str):
+        """
+        Remove an object from the index
+        
+        Args:
+            key (str): Cache key of the object
+        """
+        term_frequencies = self._documents.pop(key, None)
+        if term_frequencies is None:
+            return
+        self._total_length -= self._doc_lengths.pop(key)
+        for term in term_frequencies:
+            postings = self._postings[term]
+            del postings[key]
+            if not postings:
+                del self._postings[term]
+    
+    def search(self, query: str, limit: int | None = 10, match_all: bool = True) -> list[tuple[str, float]]:
+        """
+        Rank the indexed objects against a keyword query with BM25
+        
+        Args:
+            query (str): Keywords to look for
+            limit (int, optional): Maximum number of results. None returns all of them
+            match_all (bool, optional): If True, only objects containing all the keywords are returned
+        
+        Returns:
+            list[tuple[str, float]]: (key, score) pairs sorted by decreasing score
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self._documents:
+            return []
+        
+        postings = [self._postings.get(term, {}) for term in terms]
+        if match_all:
+            # Intersect starting from the rarest term
+            candidates = set(min(postings, key=len))
+            for term_postings in postings:
+                candidates.intersection_update(term_postings)
+        else:
+            candidates = set().union(*postings)
+        
+        n_docs = len(self._documents)
+        avg_length = self._total_length / n_docs if n_docs else 0.0
+        scores: dict[str, float] = {}
+        for term_postings in postings:
+            if not term_postings:
+                continue
+            idf = math.log(1 + (n_docs - len(term_postings) + 0.5) / (len(term_postings) + 0.5))
+            for key, frequency in term_postings.items():
+                if key not in candidates:
+                    continue
+                norm = 1 - self.b + self.b * self._doc_lengths[key] / avg_length if avg_length else 1.0
+                scores[key] = scores.get(key, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + self.k1 * norm)
+        
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return ranked if limit is None else ranked[:limit]
+    
+    def save(self, path: Path, cache_file: Path, covered_offset: int):
+        """
+        Persist the index to a snapshot file, recording the part of the cache file it covers
+        
+        Args:
+            path (Path): Snapshot file
+            cache_file (Path): Cache file indexed
+            covered_offset (int): Offset of the cache file up to which all the lines have been indexed
+        """
+        snapshot = {
+            "version": SEARCH_INDEX_VERSION,
+            "fields": self.fields,
+            "covered_offset": covered_offset,
+            "fingerprint": file_fingerprint(cache_file, covered_offset) if covered_offset else "",
+            "documents": self._documents,
+        }
+        with tempfile.NamedTemporaryFile(mode='w', dir=path.parent, prefix=f".{path.name}.", delete=False) as tmp:
+            json.dump(snapshot, tmp, separators=(",", ":"))
+        os.replace(tmp.name, path)
+        logger.info(f"Saved search index with {len(self)} documents to {path}")
+    
+    def load(self, path: Path, cache_file: Path) -> int:
+        """
+        Load the index from a snapshot file if it's still valid for the cache file
+        
+        Args:
+            path (Path): Snapshot file
+            cache_file (Path): Cache file the snapshot should cover
+        
+        Returns:
+            int: Offset of the cache file up to which the index is up to date (0 if nothing was loaded)
+        """
+        if not path.exists() or not cache_file.exists():
+            return 0
+        try:
+            with open(path) as f:
+                snapshot = json.load(f)
+            covered_offset = snapshot["covered_offset"]
+            if (snapshot["version"] != SEARCH_INDEX_VERSION or
+                snapshot["fields"] != self.fields or
+                covered_offset > cache_file.stat().st_size or
+                (covered_offset and snapshot["fingerprint"] != file_fingerprint(cache_file, covered_offset))):
+                logger.info(f"Search index snapshot {path} is stale. Rebuilding it")
+                return 0
+        except Exception as e:
+            logger.error(f"Error loading search index snapshot {path}: {e}")
+            return 0
+        
+        for key, term_frequencies in snapshot["documents"].items():
+            self._add_terms(key, term_frequencies)
+        logger.info(f"Loaded search index with {len(self)} documents from {path}")
+        return covered_offset
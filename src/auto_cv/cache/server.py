@@ -0,0 +1,375 @@
+from datetime import datetime, timedelta
+import json
+import os
+from pathlib import Path
+import signal
+import socket
+import socketserver
+import threading
+from typing import Any, Iterable
+
+from llm_foundation import logger
+
+from auto_cv.cache.base import resolve_cache_dir
+from auto_cv.cache.in_memory import BasicInMemoryCache
+
+
+# Environment variable with the path of the cache server socket
+CACHE_SOCKET_ENV_VAR = "AUTO_CV_CACHE_SOCKET"
+
+# Cache methods that clients can call remotely
+REMOTE_METHODS = {
+    "keys", "build_dict_with", "is_empty", "get", "put", "put_many", "exists", "delete", "stats",
+    "find", "find_prefix", "find_range", "search", "flush", "compact",
+}
+
+# Remote methods that don't change the cache, so they can be sent again if the connection fails midway
+READ_ONLY_METHODS = {
+    "open", "keys", "build_dict_with", "is_empty", "get", "exists", "stats", "find", "find_prefix", "find_range", "search",
+}
+
+# Exceptions re-raised with their own type by the client
+REMOTE_EXCEPTIONS = {"KeyError": KeyError, "ValueError": ValueError, "TypeError": TypeError}
+
+
+def default_socket_path(app_name: str = "auto-cv", base_cache_dir: str | None = None) -> Path:
+    """
+    Path of the cache server socket (AUTO_CV_CACHE_SOCKET or ~/.<app_name>/cache.sock by default)
+    
+    Args:
+        app_name (str, optional): Name of the application
+        base_cache_dir (str, optional): Base directory for cache storage
+    
+    Returns:
+        Path: Path of the Unix socket
+    """
+    if os.getenv(CACHE_SOCKET_ENV_VAR):
+        return Path(os.environ[CACHE_SOCKET_ENV_VAR])
+    return resolve_cache_dir(app_name, "", base_cache_dir) / "cache.sock"
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$datetime": value.isoformat()}
+    if isinstance(value, timedelta):
+        return {"$timedelta": value.total_seconds()}
+    if isinstance(value, (set, tuple)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _decode(obj: dict[str, Any]) -> Any:
+    if obj.keys() == {"$timedelta"}:
+        return timedelta(seconds=obj["$timedelta"])
+    if obj.keys() == {"$datetime"}:
+        return datetime.fromisoformat(obj["$datetime"])
+    return obj
+
+
+def _dumps(message: dict[str, Any]) -> bytes:
+    return json.dumps(message, default=_encode).encode("utf-8") + b"\n"
+
+
+def _loads(line: bytes) -> dict[str, Any]:
+    return json.loads(line, object_hook=_decode)
+
+
+class CacheServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Local cache daemon serving BasicInMemoryCache instances over a Unix socket
+    
+    Keeps a single in-memory copy of each cache for all the processes of the app, and
+    serializes the operations on each cache, so writes to the JSONL files are coordinated
+    and every client sees the updates of the others straight away.
+    
+    Requests and responses are JSON lines. A request names the cache (created on first use
+    with the options of that first request), the method and its arguments.
+    """
+    
+    daemon_threads = True
+    
+    def __init__(self, socket_path: Path):
+        """
+        Bind the server to a Unix socket, replacing a stale socket file
+        
+        Args:
+            socket_path (Path): Path of the Unix socket
+        
+        Raises:
+            RuntimeError: If another server is already listening on the socket
+        """
+        self.socket_path = Path(socket_path)
+        if self.socket_path.exists():
+            try:
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                    probe.connect(str(self.socket_path))
+                raise RuntimeError(f"A cache server is already listening on {self.socket_path}")
+            except ConnectionRefusedError:
+                logger.warning(f"Removing stale cache server socket {self.socket_path}")
+                self.socket_path.unlink()
+        
+        self._caches: dict[tuple, tuple[BasicInMemoryCache, threading.Lock]] = {}
+        self._caches_lock = threading.Lock()
+        super().__init__(str(self.socket_path), CacheRequestHandler)
+    
+    def server_bind(self):
+        # The socket is created with owner-only permissions, instead of fixing them once it's already reachable
+        previous_umask = os.umask(0o177)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(previous_umask)
+    
+    def open_cache(self, spec: dict[str, Any]) -> tuple[BasicInMemoryCache, threading.Lock]:
+        """
+        Retrieve a served cache, loading it on first use
+        
+        Args:
+            spec (dict): app_name, cache_subdir, cache_file, cache_key_name, base_cache_dir and options of the cache
+        
+        Returns:
+            tuple[BasicInMemoryCache, threading.Lock]: The cache and the lock serializing its operations
+        """
+        cache_id = (spec["app_name"], spec["cache_subdir"], spec["cache_file"], spec["cache_key_name"], spec.get("base_cache_dir"))
+        with self._caches_lock:
+            if cache_id not in self._caches:
+                cache = BasicInMemoryCache(*cache_id, **spec.get("options", {}))
+                self._caches[cache_id] = (cache, threading.Lock())
+                logger.info(f"Serving cache {cache.cache_file}")
+            return self._caches[cache_id]
+    
+    def call(self, request: dict[str, Any]) -> Any:
+        """
+        Run a cache method on behalf of a client
+        
+        Args:
+            request (dict): Cache spec, method name, positional and keyword arguments
+        
+        Returns:
+            Any: Result of the method
+        """
+        method = request["method"]
+        cache, lock = self.open_cache(request["cache"])
+        if method == "open":
+            return {"cache_file": str(cache.cache_file)}
+        if method not in REMOTE_METHODS:
+            raise ValueError(f"Method '{method}' can't be called remotely")
+        with lock:
+            attribute = getattr(cache, method)
+            if method == "keys":
+                return attribute
+            return attribute(*request.get("args", []), **request.get("kwargs", {}))
+    
+    def server_close(self):
+        super().server_close()
+        for cache, lock in self._caches.values():
+            with lock:
+                cache.flush()
+        self.socket_path.unlink(missing_ok=True)
+
+
+class CacheRequestHandler(socketserver.StreamRequestHandler):
+    """
+    Handles the requests of a client connection, one JSON line at a time
+    """
+    
+    server: CacheServer
+    
+    def handle(self):
+        for line in self.rfile:
+            try:
+                response = {"ok": True, "result": self.server.call(_loads(line))}
+            except Exception as e:
+                message = e.args[0] if isinstance(e, KeyError) and e.args else str(e)
+                response = {"ok": False, "error": type(e).__name__, "message": message}
+            try:
+                self.wfile.write(_dumps(response))
+            except (TypeError, ValueError) as e:
+                self.wfile.write(_dumps({"ok": False, "error": type(e).__name__, "message": str(e)}))
+
+
+class CacheClient:
+    """
+    Client of the cache server, with the same interface as BasicInMemoryCache
+    
+    Each thread keeps its own connection to the server, which is reopened if it breaks.
+    """
+    
+    def __init__(self,
+                 app_name: str,
+                 cache_subdir: str,
+                 cache_file: str,
+                 cache_key_name: str,
+                 base_cache_dir: str | None = None,
+                 socket_path: Path | None = None,
+                 timeout: float = 30.0,
+                 **options: Any):
+        """
+        Connect to the cache server and open the cache there
+        
+        Args:
+            app_name (str): Name of the application
+            cache_subdir (str): Subdirectory for cache storage
+            cache_file (str): Name of the cache file
+            cache_key_name (str): Name of the key to use for finding elements in the cache
+            base_cache_dir (str, optional): Base directory for cache storage
+            socket_path (Path, optional): Path of the server socket. Defaults to default_socket_path()
+            timeout (float, optional): Seconds to wait for the server
+            **options: BasicInMemoryCache options, used if the server hasn't opened the cache yet
+        """
+        self.cache_key_name = cache_key_name
+        self.socket_path = Path(socket_path) if socket_path else default_socket_path(app_name, base_cache_dir)
+        self.timeout = timeout
+        self._spec = {
+            "app_name": app_name,
+            "cache_subdir": cache_subdir,
+            "cache_file": cache_file,
+            "cache_key_name": cache_key_name,
+            "base_cache_dir": base_cache_dir,
+            "options": options,
+        }
+        self._local = threading.local()
+        self.cache_file = Path(self._call("open")["cache_file"])
+        logger.info(f"Connected to cache server {self.socket_path} for {self.cache_file}")
+    
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None and not self._is_open(self._local.socket):
+            # The server closed it (e.g. it was restarted): reconnect before sending anything
+            self._disconnect()
+            connection = None
+        if connection is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(str(self.socket_path))
+            connection = self._local.connection = sock.makefile("rwb")
+            self._local.socket = sock
+        return connection
+    
+    def _is_open(self, sock: socket.socket) -> bool:
+        """
+        Check, without blocking, that the server hasn't closed an idle connection
+        """
+        sock.setblocking(False)
+        try:
+            return sock.recv(1, socket.MSG_PEEK) != b""
+        except BlockingIOError:
+            return True
+        except OSError:
+            return False
+        finally:
+            sock.settimeout(self.timeout)
+    
+    def _disconnect(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.socket.close()
+        self._local.connection = None
+    
+    def _call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        """
+        Call a cache method in the server
+        
+        Failing to connect is retried once. Once the request has been sent, only the read-only
+        methods are retried: a write may have been applied by the server before the connection failed.
+        
+        Args:
+            method (str): Name of the method
+            *args: Positional arguments
+            **kwargs: Keyword arguments
+        
+        Returns:
+            Any: Result of the method
+        """
+        request = _dumps({"cache": self._spec, "method": method, "args": args, "kwargs": kwargs})
+        for attempt in range(2):
+            sent = False
+            try:
+                connection = self._connection()
+                sent = True
+                connection.write(request)
+                connection.flush()
+                line = connection.readline()
+                if not line:
+                    raise ConnectionError("Cache server closed the connection")
+                break
+            except OSError:
+                self._disconnect()
+                if attempt or (sent and method not in READ_ONLY_METHODS):
+                    raise
+                logger.warning(f"Reconnecting to cache server {self.socket_path}")
+        
+        response = _loads(line)
+        if not response["ok"]:
+            raise REMOTE_EXCEPTIONS.get(response["error"], RuntimeError)(response["message"])
+        return response["result"]
+    
+    def close(self):
+        """
+        Close the connection of the current thread
+        """
+        self._disconnect()
+    
+    @property
+    def keys(self) -> list[str]:
+        return self._call("keys")
+    
+    def build_dict_with(self, *obj_attrs: str, sep: str = " - ", keys: Iterable[str] | None = None) -> dict:
+        return self._call("build_dict_with", *obj_attrs, sep=sep, keys=None if keys is None else list(keys))
+    
+    def is_empty(self) -> bool:
+        return self._call("is_empty")
+    
+    def get(self, key: str) -> dict[str, Any] | None:
+        return self._call("get", key)
+    
+    def put(self, serializable_structure: dict[str, Any], overwrite: bool = False) -> bool:
+        return self._call("put", serializable_structure, overwrite=overwrite)
+    
+    def put_many(self, serializable_structures: Iterable[dict[str, Any]], overwrite: bool = False) -> int:
+        return self._call("put_many", list(serializable_structures), overwrite=overwrite)
+    
+    def exists(self, key_value: str) -> bool:
+        return self._call("exists", key_value)
+    
+    def delete(self, key: str) -> bool:
+        return self._call("delete", key)
+    
+    def stats(self) -> dict[str, Any]:
+        return self._call("stats")
+    
+    def find(self, field: str, value: Any) -> list[str]:
+        return self._call("find", field, value)
+    
+    def find_prefix(self, field: str, prefix: str) -> list[str]:
+        return self._call("find_prefix", field, prefix)
+    
+    def find_range(self, field: str, low: Any | None = None, high: Any | None = None) -> list[str]:
+        return self._call("find_range", field, low, high)
+    
+    def search(self, query: str, limit: int | None = 10, match_all: bool = True) -> list[tuple[str, float]]:
+        return [tuple(result) for result in self._call("search", query, limit=limit, match_all=match_all)]
+    
+    def flush(self) -> bool:
+        return self._call("flush")
+    
+    def compact(self) -> bool:
+        return self._call("compact")
+
+
+def serve():
+    """
+    Run the cache server until it's interrupted
+    """
+    socket_path = default_socket_path()
+    server = CacheServer(socket_path)
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start())
+    logger.info(f"Cache server listening on {socket_path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        logger.info("Cache server stopped")
@@ -0,0 +1,117 @@
+import marshal
+import os
+from pathlib import Path
+import struct
+import sys
+import tempfile
+from typing import Any, Iterable, Iterator
+import zlib
+
+from llm_foundation import logger
+
+from auto_cv.cache.base import file_fingerprint
+
+
+SNAPSHOT_MAGIC = b"ACVSNAP1"
+LENGTH_PREFIX = struct.Struct(">I")
+
+# A snapshot record: (key, offset, length, timestamp, indexed field values, object or None)
+SnapshotRecord = tuple[str, int, int, float | None, dict[str, Any], dict[str, Any] | None]
+
+
+def _pack(payload: bytes) -> bytes:
+    return LENGTH_PREFIX.pack(len(payload)) + payload
+
+
+def _unpack_all(data: bytes | memoryview) -> Iterator[bytes | memoryview]:
+    view = memoryview(data)
+    position = 0
+    while position < len(view):
+        (length,) = LENGTH_PREFIX.unpack_from(view, position)
+        position += LENGTH_PREFIX.size
+        yield view[position:position + length]
+        position += length
+
+
+def write_snapshot(path: Path,
+                   cache_file: Path,
+                   covered_offset: int,
+                   line_count: int,
+                   records: Iterable[SnapshotRecord],
+                   signature: dict[str, Any],
+                   compress: bool = True):
+    """
+    Write a binary snapshot of the in-memory state of a cache
+    
+    The snapshot starts with a magic string and a length-prefixed header recording the size of the
+    cache file it covers, followed by the length-prefixed (marshal encoded) records, which are
+    zlib compressed as a whole when requested.
+    
+    Args:
+        path (Path): Snapshot file
+        cache_file (Path): Cache file the snapshot describes
+        covered_offset (int): Offset of the cache file up to which all the lines are in the records
+        line_count (int): Number of lines of the covered cache file
+        records (Iterable[SnapshotRecord]): State of each key
+        signature (dict): Cache settings the records depend on (e.g. the indexed fields)
+        compress (bool, optional): Compress the records
+    """
+    header = {
+        "python": sys.version_info[:2],
+        "signature": signature,
+        "compressed": compress,
+        "covered_offset": covered_offset,
+        "line_count": line_count,
+        "fingerprint": file_fingerprint(cache_file, covered_offset) if covered_offset else "",
+    }
+    body = b"".join(_pack(marshal.dumps(record)) for record in records)
+    if compress:
+        body = zlib.compress(body, level=1)
+    
+    with tempfile.NamedTemporaryFile(mode='wb', dir=path.parent, prefix=f".{path.name}.", delete=False) as tmp:
+        tmp.write(SNAPSHOT_MAGIC)
+        tmp.write(_pack(marshal.dumps(header)))
+        tmp.write(body)
+    os.replace(tmp.name, path)
+
+
+def read_snapshot(path: Path, 
+                  cache_file: Path, 
+                  signature: dict[str, Any]) -> tuple[int, int, Iterator[SnapshotRecord]] | None:
+    """
+    Read a binary snapshot if it's still valid for the cache file
+    
+    Args:
+        path (Path): Snapshot file
+        cache_file (Path): Cache file the snapshot should cover
+        signature (dict): Cache settings the snapshot must have been written with
+    
+    Returns:
+        Optional[tuple]: Covered offset of the cache file, number of covered lines and the records,
+            or None if there's no valid snapshot
+    """
+    if not path.exists() or not cache_file.exists():
+        return None
+    try:
+        data = path.read_bytes()
+        if not data.startswith(SNAPSHOT_MAGIC):
+            raise ValueError("Not a cache snapshot")
+        (header_length,) = LENGTH_PREFIX.unpack_from(data, len(SNAPSHOT_MAGIC))
+        header_start = len(SNAPSHOT_MAGIC) + LENGTH_PREFIX.size
+        header = marshal.loads(data[header_start:header_start + header_length])
+        covered_offset = header["covered_offset"]
+        if (header["python"] != sys.version_info[:2] or
+            header["signature"] != signature or
+            covered_offset > cache_file.stat().st_size or
+            (covered_offset and header["fingerprint"] != file_fingerprint(cache_file, covered_offset))):
+            logger.info(f"Cache snapshot {path} is stale. Ignoring it")
+            return None
+        body = data[header_start + header_length:]
+        if header["compressed"]:
+            body = zlib.decompress(body)
+    except Exception as e:
+        logger.error(f"Error reading cache snapshot {path}: {e}")
+        return None
+    
+    records = (marshal.loads(record) for record in _unpack_all(body))
+    return covered_offset, header["line_count"], records
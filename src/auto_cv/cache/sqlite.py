@@ -0,0 +1,332 @@
+import json
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import Any, Iterable
+
+from llm_foundation import logger
+
+from auto_cv.cache.base import JOB_DESCRIPTION_CACHES, resolve_cache_dir
+from auto_cv.cache.in_memory import BasicInMemoryCache
+from auto_cv.cache.metrics import LatencyHistogram
+
+
+class SQLiteCache:
+    """
+    Manages caching of json objects in a local SQLite database
+    
+    Exposes the same interface as BasicInMemoryCache, but objects are stored in a table with the
+    cache key as primary key, so lookups and overwrites don't require parsing the whole cache, and
+    several processes can safely share the same cache file (the database runs in WAL mode).
+    """
+    
+    def __init__(self,
+                app_name: str,
+                cache_subdir: str,
+                cache_file: str,
+                cache_key_name: str,
+                base_cache_dir: str | None = None,
+                busy_timeout: float = 30.0):
+        """
+        Initialize the SQLite cache
+        
+        Args:
+            app_name (str): Name of the application
+            cache_subdir (str): Subdirectory for cache storage
+            cache_file (str): Name of the SQLite database file
+            cache_key_name (str): Name of the key to use for finding elements in the cache
+            base_cache_dir (str, optional): Base directory for cache storage
+            busy_timeout (float, optional): Seconds to wait for locks held by other processes
+        """
+        self.cache_key_name = cache_key_name
+        self.cache_dir = resolve_cache_dir(app_name, cache_subdir, base_cache_dir)
+        self.cache_file = self.cache_dir / cache_file
+        
+        # The connection is shared by the threads of the process (e.g. Shiny sessions)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.cache_file,
+                                     timeout=busy_timeout,
+                                     isolation_level=None,
+                                     check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        
+        # Counters
+        self._gets = 0
+        self._hits = 0
+        self._misses = 0
+        self._puts = 0
+        self._bytes_read = 0
+        self._bytes_written = 0
+        self._latencies = {operation: LatencyHistogram() for operation in ("get", "put")}
+        
+        logger.info(f"Opened SQLite cache {self.cache_file} with {len(self.keys)} items")
+    
+    def close(self):
+        """
+        Close the underlying database connection
+        """
+        with self._lock:
+            self._conn.close()
+    
+    @property
+    def keys(self) -> list[str]:
+        """
+        Retrieve all keys from the cache
+        
+        Returns:
+            list[str]: List of keys in the cache
+        """
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT key FROM entries ORDER BY rowid")]
+    
+    def build_dict_with(self, *obj_attrs: str, sep: str = " - ", keys: Iterable[str] | None = None) -> dict:
+        """
+        Build a dictionary from the cache based on the specified object attributes
+        
+        Args:
+            *obj_attrs (str): Attributes of the object to use as keys in the dictionary
+            keys (Iterable[str], optional): Restrict the dictionary to these keys
+        
+        Returns:
+            dict: Dictionary with keys from the cache and values from the specified attributes
+        """
+        # Extract only the requested attributes in SQL to avoid deserializing whole objects
+        columns = ", ".join("json_extract(value, ?)" for _ in obj_attrs)
+        query = f"SELECT key{', ' + columns if columns else ''} FROM entries ORDER BY rowid"
+        params = [f'$."{attr}"' for attr in obj_attrs]
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        if keys is not None:
+            selected = set(keys)
+            rows = [row for row in rows if row[0] in selected]
+        return {row[0]: sep.join("N/A" if value is None else str(value) for value in row[1:]) for row in rows}
+    
+    def is_empty(self) -> bool:
+        """
+        Check if the cache is empty
+        
+        Returns:
+            bool: True if the cache is empty, False otherwise
+        """
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM entries LIMIT 1").fetchone() is None
+    
+    def get(self, key: str) -> dict[str, Any] | None:
+        """
+        Retrieve a cached item by its key
+        
+        Args:
+            key (str): Key to look up in the cache
+        
+        Returns:
+            Optional[dict]: Cached item or None if not found
+        """
+        with self._latencies["get"].measure():
+            with self._lock:
+                self._gets += 1
+                row = self._conn.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    self._misses += 1
+                    return None
+                self._hits += 1
+                self._bytes_read += len(row[0])
+            return json.loads(row[0])
+    
+    def put(self, serializable_structure: dict[str, Any], overwrite: bool = False) -> bool:
+        """
+        Save an item to cache using the specified cache key name
+        
+        Args:
+            serializable_structure (dict): Serializable structure to be cached
+            overwrite (bool, optional): Replace the item if it already exists
+        
+        Returns:
+            bool: True if item was added to cache, False if item already exists
+        """
+        if not self.cache_key_name in serializable_structure:
+            raise KeyError(f"Cache key name '{self.cache_key_name}' not found in serializable structure")
+        
+        cache_index = str(serializable_structure[self.cache_key_name])
+        
+        try:
+            with self._latencies["put"].measure():
+                stored = self._put_rows([(cache_index, json.dumps(serializable_structure))], overwrite)
+        except Exception as e:
+            logger.error(f"Error saving to cache: {e}")
+            return False
+        
+        if not stored:
+            logger.warning(f"Value found ({cache_index}) for cache key name '{self.cache_key_name}' but we can't overwrite")
+            return False
+        
+        logger.info(f"Cached new item with key: {cache_index}")
+        return True
+    
+    def put_many(self, serializable_structures: Iterable[dict[str, Any]], overwrite: bool = False) -> int:
+        """
+        Save several items to cache in a single transaction
+        
+        Args:
+            serializable_structures (Iterable[dict]): Serializable structures to be cached
+            overwrite (bool, optional): Replace the items that already exist
+        
+        Returns:
+            int: Number of items added to the cache
+        """
+        rows = []
+        for structure in serializable_structures:
+            if not self.cache_key_name in structure:
+                raise KeyError(f"Cache key name '{self.cache_key_name}' not found in serializable structure")
+            rows.append((str(structure[self.cache_key_name]), json.dumps(structure)))
+        
+        try:
+            added = self._put_rows(rows, overwrite)
+        except Exception as e:
+            logger.error(f"Error saving {len(rows)} items to cache: {e}")
+            return 0
+        
+        logger.info(f"Cached {added} of {len(rows)} items")
+        return added
+    
+    def _put_rows(self, rows: list[tuple[str, str]], overwrite: bool) -> int:
+        """
+        Insert (key, serialized value) rows in a single transaction
+        
+        Args:
+            rows (list[tuple[str, str]]): Rows to insert
+            overwrite (bool): Replace the rows whose key already exists
+        
+        Returns:
+            int: Number of rows inserted or replaced
+        """
+        if overwrite:
+            statement = """
+                INSERT INTO entries (key, value, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at
+            """
+        else:
+            statement = "INSERT OR IGNORE INTO entries (key, value, updated_at) VALUES (?, ?, ?)"
+        now = time.time()
+        
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                changes_before = self._conn.total_changes
+                self._conn.executemany(statement, [(key, value, now) for key, value in rows])
+                changes = self._conn.total_changes - changes_before
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._puts += changes
+            self._bytes_written += sum(len(value) for _, value in rows)
+        return changes
+    
+    def exists(self, key_value: str) -> bool:
+        """
+        Check if an item exists in the cache based on the specified cache key
+        
+        Args:
+            key_value (str): Value of the cache key to look up
+        
+        Returns:
+            bool: True if item exists in cache, False otherwise
+        """
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM entries WHERE key = ?", (key_value,)).fetchone() is not None
+    
+    def delete(self, key: str) -> bool:
+        """
+        Remove an item from the cache
+        
+        Args:
+            key (str): Key of the item to remove
+        
+        Returns:
+            bool: True if the item was removed, False if it wasn't in the cache
+        """
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM entries WHERE key = ?", (key,)).rowcount > 0
+        if deleted:
+            logger.info(f"Deleted item with key: {key}")
+        return deleted
+    
+    def stats(self) -> dict[str, Any]:
+        """
+        Retrieve the usage counters of the cache
+        
+        Returns:
+            dict: Number of entries, operation counts, hit rate, bytes read and written and the
+                latency summary of gets and puts
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return {
+            "entries": entries,
+            "gets": self._gets,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": self._hits / self._gets if self._gets else 0.0,
+            "puts": self._puts,
+            "bytes_read": self._bytes_read,
+            "bytes_written": self._bytes_written,
+            "latencies": {operation: histogram.summary() for operation, histogram in self._latencies.items()},
+        }
+
+
+def sqlite_cache_file(cache_file: str) -> str:
+    """
+    Name of the SQLite database file corresponding to a JSONL cache file
+    
+    Args:
+        cache_file (str): Name of the JSONL cache file
+    
+    Returns:
+        str: Name of the SQLite database file
+    """
+    return Path(cache_file).with_suffix(".sqlite").name
+
+
+def migrate_jsonl_to_sqlite(source: BasicInMemoryCache, target: SQLiteCache, overwrite: bool = False) -> int:
+    """
+    Copy the live entries of a JSONL cache into a SQLite cache in a single transaction
+    
+    Args:
+        source (BasicInMemoryCache): JSONL cache to read from
+        target (SQLiteCache): SQLite cache to write to
+        overwrite (bool, optional): Replace the entries already present in the target
+    
+    Returns:
+        int: Number of entries copied
+    """
+    rows = []
+    for key in source.keys:
+        obj = source.get(key)
+        if obj is not None:
+            rows.append((key, json.dumps(obj)))
+    copied = target._put_rows(rows, overwrite)
+    logger.info(f"Migrated {copied} of {len(rows)} items from {source.cache_file} to {target.cache_file}")
+    return copied
+
+
+def migrate():
+    """
+    One-shot migration of the job description JSONL caches to their SQLite counterparts
+    """
+    for cache_subdir, cache_file in JOB_DESCRIPTION_CACHES:
+        source = BasicInMemoryCache("auto-cv", cache_subdir, cache_file, "url", lazy=True, compaction_threshold=None)
+        if source.is_empty():
+            logger.info(f"Nothing to migrate from {source.cache_file}")
+            continue
+        target = SQLiteCache("auto-cv", cache_subdir, sqlite_cache_file(cache_file), "url")
+        migrate_jsonl_to_sqlite(source, target)
+        target.close()
@@ -0,0 +1,162 @@
+from dataclasses import dataclass
+from typing import Any
+
+from llm_foundation import logger
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.remote.webdriver import WebDriver
+
+
+# URL patterns (Network.setBlockedURLs wildcards) of the resources of each type
+RESOURCE_TYPE_PATTERNS = {
+    "image": ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico", "*.bmp"],
+    "font": ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"],
+    "media": ["*.mp4", "*.webm", "*.ogg", "*.mp3", "*.m4a", "*.m3u8", "*.mpd", "*.mov"],
+    "stylesheet": ["*.css"],
+}
+
+# Ad, analytics and tracking domains job sites load that we never need
+TRACKER_DOMAINS = (
+    "doubleclick.net",
+    "googlesyndication.com",
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googleadservices.com",
+    "facebook.net",
+    "connect.facebook.com",
+    "ads.linkedin.com",
+    "px.ads.linkedin.com",
+    "snap.licdn.com",
+    "bat.bing.com",
+    "hotjar.com",
+    "segment.io",
+    "cdn.segment.com",
+    "quantserve.com",
+    "scorecardresearch.com",
+)
+
+# Chrome features that only cost CPU, memory or bandwidth when scraping
+LIGHTWEIGHT_CHROME_ARGUMENTS = (
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-background-timer-throttling",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-notifications",
+    "--disable-client-side-phishing-detection",
+    "--disable-features=Translate,OptimizationHints,MediaRouter,InterestFeedContentSuggestions",
+    "--metrics-recording-only",
+    "--mute-audio",
+    "--no-first-run",
+)
+
+
+@dataclass(frozen=True)
+class BrowsingProfile:
+    """
+    How the scraping browsers are started and what they're allowed to download
+    
+    Pages are considered loaded once their DOM is ready with the "eager" page load strategy (our
+    readiness probes wait for the elements we need anyway), and the requests for resource types
+    and domains we never use are blocked in the browser through the DevTools protocol.
+    """
+    
+    name: str = "lightweight"
+    headless: bool = True
+    page_load_strategy: str = "eager"
+    blocked_resource_types: tuple[str, ...] = ("image", "font", "media")
+    blocked_domains: tuple[str, ...] = TRACKER_DOMAINS
+    chrome_arguments: tuple[str, ...] = LIGHTWEIGHT_CHROME_ARGUMENTS
+    window_size: tuple[int, int] | None = (1280, 1024)
+    extra_blocked_urls: tuple[str, ...] = ()
+    
+    def blocked_urls(self) -> list[str]:
+        """
+        URL patterns blocked by the profile
+        
+        Returns:
+            list[str]: Wildcard patterns for Network.setBlockedURLs
+        """
+        patterns = [pattern for resource_type in self.blocked_resource_types for pattern in RESOURCE_TYPE_PATTERNS[resource_type]]
+        patterns += [f"*://{domain}/*" for domain in self.blocked_domains]
+        patterns += [f"*://*.{domain}/*" for domain in self.blocked_domains]
+        return patterns + list(self.extra_blocked_urls)
+    
+    def chrome_options(self) -> Options:
+        """
+        Chrome options of the profile
+        
+        Returns:
+            Options: Options to start Chrome with
+        """
+        chrome_options = Options()
+        if self.headless:
+            chrome_options.add_argument("--headless")
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        for argument in self.chrome_arguments:
+            chrome_options.add_argument(argument)
+        if self.window_size:
+            chrome_options.add_argument(f"--window-size={self.window_size[0]},{self.window_size[1]}")
+        chrome_options.page_load_strategy = self.page_load_strategy
+        if "image" in self.blocked_resource_types:
+            chrome_options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        return chrome_options
+    
+    def apply(self, driver: WebDriver):
+        """
+        Install the request blocking of the profile in a running browser
+        
+        Args:
+            driver (WebDriver): Chrome driver to configure
+        """
+        blocked_urls = self.blocked_urls()
+        if not blocked_urls:
+            return
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_urls})
+        except (AttributeError, WebDriverException) as e:
+            # Not a Chromium browser, so requests can't be blocked (everything else still works)
+            logger.warning(f"Can't block requests in the {self.name} browsing profile: {e}")
+    
+    def create_driver(self) -> WebDriver:
+        """
+        Start a Chrome driver with the profile
+        
+        Returns:
+            WebDriver: Configured Chrome driver
+        """
+        driver = webdriver.Chrome(options=self.chrome_options())
+        self.apply(driver)
+        logger.info(f"WebDriver initialized with the {self.name} browsing profile")
+        return driver
+    
+    def describe(self) -> dict[str, Any]:
+        """
+        Summary of the profile, for the logs and the benchmarks
+        
+        Returns:
+            dict: Name, page load strategy and what the profile blocks
+        """
+        return {
+            "name": self.name,
+            "page_load_strategy": self.page_load_strategy,
+            "blocked_resource_types": list(self.blocked_resource_types),
+            "blocked_domains": len(self.blocked_domains),
+            "chrome_arguments": len(self.chrome_arguments),
+        }
+
+
+# Lean profile used for scraping by default
+LIGHTWEIGHT_PROFILE = BrowsingProfile()
+
+# Profile loading every page fully, as the scraper did before the browsing profiles
+FULL_PROFILE = BrowsingProfile(name="full",
+                               page_load_strategy="normal",
+                               blocked_resource_types=(),
+                               blocked_domains=(),
+                               chrome_arguments=(),
+                               window_size=None)
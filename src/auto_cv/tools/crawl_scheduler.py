@@ -0,0 +1,231 @@
+from collections import Counter
+from concurrent.futures import Future
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Dict, Tuple
+
+from llm_foundation import logger
+
+from auto_cv.cache.metrics import LatencyHistogram
+from auto_cv.cache.negative import url_domain
+from auto_cv.tools.rate_limiter import DomainRateLimiter, shared_rate_limiter
+from auto_cv.tools.web_scraper import JobPostingExtractor
+
+
+# Priorities of the extractions (lower runs first)
+INTERACTIVE_PRIORITY = 0
+BATCH_PRIORITY = 10
+
+PRIORITY_NAMES = {INTERACTIVE_PRIORITY: "interactive", BATCH_PRIORITY: "batch"}
+
+
+@dataclass(order=True)
+class CrawlJob:
+    """
+    Extraction waiting in the scheduler queue
+    """
+    
+    priority: int
+    sequence: int
+    url: str = field(compare=False)
+    refresh: bool = field(compare=False, default=False)
+    cached: bool = field(compare=False, default=False)
+    submitted_at: float = field(compare=False, default_factory=time.monotonic)
+    future: Future = field(compare=False, default_factory=Future)
+    # Whether a token of its site was taken when it was dequeued
+    reserved: bool = field(compare=False, default=False)
+
+
+class CrawlScheduler:
+    """
+    Priority queue of job posting extractions run by a pool of workers within the rate limits of each site
+    
+    Workers take the most urgent extraction whose site can be requested now, so an interactive
+    request jumps ahead of a batch refresh, and a site that is paused or out of tokens doesn't hold
+    up the workers while the postings of other sites are waiting. The token of the site is taken
+    when the extraction is dequeued, so the workers don't all pick the same site on a single free
+    token. At most max_per_domain extractions hit the same host at the same time (the LinkedIn ones
+    also share the WebDriver pool). Cached postings never wait.
+    """
+    
+    def __init__(self,
+                 extractor: JobPostingExtractor,
+                 max_workers: int = 4,
+                 rate_limiter: DomainRateLimiter | None = None,
+                 max_per_domain: int = 2):
+        """
+        Start the workers
+        
+        Args:
+            extractor (JobPostingExtractor): Extractor running the extractions
+            max_workers (int, optional): Number of concurrent extractions
+            rate_limiter (DomainRateLimiter, optional): Limiter the extractor requests go through.
+                Defaults to the one shared by the process
+            max_per_domain (int, optional): Maximum concurrent extractions per domain
+        """
+        self.extractor = extractor
+        self.rate_limiter = rate_limiter or shared_rate_limiter()
+        self.max_per_domain = max_per_domain
+        
+        self._queue: list[CrawlJob] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._in_flight = 0
+        self._in_flight_by_domain: Counter[str] = Counter()
+        self._completed = 0
+        self._failed = 0
+        self._cancelled = 0
+        self._queue_waits = {priority: LatencyHistogram() for priority in PRIORITY_NAMES}
+        self._workers = [threading.Thread(target=self._work, name=f"crawl-worker-{i}", daemon=True)
+                         for i in range(max_workers)]
+        for worker in self._workers:
+            worker.start()
+    
+    def submit(self, url: str, priority: int = BATCH_PRIORITY, refresh: bool = False) -> Future:
+        """
+        Queue the extraction of a job posting
+        
+        Args:
+            url (str): Job posting URL
+            priority (int, optional): INTERACTIVE_PRIORITY, BATCH_PRIORITY or any other int (lower runs first)
+            refresh (bool, optional): Extract the posting again even if it's cached
+        
+        Returns:
+            Future: Resolves to the extracted job details and whether it was a cache hit
+        """
+        job = CrawlJob(priority, next(self._sequence), url, refresh, cached=not refresh and self.extractor.is_cached(url))
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("The crawl scheduler is shut down")
+            heapq.heappush(self._queue, job)
+            self._condition.notify()
+        return job.future
+    
+    def extract(self, url: str, priority: int = INTERACTIVE_PRIORITY, refresh: bool = False) -> Tuple[Dict[str, str], bool]:
+        """
+        Extract a job posting through the queue, waiting for it (interactive priority by default)
+        
+        Args:
+            url (str): Job posting URL
+            priority (int, optional): Priority of the extraction
+            refresh (bool, optional): Extract the posting again even if it's cached
+        
+        Returns:
+            Extracted job details and whether it was a cache hit or not
+        """
+        return self.submit(url, priority, refresh).result()
+    
+    def _next_job(self) -> tuple[CrawlJob | None, float | None]:
+        """
+        Take the most urgent job that can run now, with a token of its site (must be called holding
+        the condition lock)
+        
+        Returns:
+            tuple: The job (None if none can run now) and, if there's none, the seconds until one
+                could run (None if the queue is empty)
+        """
+        next_delay = None
+        for job in sorted(self._queue):
+            if job.cached or job.future.cancelled():
+                delay = 0.0
+            elif self._in_flight_by_domain[url_domain(job.url)] >= self.max_per_domain:
+                # Looked at again when one of the extractions of the domain finishes
+                continue
+            else:
+                delay = self.rate_limiter.try_acquire(job.url)
+                job.reserved = delay <= 0
+            if delay <= 0:
+                self._queue.remove(job)
+                heapq.heapify(self._queue)
+                return job, None
+            next_delay = delay if next_delay is None else min(next_delay, delay)
+        return None, next_delay
+    
+    def _work(self):
+        while True:
+            with self._condition:
+                while True:
+                    job, delay = self._next_job()
+                    if job or (self._closed and not self._queue):
+                        break
+                    self._condition.wait(delay)
+                if job is None:
+                    return
+                self._in_flight += 1
+                if job.reserved:
+                    self._in_flight_by_domain[url_domain(job.url)] += 1
+                queue_wait = self._queue_waits.setdefault(job.priority, LatencyHistogram())
+            
+            queue_wait.record(time.monotonic() - job.submitted_at)
+            # The first request of the extraction uses the token taken when dequeuing it
+            with self.rate_limiter.prepaid(job.url) if job.reserved else nullcontext():
+                if job.future.set_running_or_notify_cancel():
+                    try:
+                        job.future.set_result(self.extractor.extract_raw_info_from(job.url, refresh=job.refresh))
+                    except Exception as e:
+                        logger.error(f"Scheduled extraction of {job.url} failed: {e}")
+                        job.future.set_exception(e)
+            
+            with self._condition:
+                self._in_flight -= 1
+                if job.reserved:
+                    self._in_flight_by_domain[url_domain(job.url)] -= 1
+                if job.future.cancelled():
+                    self._cancelled += 1
+                elif job.future.exception() is not None:
+                    self._failed += 1
+                else:
+                    self._completed += 1
+                # The site may have been paused or released: let the other workers look again
+                self._condition.notify_all()
+    
+    def shutdown(self, wait: bool = True, cancel_pending: bool = False):
+        """
+        Stop accepting extractions, letting the workers finish the queued ones
+        
+        Args:
+            wait (bool, optional): Wait for the workers to finish
+            cancel_pending (bool, optional): Cancel the extractions that haven't started
+        """
+        with self._condition:
+            self._closed = True
+            if cancel_pending:
+                for job in self._queue:
+                    job.future.cancel()
+                self._queue.clear()
+            self._condition.notify_all()
+        if wait:
+            for worker in self._workers:
+                worker.join()
+    
+    def stats(self) -> dict[str, Any]:
+        """
+        Retrieve the queue depth, the time extractions wait in the queue and the pacing of each site
+        
+        Returns:
+            dict: Queue depth (total and per priority), extractions in flight, completed, failed and cancelled,
+                queue wait latency summary per priority and rate limiter stats
+        """
+        with self._condition:
+            depth: dict[str, int] = {}
+            for job in self._queue:
+                name = PRIORITY_NAMES.get(job.priority, str(job.priority))
+                depth[name] = depth.get(name, 0) + 1
+            stats = {
+                "queue_depth": len(self._queue),
+                "queue_depth_by_priority": depth,
+                "in_flight": self._in_flight,
+                "completed": self._completed,
+                "failed": self._failed,
+                "cancelled": self._cancelled,
+            }
+            queue_waits = dict(self._queue_waits)
+        stats["queue_wait"] = {PRIORITY_NAMES.get(priority, str(priority)): histogram.summary()
+                               for priority, histogram in queue_waits.items()}
+        stats["sites"] = self.rate_limiter.stats()
+        return stats
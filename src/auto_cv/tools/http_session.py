@@ -0,0 +1,84 @@
+import threading
+from typing import Any
+
+from requests import Response, Session
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from auto_cv.tools.rate_limiter import RATE_LIMITED_STATUS_CODES, DomainRateLimiter, shared_rate_limiter
+
+
+# Headers sent with every request of the scrapers
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Encoding': 'gzip, deflate',
+}
+
+
+class RateLimitedSession(Session):
+    """
+    Session pacing its requests with a DomainRateLimiter, and backing off the sites that rate limit it
+    """
+    
+    def __init__(self, rate_limiter: DomainRateLimiter):
+        super().__init__()
+        self.rate_limiter = rate_limiter
+    
+    def request(self, method: str, url: str, *args: Any, **kwargs: Any) -> Response:
+        self.rate_limiter.acquire(url)
+        response = super().request(method, url, *args, **kwargs)
+        if response.status_code in RATE_LIMITED_STATUS_CODES:
+            self.rate_limiter.backoff(url, response.headers.get("Retry-After"))
+        elif response.status_code < 400:
+            self.rate_limiter.record_success(url)
+        return response
+
+
+def create_session(max_hosts: int = 32, 
+                   max_connections_per_host: int = 8, 
+                   retries: int = 2, 
+                   rate_limiter: DomainRateLimiter | None = None) -> Session:
+    """
+    Create an HTTP session keeping connections alive per host
+    
+    Args:
+        max_hosts (int, optional): Hosts whose connection pools are kept
+        max_connections_per_host (int, optional): Connections kept alive with each host
+        retries (int, optional): Retries of idempotent requests failing to connect or with a 5xx status
+        rate_limiter (DomainRateLimiter, optional): Limiter pacing the requests. None doesn't limit them
+    
+    Returns:
+        Session: Configured session
+    """
+    session = RateLimitedSession(rate_limiter) if rate_limiter else Session()
+    session.headers.update(DEFAULT_HEADERS)
+    retry = Retry(total=retries,
+                  backoff_factor=0.5,
+                  status_forcelist=(500, 502, 503, 504),
+                  allowed_methods=("GET", "HEAD"),
+                  raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=max_hosts, pool_maxsize=max_connections_per_host, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_shared_session: Session | None = None
+_shared_session_lock = threading.Lock()
+
+
+def shared_session() -> Session:
+    """
+    Retrieve the HTTP session shared by the whole process, creating it on first use
+    
+    Its requests are paced by the rate limiter shared by the process.
+    
+    Returns:
+        Session: The shared session
+    """
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            _shared_session = create_session(rate_limiter=shared_rate_limiter())
+        return _shared_session
@@ -1,9 +1,28 @@
+import threading
+
 from crewai.tools import BaseTool
 
 from auto_cv.cache import BasicInMemoryCache
+from auto_cv.tools.crawl_scheduler import INTERACTIVE_PRIORITY, CrawlScheduler
 from auto_cv.tools.web_scraper import JobPostingExtractor
 from llm_foundation import logger
 
+# Extractor shared by the tool calls, so its caches and warm WebDrivers are reused (tool calls may run
+# concurrently, so it's created under a lock)
+_extractor: JobPostingExtractor | None = None
+_extractor_lock = threading.Lock()
+
+def get_extractor() -> JobPostingExtractor:
+    global _extractor
+    with _extractor_lock:
+        if _extractor is None:
+            _extractor = JobPostingExtractor()
+        return _extractor
+
+def get_scheduler() -> CrawlScheduler:
+    # The scheduler of the extractor runs its batch extractions too, so they're paced together
+    return get_extractor().scheduler()
+
 class JobScrapperTool(BaseTool):
     name: str = "Job Scrapper Tool"
     description: str = "Extract job details from a given URL."
@@ -13,7 +32,7 @@ class JobScrapperTool(BaseTool):
         Extract job details from a given URL.
         """
         
-        extractor = JobPostingExtractor()
-        job_details, cache_hit = extractor.extract_raw_info_from(url)
+        # The agent is waiting for it, so it goes ahead of any batch extraction
+        job_details, cache_hit = get_scheduler().extract(url, priority=INTERACTIVE_PRIORITY)
         logger.info(f"Job detains (cache hit: {cache_hit}):\n{job_details}")
         return job_details
@@ -0,0 +1,99 @@
+from bs4 import BeautifulSoup
+
+from auto_cv.cache.canonical import linkedin_job_id
+
+
+# Public job posting fragment LinkedIn serves without a login
+LINKEDIN_GUEST_JOB_URL = "https://www.linkedin.com/jobs-guest/jobs/api/jobPosting/{job_id}"
+
+# Candidate ("css" or "xpath", query) selectors of each field in the guest job posting, in order of preference
+LINKEDIN_GUEST_SELECTORS = {
+    "title": [
+        ("css", "h2.top-card-layout__title"),
+        ("css", "h1.top-card-layout__title"),
+        ("css", "h3.sub-nav-cta__header"),
+        ("css", ".topcard__title"),
+    ],
+    "company": [
+        ("css", "a.topcard__org-name-link"),
+        ("css", "span.topcard__flavor"),
+        ("css", "a.sub-nav-cta__optional-url"),
+    ],
+    "raw_description": [
+        ("css", "div.show-more-less-html__markup"),
+        ("css", "div.description__text"),
+        ("css", "section.description"),
+    ],
+}
+
+# Candidate selectors of each field in the job pages the browser renders, in order of preference. The
+# browser evaluates them in the page and the stored page sources are parsed with them, so they're
+# all CSS (BeautifulSoup has no XPath)
+LINKEDIN_FIELD_SELECTORS = {
+    "title": [
+        ("css", "div.job-details-jobs-unified-top-card__job-title"),
+        ("css", "h1[class*='job-title']"),
+    ],
+    "company": [
+        ("css", "div.job-details-jobs-unified-top-card__company-name"),
+        ("css", "span[class*='company-name']"),
+    ],
+    "raw_description": [
+        ("css", ".jobs-description__container"),
+        ("css", "div[class*='description']"),
+        ("css", "#job-details"),
+        ("css", "div[id*='description']"),
+    ],
+}
+
+
+def parse_job_fields(html: str, field_selectors: dict[str, list[tuple[str, str]]]) -> dict[str, str] | None:
+    """
+    Parse the fields of a job posting with their candidate selectors (the XPath ones are skipped)
+    
+    Args:
+        html (str): HTML of the job posting
+        field_selectors (dict): Candidate ("css" or "xpath", query) selectors of each field, in order of preference
+    
+    Returns:
+        Optional[dict]: Text of each field ("N/A" if missing), or None if the page has no
+            raw_description (e.g. LinkedIn served a login or error page instead)
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    fields = {}
+    for name, selectors in field_selectors.items():
+        element = next((element for kind, query in selectors if kind == "css" and (element := soup.select_one(query))), None)
+        # Keep the paragraphs of the description apart
+        separator = "\n" if name == "raw_description" else " "
+        fields[name] = element.get_text(separator, strip=True) if element else "N/A"
+    if fields.get("raw_description", "N/A") == "N/A":
+        return None
+    return fields
+
+
+def parse_linkedin_guest_job_posting(html: str) -> dict[str, str] | None:
+    """
+    Parse the title, company and description of a guest job posting
+    
+    Args:
+        html (str): HTML of the guest job posting
+    
+    Returns:
+        Optional[dict]: title, company and raw_description ("N/A" if missing), or None if the page
+            has no job description
+    """
+    return parse_job_fields(html, LINKEDIN_GUEST_SELECTORS)
+
+
+def parse_linkedin_page_source(html: str) -> dict[str, str] | None:
+    """
+    Parse the title, company and description of a job page rendered by the browser
+    
+    Args:
+        html (str): Page source of the job page
+    
+    Returns:
+        Optional[dict]: title, company and raw_description ("N/A" if missing), or None if the page
+            has no job description
+    """
+    return parse_job_fields(html, LINKEDIN_FIELD_SELECTORS)
@@ -0,0 +1,314 @@
+from contextlib import contextmanager
+import random
+import threading
+import time
+from typing import Any, Iterator
+
+from llm_foundation import logger
+
+from auto_cv.cache.metrics import LatencyHistogram
+from auto_cv.cache.negative import url_domain
+
+
+# HTTP status codes asking us to slow down (999 is LinkedIn's)
+RATE_LIMITED_STATUS_CODES = {429, 999}
+
+# Requests per second and burst of each site. Sites not listed use the defaults of the limiter
+DEFAULT_SITE_RATES = {
+    "linkedin.com": (0.5, 2),
+    "greenhouse.io": (2.0, 5),
+    "lever.co": (2.0, 5),
+    "ashbyhq.com": (2.0, 5),
+}
+
+
+def site_of(url: str) -> str:
+    """
+    Site a URL belongs to, i.e. its registered domain, so subdomains share their rate limit
+    
+    Args:
+        url (str): URL
+    
+    Returns:
+        str: Last two labels of the domain (three for second-level country domains like co.uk)
+    """
+    labels = url_domain(url).split(".")
+    if len(labels) > 2 and len(labels[-1]) == 2 and labels[-2] in ("co", "com", "ac", "org", "net", "gov"):
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+class TokenBucket:
+    """
+    Token bucket allowing a sustained rate of requests with short bursts, which can be paused
+    """
+    
+    def __init__(self, rate: float, burst: int):
+        """
+        Initialize a full bucket
+        
+        Args:
+            rate (float): Tokens added per second
+            burst (int): Maximum tokens (requests allowed back to back)
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.blocked_until = 0.0
+        self._updated_at = time.monotonic()
+    
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+    
+    def delay(self, now: float) -> float:
+        """
+        Seconds until a token is available
+        
+        Args:
+            now (float): Current monotonic time
+        
+        Returns:
+            float: 0 if a token can be taken now
+        """
+        self._refill(now)
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+    
+    def available(self, now: float) -> float:
+        """
+        Tokens in the bucket
+        
+        Args:
+            now (float): Current monotonic time
+        
+        Returns:
+            float: Tokens available (fractional while refilling)
+        """
+        self._refill(now)
+        return self.tokens
+    
+    def take(self):
+        """
+        Take a token (the caller must have checked there's one with delay())
+        """
+        self.tokens -= 1
+    
+    def pause(self, now: float, seconds: float):
+        """
+        Stop handing out tokens for a while, starting with an empty bucket afterwards
+        
+        Args:
+            now (float): Current monotonic time
+            seconds (float): Length of the pause
+        """
+        self.blocked_until = max(self.blocked_until, now + seconds)
+        self.tokens = 0.0
+
+
+class DomainRateLimiter:
+    """
+    Paces the requests to each site with its own token bucket, backing off when a site rate limits us
+    
+    Each rate limited response (429 or LinkedIn's 999) pauses the whole site for an exponentially
+    growing, jittered time (or the Retry-After of the response, if longer), so the concurrent
+    scrapers don't retry in lockstep. A successful response resets the backoff.
+    
+    Schedulers can take a token without waiting (try_acquire) when they pick the next request, and
+    hand it to the thread sending it (prepaid), so its acquire doesn't wait for a second one.
+    """
+    
+    def __init__(self,
+                 default_rate: float = 1.0,
+                 default_burst: int = 3,
+                 site_rates: dict[str, tuple[float, int]] | None = None,
+                 base_backoff: float = 30.0,
+                 max_backoff: float = 900.0):
+        """
+        Initialize the limiter
+        
+        Args:
+            default_rate (float, optional): Requests per second of the sites without their own rate
+            default_burst (int, optional): Burst of the sites without their own rate
+            site_rates (dict, optional): (rate, burst) of specific sites. Defaults to DEFAULT_SITE_RATES
+            base_backoff (float, optional): Seconds a site is paused after its first rate limited response
+            max_backoff (float, optional): Maximum pause in seconds
+        """
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self.site_rates = DEFAULT_SITE_RATES if site_rates is None else site_rates
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        
+        self._buckets: dict[str, TokenBucket] = {}
+        self._strikes: dict[str, int] = {}
+        self._waits: dict[str, LatencyHistogram] = {}
+        self._backoffs: dict[str, int] = {}
+        self._condition = threading.Condition()
+        # Tokens taken with try_acquire, per site, for the requests of each thread
+        self._prepaid = threading.local()
+    
+    def _bucket(self, site: str) -> TokenBucket:
+        if site not in self._buckets:
+            self._buckets[site] = TokenBucket(*self.site_rates.get(site, (self.default_rate, self.default_burst)))
+        return self._buckets[site]
+    
+    def delay(self, url: str) -> float:
+        """
+        Seconds until a request to the site of a URL would be allowed, without taking a token
+        
+        Args:
+            url (str): URL to request
+        
+        Returns:
+            float: 0 if the request can be sent now
+        """
+        with self._condition:
+            return self._bucket(site_of(url)).delay(time.monotonic())
+    
+    def try_acquire(self, url: str) -> float:
+        """
+        Take a token for a request to the site of a URL if there's one, without waiting
+        
+        Args:
+            url (str): URL to request
+        
+        Returns:
+            float: 0 if the token was taken, otherwise the seconds until one is available
+        """
+        with self._condition:
+            bucket = self._bucket(site_of(url))
+            delay = bucket.delay(time.monotonic())
+            if delay <= 0:
+                bucket.take()
+            return delay
+    
+    @contextmanager
+    def prepaid(self, url: str) -> Iterator[None]:
+        """
+        Let the next request of this thread to the site of a URL use a token taken with try_acquire
+        
+        The token is given back to the site if no request used it.
+        
+        Args:
+            url (str): URL the token was taken for
+        """
+        site = site_of(url)
+        credits = self._prepaid.__dict__.setdefault("credits", {})
+        credits[site] = credits.get(site, 0) + 1
+        try:
+            yield
+        finally:
+            if credits.get(site, 0) > 0:
+                credits[site] -= 1
+                with self._condition:
+                    bucket = self._bucket(site)
+                    bucket.tokens = min(bucket.burst, bucket.tokens + 1)
+                    self._condition.notify_all()
+    
+    def acquire(self, url: str) -> float:
+        """
+        Wait until a request to the site of a URL is allowed
+        
+        Args:
+            url (str): URL to request
+        
+        Returns:
+            float: Seconds waited (0 if a prepaid token was used)
+        """
+        site = site_of(url)
+        start = time.monotonic()
+        credits = self._prepaid.__dict__.setdefault("credits", {})
+        with self._condition:
+            bucket = self._bucket(site)
+            if credits.get(site, 0) > 0:
+                credits[site] -= 1
+                # Unless the site was paused since the token was taken
+                if time.monotonic() >= bucket.blocked_until:
+                    return 0.0
+            while (delay := bucket.delay(time.monotonic())) > 0:
+                # Woken up early if a backoff of the site changes the delay
+                self._condition.wait(delay)
+            bucket.take()
+            waited = time.monotonic() - start
+            histogram = self._waits.setdefault(site, LatencyHistogram())
+        histogram.record(waited)
+        if waited > 1:
+            logger.debug(f"Waited {waited:.1f}s for the rate limit of {site}")
+        return waited
+    
+    def backoff(self, url: str, retry_after: str | None = None) -> float:
+        """
+        Pause the site of a URL after it rate limited us
+        
+        Args:
+            url (str): URL whose response was rate limited
+            retry_after (str, optional): Retry-After header of the response
+        
+        Returns:
+            float: Seconds the site is paused
+        """
+        site = site_of(url)
+        with self._condition:
+            strikes = self._strikes[site] = self._strikes.get(site, 0) + 1
+            self._backoffs[site] = self._backoffs.get(site, 0) + 1
+            window = min(self.max_backoff, self.base_backoff * 2 ** min(strikes - 1, 16))
+            # Equal jitter: at least half the window, so the pause still grows with the strikes
+            pause = window / 2 + random.uniform(0, window / 2)
+            if retry_after and retry_after.strip().isdigit():
+                pause = max(pause, float(retry_after))
+            self._bucket(site).pause(time.monotonic(), pause)
+            self._condition.notify_all()
+        logger.warning(f"{site} is rate limiting us ({strikes} in a row). Pausing it for {pause:.0f}s")
+        return pause
+    
+    def record_success(self, url: str):
+        """
+        Reset the backoff of the site of a URL after a successful response
+        
+        Args:
+            url (str): URL successfully requested
+        """
+        with self._condition:
+            self._strikes.pop(site_of(url), None)
+    
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """
+        Retrieve the pacing of each site
+        
+        Returns:
+            dict: Rate, tokens available, seconds paused, backoffs and wait latency summary per site
+        """
+        now = time.monotonic()
+        with self._condition:
+            return {
+                site: {
+                    "rate": bucket.rate,
+                    "burst": bucket.burst,
+                    "tokens": round(bucket.available(now), 2),
+                    "paused_for_s": round(max(0.0, bucket.blocked_until - now), 1),
+                    "backoffs": self._backoffs.get(site, 0),
+                    "consecutive_backoffs": self._strikes.get(site, 0),
+                    "waits": self._waits[site].summary() if site in self._waits else None,
+                }
+                for site, bucket in self._buckets.items()
+            }
+
+
+_shared_rate_limiter: DomainRateLimiter | None = None
+_shared_rate_limiter_lock = threading.Lock()
+
+
+def shared_rate_limiter() -> DomainRateLimiter:
+    """
+    Retrieve the rate limiter shared by the whole process, creating it on first use
+    
+    Returns:
+        DomainRateLimiter: The shared rate limiter
+    """
+    global _shared_rate_limiter
+    with _shared_rate_limiter_lock:
+        if _shared_rate_limiter is None:
+            _shared_rate_limiter = DomainRateLimiter()
+        return _shared_rate_limiter
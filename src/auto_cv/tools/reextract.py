@@ -0,0 +1,113 @@
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Callable, Iterable
+
+from llm_foundation import logger
+
+from auto_cv.cache import (
+    HTML_SNAPSHOT_CACHE,
+    RAW_JOB_DESCRIPTION_CACHE,
+    URL_ALIAS_CACHE,
+    Cache,
+    CanonicalKeyCache,
+    HtmlSnapshotStore,
+    UrlCanonicalizer,
+    create_cache,
+)
+from auto_cv.cache.html_snapshots import read_snapshot_blob
+from auto_cv.tools.linkedin_guest import parse_linkedin_guest_job_posting, parse_linkedin_page_source
+from auto_cv.tools.site_adapters import parse_generic_job_posting
+
+
+# Parser of the pages stored by each extraction path
+SNAPSHOT_PARSERS: dict[str, Callable[[str], dict[str, str] | None]] = {
+    "generic": parse_generic_job_posting,
+    "json_ld": parse_generic_job_posting,
+    "linkedin_guest": parse_linkedin_guest_job_posting,
+    "linkedin_browser": parse_linkedin_page_source,
+}
+
+
+def _parse_snapshot(task: tuple[str, str, str]) -> tuple[str, dict[str, str] | None]:
+    """
+    Parse a stored page (runs in the worker processes, so it only gets picklable arguments)
+    
+    Args:
+        task (tuple): URL of the posting, source of the snapshot and path of its blob
+    
+    Returns:
+        tuple: URL and parsed fields, or None if the page couldn't be parsed
+    """
+    url, source, blob_path = task
+    try:
+        return url, SNAPSHOT_PARSERS[source](read_snapshot_blob(blob_path))
+    except Exception as e:
+        logger.error(f"Failed to parse the stored page of {url}: {e}")
+        return url, None
+
+
+def reextract(store: HtmlSnapshotStore,
+              cache: Cache,
+              urls: Iterable[str] | None = None,
+              max_workers: int | None = None,
+              chunksize: int = 16) -> dict[str, int]:
+    """
+    Parse the latest stored page of the job postings again, without fetching them
+    
+    The pages are parsed in parallel across processes, while the results are merged into the
+    cached postings by the calling process only, so the cache has a single writer.
+    
+    Args:
+        store (HtmlSnapshotStore): Store with the pages
+        cache (Cache): Cache of the extracted postings, keyed by URL
+        urls (Iterable[str], optional): Postings to re-extract. Defaults to all the ones with snapshots
+        max_workers (int, optional): Number of worker processes. Defaults to the number of CPUs
+        chunksize (int, optional): Pages sent to a worker at a time
+    
+    Returns:
+        dict: Postings updated, not parsed (their cached details are kept) and skipped (no
+            snapshot or no parser for it)
+    """
+    tasks, snapshots = [], {}
+    counts = {"updated": 0, "not_parsed": 0, "skipped": 0}
+    for url in (store.urls() if urls is None else urls):
+        snapshot = store.latest(url)
+        if not snapshot or snapshot["source"] not in SNAPSHOT_PARSERS:
+            counts["skipped"] += 1
+            continue
+        snapshots[url] = snapshot
+        tasks.append((url, snapshot["source"], str(store.blob_path(snapshot["sha256"]))))
+    logger.info(f"Re-extracting {len(tasks)} job postings from their stored pages")
+    
+    updated = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for url, fields in executor.map(_parse_snapshot, tasks, chunksize=chunksize):
+            if not fields:
+                counts["not_parsed"] += 1
+                continue
+            job_details = {key: value for key, value in (cache.get(url) or {}).items() if key != "matched_selectors"}
+            updated.append({
+                **job_details,
+                **fields,
+                "url": url,
+                "extracted_at": job_details.get("extracted_at") or snapshots[url]["fetched_at"],
+                "reextracted_at": datetime.now().isoformat(),
+                "snapshot": snapshots[url]["sha256"],
+            })
+    counts["updated"] = cache.put_many(updated, overwrite=True)
+    logger.info(f"Re-extraction done: {counts}")
+    return counts
+
+
+def run():
+    """
+    Re-extract all the job postings with stored pages into the raw job description cache
+    """
+    canonicalizer = UrlCanonicalizer(create_cache("auto-cv", *URL_ALIAS_CACHE, cache_key_name="alias"))
+    cache = CanonicalKeyCache(create_cache("auto-cv",
+                                           *RAW_JOB_DESCRIPTION_CACHE,
+                                           cache_key_name="url",
+                                           compressed_fields=("raw_description",)),
+                              canonicalizer)
+    store = HtmlSnapshotStore(create_cache("auto-cv", *HTML_SNAPSHOT_CACHE, cache_key_name="url"))
+    reextract(store, cache)
@@ -0,0 +1,129 @@
+from datetime import datetime
+import json
+import os
+from pathlib import Path
+import tempfile
+import time
+from typing import Any, Iterable
+
+from cryptography.fernet import Fernet, InvalidToken
+from llm_foundation import logger
+
+from auto_cv.cache import resolve_cache_dir
+
+
+# Environment variable with the Fernet key encrypting the stored sessions
+SESSION_KEY_ENV_VAR = "AUTO_CV_SESSION_KEY"
+
+
+def _write_private(path: Path, data: bytes):
+    """
+    Atomically write a file only readable by the current user
+    
+    Args:
+        path (Path): File to write
+        data (bytes): Contents of the file
+    """
+    with tempfile.NamedTemporaryFile(mode='wb', dir=path.parent, prefix=f".{path.name}.", delete=False) as tmp:
+        os.chmod(tmp.name, 0o600)
+        tmp.write(data)
+    os.replace(tmp.name, path)
+
+
+class SessionCookieStore:
+    """
+    Encrypted local store of the cookies of an authenticated browser session
+    
+    The cookies are encrypted with Fernet, using the key in the AUTO_CV_SESSION_KEY env var or,
+    if it's not set, a key generated on first use and kept next to the sessions in a file only
+    readable by the current user. Expired cookies are dropped when the session is loaded.
+    """
+    
+    def __init__(self, 
+                 site: str, 
+                 auth_cookies: Iterable[str] = (), 
+                 app_name: str = "auto-cv", 
+                 base_cache_dir: str | None = None):
+        """
+        Initialize the store of a site
+        
+        Args:
+            site (str): Name of the site (e.g. linkedin)
+            auth_cookies (Iterable[str], optional): Cookies without which a session isn't authenticated
+            app_name (str, optional): Name of the application
+            base_cache_dir (str, optional): Base directory for cache storage
+        """
+        self.site = site
+        self.auth_cookies = set(auth_cookies)
+        self.sessions_dir = resolve_cache_dir(app_name, "sessions", base_cache_dir)
+        self.sessions_dir.chmod(0o700)
+        self.session_file = self.sessions_dir / f"{site}.cookies.enc"
+        self._fernet = Fernet(self._load_key())
+    
+    def _load_key(self) -> bytes:
+        """
+        Retrieve the encryption key, generating the key file if there's none
+        
+        Returns:
+            bytes: Fernet key
+        """
+        if os.getenv(SESSION_KEY_ENV_VAR):
+            return os.environ[SESSION_KEY_ENV_VAR].encode("ascii")
+        
+        key_file = self.sessions_dir / "session.key"
+        if not key_file.exists():
+            _write_private(key_file, Fernet.generate_key())
+            logger.info(f"Generated session encryption key in {key_file}")
+        return key_file.read_bytes().strip()
+    
+    def save(self, username: str, cookies: list[dict[str, Any]]):
+        """
+        Store the cookies of a session
+        
+        Args:
+            username (str): User the session belongs to
+            cookies (list[dict]): Cookies as returned by WebDriver.get_cookies()
+        """
+        session = {"username": username, "saved_at": datetime.now().isoformat(), "cookies": cookies}
+        try:
+            _write_private(self.session_file, self._fernet.encrypt(json.dumps(session).encode("utf-8")))
+        except Exception as e:
+            logger.error(f"Error saving {self.site} session cookies: {e}")
+            return
+        logger.info(f"Saved {len(cookies)} {self.site} session cookies for {username}")
+    
+    def load(self, username: str) -> list[dict[str, Any]] | None:
+        """
+        Retrieve the unexpired cookies of the stored session of a user
+        
+        Args:
+            username (str): User the session must belong to
+        
+        Returns:
+            Optional[list[dict]]: Cookies, or None if there's no usable session
+        """
+        if not self.session_file.exists():
+            return None
+        try:
+            session = json.loads(self._fernet.decrypt(self.session_file.read_bytes()))
+        except InvalidToken:
+            logger.warning(f"Can't decrypt {self.session_file} (was the key changed?). Ignoring it")
+            return None
+        except Exception as e:
+            logger.error(f"Error loading {self.site} session cookies: {e}")
+            return None
+        
+        if session.get("username") != username:
+            return None
+        now = time.time()
+        cookies = [cookie for cookie in session["cookies"] if cookie.get("expiry") is None or cookie["expiry"] > now]
+        if not cookies or not self.auth_cookies <= {cookie["name"] for cookie in cookies}:
+            logger.info(f"Stored {self.site} session of {username} has expired")
+            return None
+        return cookies
+    
+    def clear(self):
+        """
+        Remove the stored session (e.g. after the site rejected it)
+        """
+        self.session_file.unlink(missing_ok=True)
@@ -0,0 +1,390 @@
+from fnmatch import fnmatch
+import html
+import json
+import re
+import threading
+import time
+from typing import Any, Iterable, Iterator, Protocol
+from urllib.parse import parse_qs, urlsplit
+
+from bs4 import BeautifulSoup
+from llm_foundation import logger
+from requests import RequestException, Session
+
+from auto_cv.cache.metrics import LatencyHistogram
+from auto_cv.cache.negative import url_domain
+
+
+# Key of the extracted fields holding the page the adapter parsed, for the adapters that scrape HTML
+# pages instead of calling an API (so the page can be kept and parsed again, see HtmlSnapshotStore)
+PAGE_HTML_KEY = "page_html"
+
+
+class SiteAdapter(Protocol):
+    """
+    Extracts the job postings of the sites whose host matches one of its patterns
+    """
+    
+    name: str
+    hosts: tuple[str, ...]
+    
+    def extract(self, url: str, session: Session, timeout: float) -> dict[str, str] | None:
+        """
+        Extract a job posting
+        
+        Args:
+            url (str): Job posting URL
+            session (Session): HTTP session to fetch it with
+            timeout (float): Seconds to wait for each request
+        
+        Returns:
+            Optional[dict]: title, company and raw_description (plus location if known, and the HTML
+                of the page under PAGE_HTML_KEY if it was scraped), or None if the adapter can't
+                extract the posting
+        """
+        ...
+
+
+def html_to_text(markup: str) -> str:
+    """
+    Text of an HTML fragment, keeping its blocks in separate lines
+    
+    Args:
+        markup (str): HTML fragment
+    
+    Returns:
+        str: Text of the fragment
+    """
+    return BeautifulSoup(markup, 'html.parser').get_text("\n", strip=True)
+
+
+def _walk_json_ld(node: Any) -> Iterator[dict[str, Any]]:
+    """
+    Yield the objects of a JSON-LD document, including the ones in lists and @graph
+    """
+    if isinstance(node, list):
+        for item in node:
+            yield from _walk_json_ld(item)
+    elif isinstance(node, dict):
+        yield node
+        yield from _walk_json_ld(node.get("@graph", []))
+
+
+def _json_ld_location(posting: dict[str, Any]) -> str | None:
+    """
+    Location of a JSON-LD JobPosting ("Remote" for remote postings without one)
+    """
+    locations = posting.get("jobLocation") or []
+    for location in locations if isinstance(locations, list) else [locations]:
+        address = location.get("address", {}) if isinstance(location, dict) else {}
+        if isinstance(address, dict):
+            parts = [address.get(part) for part in ("addressLocality", "addressRegion", "addressCountry")]
+            parts = [part.get("name") if isinstance(part, dict) else part for part in parts]
+            if any(parts):
+                return ", ".join(part for part in parts if part)
+    return "Remote" if posting.get("jobLocationType") == "TELECOMMUTE" else None
+
+
+def parse_json_ld_job_posting(soup: BeautifulSoup) -> dict[str, str] | None:
+    """
+    Extract the schema.org JobPosting embedded in a page as JSON-LD
+    
+    Args:
+        soup (BeautifulSoup): Parsed page
+    
+    Returns:
+        Optional[dict]: title, company, raw_description and location, or None if the page has no JobPosting
+    """
+    for script in soup.find_all("script", type="application/ld+json"):
+        try:
+            document = json.loads(script.string or "")
+        except json.JSONDecodeError:
+            continue
+        for posting in _walk_json_ld(document):
+            types = posting.get("@type")
+            if "JobPosting" not in (types if isinstance(types, list) else [types]) or not posting.get("description"):
+                continue
+            organization = posting.get("hiringOrganization")
+            company = organization.get("name") if isinstance(organization, dict) else organization
+            return {
+                "title": html.unescape(posting.get("title") or "N/A").strip(),
+                "company": html.unescape(company or "N/A").strip(),
+                "raw_description": html_to_text(html.unescape(posting["description"])),
+                "location": _json_ld_location(posting) or "N/A",
+            }
+    return None
+
+
+def parse_generic_job_posting(markup: str) -> dict[str, str]:
+    """
+    Extract a job posting from the HTML of any page
+    
+    The structured data of the posting is preferred, if the page embeds it. Otherwise the fields
+    are guessed from the usual class names (might need customization).
+    
+    Args:
+        markup (str): HTML of the page
+    
+    Returns:
+        dict: title, company and raw_description ("N/A" if not found), plus location with the structured data
+    """
+    soup = BeautifulSoup(markup, 'html.parser')
+    fields = parse_json_ld_job_posting(soup)
+    if fields:
+        return fields
+    job_title = soup.find(['h1', 'h2'], class_=['job-title', 'title'])
+    company_name = soup.find(['span', 'div'], class_=['company-name', 'employer'])
+    job_description = soup.find(['div', 'section'], class_=['job-description', 'description'])
+    return {
+        "title": job_title.text.strip() if job_title else "N/A",
+        "company": company_name.text.strip() if company_name else "N/A",
+        "raw_description": job_description.text.strip() if job_description else "N/A",
+    }
+
+
+class JsonLdAdapter:
+    """
+    Sites embedding their postings as schema.org JobPosting JSON-LD (most ATS-hosted career pages)
+    
+    Pages without it are parsed by guessing from their markup right here, as the generic path
+    would, so the page isn't downloaded a second time.
+    """
+    
+    name = "json_ld"
+    hosts = (
+        "*.workable.com",
+        "*.smartrecruiters.com",
+        "*.recruitee.com",
+        "*.personio.de",
+        "*.personio.com",
+        "*.bamboohr.com",
+        "*.teamtailor.com",
+        "*.breezy.hr",
+        "*.jobvite.com",
+        "*.icims.com",
+    )
+    
+    def extract(self, url: str, session: Session, timeout: float) -> dict[str, str] | None:
+        response = session.get(url, timeout=timeout)
+        response.raise_for_status()
+        return {**parse_generic_job_posting(response.text), PAGE_HTML_KEY: response.text}
+
+
+class GreenhouseAdapter:
+    """
+    Greenhouse job boards, through the public job board API
+    """
+    
+    name = "greenhouse"
+    hosts = ("boards.greenhouse.io", "job-boards.greenhouse.io", "job-boards.eu.greenhouse.io")
+    api_url = "https://boards-api.greenhouse.io/v1/boards/{board}/jobs/{job_id}"
+    
+    @staticmethod
+    def job_reference(url: str) -> tuple[str, str] | None:
+        """
+        Board and job id of a Greenhouse job URL (/<board>/jobs/<id> or the embed form)
+        """
+        parts = urlsplit(url)
+        query = parse_qs(parts.query)
+        if "for" in query and "token" in query:
+            return query["for"][0], query["token"][0]
+        match = re.match(r"/([^/]+)/jobs/(\d+)", parts.path)
+        return (match.group(1), match.group(2)) if match else None
+    
+    def extract(self, url: str, session: Session, timeout: float) -> dict[str, str] | None:
+        reference = self.job_reference(url)
+        if not reference:
+            return None
+        board, job_id = reference
+        response = session.get(self.api_url.format(board=board, job_id=job_id), timeout=timeout)
+        response.raise_for_status()
+        job = response.json()
+        return {
+            "title": job.get("title") or "N/A",
+            "company": job.get("company_name") or board,
+            # The content is escaped HTML
+            "raw_description": html_to_text(html.unescape(job.get("content") or "")) or "N/A",
+            "location": (job.get("location") or {}).get("name") or "N/A",
+        }
+
+
+class LeverAdapter:
+    """
+    Lever job boards, through the public postings API
+    """
+    
+    name = "lever"
+    hosts = ("jobs.lever.co", "jobs.eu.lever.co")
+    
+    def extract(self, url: str, session: Session, timeout: float) -> dict[str, str] | None:
+        parts = urlsplit(url)
+        match = re.match(r"/([^/]+)/([0-9a-f-]{36})", parts.path)
+        if not match:
+            return None
+        company, posting_id = match.groups()
+        api_host = "api.eu.lever.co" if parts.netloc.endswith("eu.lever.co") else "api.lever.co"
+        response = session.get(f"https://{api_host}/v0/postings/{company}/{posting_id}", timeout=timeout)
+        response.raise_for_status()
+        posting = response.json()
+        
+        # The description, then each section (responsibilities, requirements...) with its bullets
+        sections = [posting.get("descriptionPlain") or ""]
+        for section in posting.get("lists", []):
+            sections.append(f"{section.get('text', '')}\n{html_to_text(section.get('content', ''))}")
+        sections.append(posting.get("additionalPlain") or "")
+        return {
+            "title": posting.get("text") or "N/A",
+            "company": company,
+            "raw_description": "\n\n".join(section.strip() for section in sections if section.strip()) or "N/A",
+            "location": (posting.get("categories") or {}).get("location") or "N/A",
+        }
+
+
+class AshbyAdapter:
+    """
+    Ashby job boards, through the public posting API of the board
+    """
+    
+    name = "ashby"
+    hosts = ("jobs.ashbyhq.com",)
+    api_url = "https://api.ashbyhq.com/posting-api/job-board/{organization}"
+    
+    def extract(self, url: str, session: Session, timeout: float) -> dict[str, str] | None:
+        match = re.match(r"/([^/]+)/([0-9a-f-]{36})", urlsplit(url).path)
+        if not match:
+            return None
+        organization, job_id = match.groups()
+        response = session.get(self.api_url.format(organization=organization), timeout=timeout)
+        response.raise_for_status()
+        job = next((job for job in response.json().get("jobs", []) if job.get("id") == job_id), None)
+        if not job:
+            return None
+        return {
+            "title": job.get("title") or "N/A",
+            "company": organization,
+            "raw_description": job.get("descriptionPlain") or html_to_text(job.get("descriptionHtml") or "") or "N/A",
+            "location": job.get("location") or "N/A",
+        }
+
+
+class SiteAdapterRegistry:
+    """
+    Site adapters keyed by host pattern, with timing and success counters of each extraction path
+    
+    The counters are kept per path name, so the paths that aren't adapters (e.g. the LinkedIn
+    browser or the generic HTML guessing) can be recorded too and compared with them.
+    """
+    
+    def __init__(self, adapters: Iterable[SiteAdapter] = ()):
+        """
+        Initialize the registry
+        
+        Args:
+            adapters (Iterable[SiteAdapter], optional): Adapters, in order of preference
+        """
+        self._adapters: list[SiteAdapter] = []
+        self._latencies: dict[str, LatencyHistogram] = {}
+        self._counts: dict[str, dict[str, int]] = {}
+        self._lock = threading.Lock()
+        for adapter in adapters:
+            self.register(adapter)
+    
+    def register(self, adapter: SiteAdapter):
+        """
+        Add an adapter (tried after the ones already registered for the same hosts)
+        
+        Args:
+            adapter (SiteAdapter): Adapter to add
+        """
+        self._adapters.append(adapter)
+    
+    def adapters_for(self, url: str) -> list[SiteAdapter]:
+        """
+        Adapters whose host patterns match a URL
+        
+        Args:
+            url (str): Job posting URL
+        
+        Returns:
+            list[SiteAdapter]: Matching adapters, in order of preference
+        """
+        host = url_domain(url)
+        return [adapter for adapter in self._adapters if any(fnmatch(host, pattern) for pattern in adapter.hosts)]
+    
+    def record(self, path: str, seconds: float, outcome: str):
+        """
+        Record an extraction attempt
+        
+        Args:
+            path (str): Name of the extraction path (adapter name or other)
+            seconds (float): Time spent
+            outcome (str): "success", "miss" (nothing extracted) or "error"
+        """
+        with self._lock:
+            counts = self._counts.setdefault(path, {"success": 0, "miss": 0, "error": 0})
+            counts[outcome] += 1
+            histogram = self._latencies.setdefault(path, LatencyHistogram())
+        histogram.record(seconds)
+    
+    def extract(self, url: str, session: Session, timeout: float) -> tuple[str, dict[str, str]] | None:
+        """
+        Extract a job posting with the first matching adapter that succeeds
+        
+        Args:
+            url (str): Job posting URL
+            session (Session): HTTP session to fetch it with
+            timeout (float): Seconds to wait for each request
+        
+        Returns:
+            Optional[tuple[str, dict]]: Name of the adapter and extracted fields, or None if no adapter could extract it
+        
+        Raises:
+            RequestException: If the site answered an adapter request with an error (e.g. it's rate limiting
+                us) or couldn't be reached, as the next adapters would hit it again
+        """
+        for adapter in self.adapters_for(url):
+            start = time.perf_counter()
+            try:
+                fields = adapter.extract(url, session, timeout)
+            except RequestException as e:
+                logger.warning(f"Adapter {adapter.name} failed to fetch {url}: {e}")
+                self.record(adapter.name, time.perf_counter() - start, "error")
+                raise
+            except Exception as e:
+                logger.warning(f"Adapter {adapter.name} failed to extract {url}: {e}")
+                self.record(adapter.name, time.perf_counter() - start, "error")
+                continue
+            self.record(adapter.name, time.perf_counter() - start, "success" if fields else "miss")
+            if fields:
+                return adapter.name, fields
+        return None
+    
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """
+        Retrieve the counters of each extraction path
+        
+        Returns:
+            dict: Attempts, outcomes, success rate and latency summary per path
+        """
+        with self._lock:
+            counts = {path: dict(path_counts) for path, path_counts in self._counts.items()}
+        stats = {}
+        for path, path_counts in counts.items():
+            attempts = sum(path_counts.values())
+            stats[path] = {
+                "attempts": attempts,
+                **path_counts,
+                "success_rate": path_counts["success"] / attempts if attempts else 0.0,
+                "latency": self._latencies[path].summary(),
+            }
+        return stats
+
+
+def default_registry() -> SiteAdapterRegistry:
+    """
+    Registry with the adapters of the ATS job boards we know
+    
+    Returns:
+        SiteAdapterRegistry: New registry
+    """
+    return SiteAdapterRegistry([GreenhouseAdapter(), LeverAdapter(), AshbyAdapter(), JsonLdAdapter()])
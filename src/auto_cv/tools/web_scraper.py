@@ -1,27 +1,55 @@
-from dataclasses import dataclass
+from collections import Counter
+from concurrent.futures import Future, as_completed
+from dataclasses import dataclass, field
 from datetime import datetime
+import json
 import os
+import threading
 import time
-from typing import Any, Dict, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
 
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 from llm_foundation import logger
 import requests
-from selenium import webdriver
 from selenium.common.exceptions import (
     NoSuchElementException,
     StaleElementReferenceException,
     TimeoutException,
     WebDriverException,
 )
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
-from auto_cv.cache import BasicInMemoryCache
+from auto_cv.cache import (
+    FAILED_JOB_DESCRIPTION_CACHE,
+    HTML_SNAPSHOT_CACHE,
+    RAW_JOB_DESCRIPTION_CACHE,
+    URL_ALIAS_CACHE,
+    Cache,
+    CanonicalKeyCache,
+    HtmlSnapshotStore,
+    NegativeCache,
+    UrlCanonicalizer,
+    create_cache,
+)
+from auto_cv.cache.metrics import LatencyHistogram
+from auto_cv.tools.browsing_profile import LIGHTWEIGHT_PROFILE, BrowsingProfile
+from auto_cv.tools.http_session import shared_session
+from auto_cv.tools.linkedin_guest import (
+    LINKEDIN_FIELD_SELECTORS,
+    LINKEDIN_GUEST_JOB_URL,
+    linkedin_job_id,
+    parse_linkedin_guest_job_posting,
+)
+from auto_cv.tools.rate_limiter import DomainRateLimiter, shared_rate_limiter
+from auto_cv.tools.site_adapters import PAGE_HTML_KEY, SiteAdapterRegistry, default_registry, parse_generic_job_posting
+from auto_cv.tools.session_store import SessionCookieStore
+from auto_cv.tools.webdriver_pool import PooledDriver, WebDriverPool, shared_pool
+
+if TYPE_CHECKING:
+    from auto_cv.tools.crawl_scheduler import CrawlScheduler
 
 
 # Load environment variables from .env file
@@ -30,6 +58,73 @@ env_loaded: bool = load_dotenv()
 if not env_loaded:
     raise Exception("Failed to load environment variables from .env file")
 
+# HTTP status codes meaning the whole site is blocking or rate limiting us (999 is LinkedIn's)
+BLOCKED_STATUS_CODES = {403, 429, 999}
+
+# Maximum seconds to wait for each stage of a scrape to be ready
+DEFAULT_WAIT_CEILINGS = {
+    "linkedin_login_form": 10.0,
+    "linkedin_login": 15.0,
+    "linkedin_job_page": 15.0,
+}
+
+# Readiness probes: elements whose presence means a page is ready to be used
+LINKEDIN_LOGIN_FORM = (By.ID, "username")
+LINKEDIN_LOGGED_IN_MARKER = (By.CSS_SELECTOR, "div.feed-identity-module")
+# URL fragments of the pages LinkedIn redirects to when the session isn't valid
+LINKEDIN_AUTH_WALLS = ("/login", "/authwall", "/checkpoint", "/uas/")
+
+# Cookie holding the LinkedIn session
+LINKEDIN_SESSION_COOKIE = "li_at"
+
+LINKEDIN_JOB_PAGE_MARKERS = [
+    (By.CSS_SELECTOR, "div.job-details-jobs-unified-top-card__job-title"),
+    (By.CLASS_NAME, "jobs-description__container"),
+    (By.ID, "job-details"),
+]
+
+
+def build_extractor_script(field_selectors: dict[str, list[tuple[str, str]]]) -> str:
+    """
+    Build the JavaScript extractor of a site, which evaluates all the candidate selectors in the page
+    
+    The script returns, in a single round trip, {field: {"value": text, "selector": "kind:query"}}
+    with the text of the first element matched for each field and the selector that matched it
+    (both null if none did).
+    
+    Args:
+        field_selectors (dict): Candidate ("css" or "xpath", query) selectors of each field, in order of preference
+    
+    Returns:
+        str: Script to run with WebDriver.execute_script
+    """
+    return f"""
+        const fieldSelectors = {json.dumps(field_selectors)};
+        const find = (kind, query) => kind === "xpath"
+            ? document.evaluate(query, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue
+            : document.querySelector(query);
+        const result = {{}};
+        for (const [field, candidates] of Object.entries(fieldSelectors)) {{
+            result[field] = {{value: null, selector: null}};
+            for (const [kind, query] of candidates) {{
+                let element = null;
+                try {{
+                    element = find(kind, query);
+                }} catch (e) {{
+                    continue;
+                }}
+                if (element) {{
+                    result[field] = {{value: element.innerText || element.textContent || "", selector: kind + ":" + query}};
+                    break;
+                }}
+            }}
+        }}
+        return result;
+    """
+
+
+LINKEDIN_EXTRACTOR_SCRIPT = build_extractor_script(LINKEDIN_FIELD_SELECTORS)
+
 @dataclass
 class JobPostingExtractor:
     """
@@ -39,40 +134,82 @@ class JobPostingExtractor:
     """
     
     timeout: int = 10
-    _job_description_cache: BasicInMemoryCache | None = None
-    _driver: WebDriver | None = None
+    browsing_profile: BrowsingProfile = LIGHTWEIGHT_PROFILE
+    linkedin_guest_url: str = LINKEDIN_GUEST_JOB_URL
+    store_html_snapshots: bool = True
+    # Concurrency of the scheduler running the tool calls and batch extractions
+    max_workers: int = 4
+    max_per_domain: int = 2
+    wait_ceilings: dict[str, float] = field(default_factory=lambda: dict(DEFAULT_WAIT_CEILINGS))
+    _wait_times: dict[str, LatencyHistogram] = field(default_factory=dict)
+    _url_canonicalizer: UrlCanonicalizer | None = None
+    _job_description_cache: Cache | None = None
+    _negative_cache: NegativeCache | None = None
+    _driver_pool: WebDriverPool | None = None
+    _linkedin_sessions: SessionCookieStore | None = None
+    _http_session: requests.Session | None = None
+    _http_counts: Counter = field(default_factory=Counter)
+    _http_counts_lock: threading.Lock = field(default_factory=threading.Lock)
+    _site_adapters: SiteAdapterRegistry | None = None
+    _rate_limiter: DomainRateLimiter | None = None
+    _html_snapshots: HtmlSnapshotStore | None = None
+    _scheduler: Optional["CrawlScheduler"] = None
+    _scheduler_lock: threading.Lock = field(default_factory=threading.Lock)
     
     def __post_init__(self):
-        """Setup chrome options"""        
-        if not self._driver:
-            self._driver = self._setup_webdriver()
-        
-        self._driver.implicitly_wait(self.timeout)
-        logger.info("WebDriver initialized")
+        """Setup the caches and the WebDriver pool (drivers are only started when a page has to be scraped)"""        
+        if not self._url_canonicalizer:
+            self._url_canonicalizer = UrlCanonicalizer(create_cache("auto-cv", *URL_ALIAS_CACHE, cache_key_name="alias"))
         
+        # All the URLs of a posting share its cache entry
         if not self._job_description_cache:
-            self._job_description_cache = BasicInMemoryCache("auto-cv", 
-                                                            "raw_job_description_cache", 
-                                                            "raw_job_descriptions.jsonl",
-                                                            cache_key_name="url")
+            self._job_description_cache = CanonicalKeyCache(create_cache("auto-cv", 
+                                                                         *RAW_JOB_DESCRIPTION_CACHE,
+                                                                         cache_key_name="url",
+                                                                         lazy=True,
+                                                                         snapshot_every=1000,
+                                                                         compressed_fields=("raw_description",)),
+                                                            self._url_canonicalizer)
         logger.info(f"Raw Description Cache initialized in {self._job_description_cache.cache_file}")
+        
+        if not self._negative_cache:
+            self._negative_cache = NegativeCache(create_cache("auto-cv", *FAILED_JOB_DESCRIPTION_CACHE, cache_key_name="key"))
+        logger.info(f"Failed extractions cache initialized in {self._negative_cache.cache.cache_file}")
+        
+        # Warm drivers are shared by all the extractors of the process using the same browsing profile
+        if not self._driver_pool:
+            self._driver_pool = shared_pool(f"chrome-{self.browsing_profile.name}", self._setup_webdriver)
+        
+        if not self._linkedin_sessions:
+            self._linkedin_sessions = SessionCookieStore("linkedin", auth_cookies=(LINKEDIN_SESSION_COOKIE,))
+        
+        # Plain HTTP requests reuse the connections of the process to each host
+        if not self._http_session:
+            self._http_session = shared_session()
+        
+        if not self._site_adapters:
+            self._site_adapters = default_registry()
+        
+        # Requests to each site are paced across the whole process (the shared HTTP session uses it too)
+        if not self._rate_limiter:
+            self._rate_limiter = shared_rate_limiter()
+        
+        # Raw pages are kept, so the postings can be parsed again without fetching them (see reextract)
+        if self.store_html_snapshots and not self._html_snapshots:
+            self._html_snapshots = HtmlSnapshotStore(create_cache("auto-cv", *HTML_SNAPSHOT_CACHE, cache_key_name="url"))
             
             
     def _setup_webdriver(self) -> WebDriver:
         """
-        Setup Chrome webdriver with headless mode and common options
+        Setup Chrome webdriver with the browsing profile of the extractor
         
         Returns:
             Configured Chrome webdriver
         """
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        
         try:
-            driver = webdriver.Chrome(options=chrome_options)
-            return driver
+            # No implicit wait: pages are awaited with explicit readiness probes, so missing
+            # fallback selectors fail straight away
+            return self.browsing_profile.create_driver()
         except Exception as e:
             logger.error(f"Failed to initialize webdriver: {e}")
             raise
@@ -94,50 +231,237 @@ class JobPostingExtractor:
             raise ValueError("LinkedIn credentials must be set in .env file")
         return username, password
     
-    def _linkedin_login(self, username: str, password: str):
+    def _wait_until(self, driver: WebDriver, stage: str, condition: Any) -> bool:
+        """
+        Wait until a page is ready for a stage of the scrape, recording the time waited
+        
+        Args:
+            driver (WebDriver): Driver showing the page
+            stage (str): Name of the stage, used for its ceiling in wait_ceilings and for the wait stats
+            condition (Any): Expected condition signalling the page is ready
+        
+        Returns:
+            bool: True if the page got ready, False if the ceiling was reached first
+        """
+        ceiling = self.wait_ceilings.get(stage, self.timeout)
+        start = time.perf_counter()
+        try:
+            WebDriverWait(driver, ceiling).until(condition)
+            return True
+        except TimeoutException:
+            logger.warning(f"Stage {stage} not ready after {ceiling}s")
+            return False
+        finally:
+            waited = time.perf_counter() - start
+            self._wait_times.setdefault(stage, LatencyHistogram()).record(waited)
+            logger.debug(f"Waited {waited:.2f}s for stage {stage}")
+    
+    def _navigate(self, driver: WebDriver, url: str):
+        """
+        Load a page in a driver once the rate limit of its site allows it
+        
+        Args:
+            driver (WebDriver): Driver to load the page with
+            url (str): URL of the page
+        """
+        self._rate_limiter.acquire(url)
+        driver.get(url)
+    
+    def _store_html_snapshot(self, url: str, html: str, source: str):
+        """
+        Keep the raw page a job posting was extracted from, if snapshots are enabled
+        
+        Args:
+            url (str): Job posting URL
+            html (str): Content of the page
+            source (str): Extraction path that fetched it (selects the parser when re-extracting)
+        """
+        if self._html_snapshots is not None:
+            self._html_snapshots.save(url, html, source)
+    
+    def wait_stats(self) -> dict[str, Any]:
+        """
+        Retrieve the time spent waiting for each stage of the scrapes
+        
+        Returns:
+            dict: Latency summary (count, mean, percentiles in ms) per stage
+        """
+        return {stage: histogram.summary() for stage, histogram in self._wait_times.items()}
+    
+    @staticmethod
+    def _extract_fields(driver: WebDriver, extractor_script: str) -> dict[str, tuple[str, str | None]]:
+        """
+        Run the injected extractor of a site and collect the value of each field
+        
+        Args:
+            driver (WebDriver): Driver showing the page
+            extractor_script (str): Script built with build_extractor_script
+        
+        Returns:
+            dict: Text of each field ("N/A" if no selector matched) and the selector that matched it
+        """
+        fields = {}
+        for name, match in (driver.execute_script(extractor_script) or {}).items():
+            if match.get("selector"):
+                logger.info(f"Field {name} matched selector {match['selector']}")
+                fields[name] = (match.get("value") or "", match["selector"])
+            else:
+                logger.warning(f"No selector matched field {name}")
+                fields[name] = ("N/A", None)
+        return fields
+    
+    def _linkedin_login(self, driver: WebDriver, username: str, password: str) -> bool:
         """
         Perform LinkedIn login with the provided credentials
         
         Args:
+            driver (WebDriver): Driver to log in with
             username (str): LinkedIn username
             password (str): LinkedIn password
+        
+        Returns:
+            bool: True if the login was confirmed, False if it might have failed or needs verification
         """
         
         try:
             # Navigate to LinkedIn login page
-            self._driver.get("https://www.linkedin.com/login")
+            self._navigate(driver, "https://www.linkedin.com/login")
             
-            # Wait for page to load
-            time.sleep(3)
+            # Wait for the login form
+            self._wait_until(driver, "linkedin_login_form", EC.presence_of_element_located(LINKEDIN_LOGIN_FORM))
             
             # Find and fill username field
-            username_field = self._driver.find_element(By.ID, "username")
+            username_field = driver.find_element(By.ID, "username")
             username_field.clear()
             username_field.send_keys(username)
             
             # Find and fill password field
-            password_field = self._driver.find_element(By.ID, "password")
+            password_field = driver.find_element(By.ID, "password")
             password_field.clear()
             password_field.send_keys(password)
             
             # Submit login form
             password_field.submit()
             
-            # Wait for potential login challenges
-            time.sleep(5)
+            # Wait until we land in the feed or in a login challenge
+            self._wait_until(driver, 
+                             "linkedin_login", 
+                             EC.any_of(EC.presence_of_element_located(LINKEDIN_LOGGED_IN_MARKER), 
+                                       EC.url_contains("/feed"), 
+                                       EC.url_contains("/checkpoint")))
             
             # Optional: Check if login was successful
-            try:
-                # Look for an element that exists only after successful login
-                self._driver.find_element(By.CSS_SELECTOR, "div.feed-identity-module")
+            if "/checkpoint" not in driver.current_url and ("/feed" in driver.current_url or 
+                                                            driver.find_elements(*LINKEDIN_LOGGED_IN_MARKER)):
                 logger.info(f"LinkedIn login successful for user: {username}")
-            except Exception:
-                logger.warning("Login might have failed or requires additional verification")
+                return True
+            logger.warning("Login might have failed or requires additional verification")
+            return False
         
         except Exception as e:
             logger.error(f"Failed to perform LinkedIn login: {e}")
             raise
     
+    def _restore_linkedin_session(self, driver: WebDriver, username: str) -> bool:
+        """
+        Load the stored session cookies of a user into a driver
+        
+        The session isn't validated here: it's checked for free when the job page is loaded
+        (LinkedIn redirects to an auth wall if the session isn't valid anymore).
+        
+        Args:
+            driver (WebDriver): Driver to restore the session into
+            username (str): LinkedIn username
+        
+        Returns:
+            bool: True if there was a stored session to restore
+        """
+        cookies = self._linkedin_sessions.load(username)
+        if not cookies:
+            return False
+        # Cookies can only be set for the domain of the current page
+        self._navigate(driver, "https://www.linkedin.com/robots.txt")
+        for cookie in cookies:
+            try:
+                driver.add_cookie({key: value for key, value in cookie.items() if key != "sameSite" or value in ("Strict", "Lax", "None")})
+            except WebDriverException as e:
+                logger.debug(f"Skipping cookie {cookie.get('name')}: {e}")
+        logger.info(f"Restored stored LinkedIn session of {username}")
+        return True
+    
+    def _ensure_linkedin_session(self, pooled: PooledDriver, username: str, password: str, fresh_login: bool = False):
+        """
+        Make sure a driver is logged into LinkedIn, reusing its session or the stored one when possible
+        
+        Args:
+            pooled (PooledDriver): Driver to log in with
+            username (str): LinkedIn username
+            password (str): LinkedIn password
+            fresh_login (bool, optional): Ignore the existing sessions and log in again
+        """
+        if not fresh_login:
+            if pooled.state.get("linkedin_user") == username:
+                return
+            if self._restore_linkedin_session(pooled.driver, username):
+                pooled.state["linkedin_user"] = username
+                return
+        
+        pooled.state.pop("linkedin_user", None)
+        # The driver and the stored session are only updated once the login is confirmed (a login
+        # stuck in a checkpoint must not replace a session that might still work)
+        if not self._linkedin_login(pooled.driver, username, password):
+            logger.warning(f"LinkedIn login of {username} not confirmed. Keeping the stored session")
+            return
+        self._linkedin_sessions.save(username, pooled.driver.get_cookies())
+        pooled.state["linkedin_user"] = username
+        logger.info(f"Logged into LinkedIn as {username}")
+    
+    def extract_linkedin_guest_job_description(self, url: str) -> Dict[str, str]:
+        """
+        Fast path extracting a LinkedIn job posting from its public guest page over plain HTTP
+        
+        Args:
+            url (str): LinkedIn job posting URL (job view or any URL with a currentJobId)
+        
+        Returns:
+            Dict containing job details or empty dict if the posting can't be extracted this way. If
+            LinkedIn is blocking or rate limiting us, the failure is recorded for the whole domain
+        """
+        job_id = linkedin_job_id(url)
+        if not job_id:
+            return {}
+        
+        start = time.perf_counter()
+        try:
+            response = self._http_session.get(self.linkedin_guest_url.format(job_id=job_id), timeout=self.timeout)
+            self._count_http("requests")
+            if response.status_code in BLOCKED_STATUS_CODES:
+                # The browser would hit the same wall (999 isn't even an HTTP error): back off the whole site instead
+                self._negative_cache.record_failure(url, 
+                                                    f"LinkedIn guest page answered {response.status_code}", 
+                                                    domain_wide=True)
+                return {}
+            response.raise_for_status()
+            self._count_http("bytes_downloaded", len(response.content))
+        except requests.RequestException as e:
+            logger.info(f"LinkedIn guest page of job {job_id} not available ({e})")
+            return {}
+        
+        self._store_html_snapshot(url, response.text, "linkedin_guest")
+        fields = parse_linkedin_guest_job_posting(response.text)
+        if not fields:
+            logger.info(f"LinkedIn guest page of job {job_id} has no job description")
+            return {}
+        
+        job_details = {
+            **fields,
+            "url": url,
+            "extracted_at": datetime.now().isoformat()
+        }
+        self._job_description_cache.put(job_details, overwrite=True)
+        logger.info(f"Extracted LinkedIn job {job_id} from its guest page in {time.perf_counter() - start:.2f}s")
+        return job_details
+    
     def extract_linkedin_job_description(self, 
                                          url: str, 
                                          username: str | None = None, 
@@ -154,153 +478,351 @@ class JobPostingExtractor:
             Dict containing job details or empty dict if extraction fails
         """        
         
+        pooled: PooledDriver | None = None
+        healthy = True
         try:
-            # Perform login if credentials are provided
+            pooled = self._driver_pool.acquire()
+            driver = pooled.driver
+            
+            # Perform login if credentials are provided (pooled drivers and stored sessions are reused)
             if username and password:
                 try:
-                    self._linkedin_login(username, password)
-                    logger.info(f"Logged into LinkedIn as {username}")
+                    self._ensure_linkedin_session(pooled, username, password)
                 except Exception as e:
                     logger.error(f"Login failed: {e}")
+                    self._negative_cache.record_failure(url, f"LinkedIn login failed: {e}", domain_wide=True)
                     return {}
             
             # Navigate to the URL
-            self._driver.get(url)
+            self._navigate(driver, url)
             logger.info(f"Navigated to {url}")
             
-            # Wait for page to load
-            time.sleep(5)  # Increased wait time
-                        
-            # Extract job title with multiple fallback methods
-            job_title_selectors = [
-                (By.CSS_SELECTOR, "div.job-details-jobs-unified-top-card__job-title"),
-                (By.XPATH, "//h1[contains(@class, 'job-title')]")
-            ]
-            
-            job_title = "N/A"
-            for selector in job_title_selectors:
-                logger.info(f"Trying title selector {selector}")
+            # A reused session that has expired ends up in an auth wall: log in again and retry
+            if username and password and any(wall in driver.current_url for wall in LINKEDIN_AUTH_WALLS):
+                logger.info(f"LinkedIn session of {username} is not valid anymore")
                 try:
-                    elements = self._driver.find_elements(*selector)
-                    if elements:
-                        job_title = elements[0].text
-                        break
+                    self._ensure_linkedin_session(pooled, username, password, fresh_login=True)
                 except Exception as e:
-                    logger.warning(f"Title selector {selector} failed: {e}")
-            
-            # Extract company name
-            company_selectors = [
-                (By.CSS_SELECTOR, "div.job-details-jobs-unified-top-card__company-name"),
-                (By.XPATH, "//span[contains(@class, 'company-name')]")
-            ]
+                    logger.error(f"Login failed: {e}")
+                    self._negative_cache.record_failure(url, f"LinkedIn login failed: {e}", domain_wide=True)
+                    return {}
+                self._navigate(driver, url)
             
-            company_name = "N/A"
-            for selector in company_selectors:
-                logger.info(f"Trying company selector {selector}")
-                try:
-                    elements = self._driver.find_elements(*selector)
-                    if elements:
-                        company_name = elements[0].text
-                        break
-                except Exception as e:
-                    logger.warning(f"Company selector {selector} failed: {e}")
-
-            # Define multiple potential selectors for job description
-            job_desc_selectors = [
-                (By.CLASS_NAME, "jobs-description__container"),
-                (By.CSS_SELECTOR, "div[class*='description']"),
-                (By.ID, "job-details"),
-                (By.XPATH, "//div[contains(@class, 'description') or contains(@id, 'description')]")
-            ]
+            # Wait for the job details to be rendered (the extractor runs anyway if they're not)
+            self._wait_until(driver, 
+                             "linkedin_job_page", 
+                             EC.any_of(*[EC.presence_of_element_located(marker) for marker in LINKEDIN_JOB_PAGE_MARKERS]))
+                        
+            self._store_html_snapshot(url, driver.page_source, "linkedin_browser")
             
-            job_description = "N/A"            
-            # Try multiple selectors to find job description
-            for selector in job_desc_selectors:
-                logger.info(f"Trying selector {selector}")
-                try:
-                    # Use find_elements to avoid NoSuchElementException
-                    elements = self._driver.find_elements(*selector)
-                    if elements:
-                        job_desc_element = elements[0]
-                        job_description = job_desc_element.text
-                        break
-                except Exception as e:
-                    logger.warning(f"Selector {selector} failed: {e}")
+            # Evaluate all the candidate selectors in the page in a single round trip
+            fields = self._extract_fields(driver, LINKEDIN_EXTRACTOR_SCRIPT)
+            job_title, company_name, job_description = (fields[name][0] for name in ("title", "company", "raw_description"))
             
             job_details = {
                 "title": job_title.strip(),
                 "company": company_name.strip(),
                 "raw_description": job_description.strip(),
                 "url": url,
-                "extracted_at": datetime.now().isoformat()
+                "extracted_at": datetime.now().isoformat(),
+                "matched_selectors": {name: selector for name, (_, selector) in fields.items()}
             }
             
-            # Save to cache
-            self._job_description_cache.put(job_details)
+            # Save to cache (replacing the cached details when the posting is refreshed)
+            self._job_description_cache.put(job_details, overwrite=True)
             
             return job_details
         
         except Exception as e:
             logger.error(f"Job description extraction failed: {e}")
+            self._negative_cache.record_failure(url, f"{type(e).__name__}: {e}")
+            # A driver that raised is not trusted for the next extraction
+            healthy = not isinstance(e, WebDriverException)
             return {}
         finally:
-            if self._driver:
-                self._driver.quit()
+            if pooled is not None:
+                self._driver_pool.release(pooled, healthy)
     
-    def extract_generic_job_description(self, url: str) -> Dict[str, str]:
+    def extract_generic_job_description(self, url: str, cached_job: Dict[str, str] | None = None) -> Dict[str, str]:
         """
-        Fallback method to extract job description using requests and BeautifulSoup
+        Fallback method to extract job description using requests and BeautifulSoup (see parse_generic_job_posting)
+        
+        When refreshing a cached posting, the request is conditional on its ETag/Last-Modified, so an
+        unchanged page is neither downloaded nor parsed again.
+        
+        Args:
+            url (str): Job posting URL
+            cached_job (Dict, optional): Cached details of the posting to revalidate
         
         Returns:
             Dictionary with job details
         """
+        headers = {}
+        if cached_job and cached_job.get("etag"):
+            headers["If-None-Match"] = cached_job["etag"]
+        if cached_job and cached_job.get("last_modified"):
+            headers["If-Modified-Since"] = cached_job["last_modified"]
+        
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            response = requests.get(url, headers=headers, timeout=self.timeout)
+            response = self._http_session.get(url, headers=headers, timeout=self.timeout)
+            self._count_http("requests")
+            if response.status_code == 304 and cached_job:
+                self._count_http("not_modified")
+                logger.info(f"Job posting not modified since it was extracted: {url}")
+                return cached_job
             response.raise_for_status()
+            self._count_http("bytes_downloaded", len(response.content))
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            self._store_html_snapshot(url, response.text, "generic")
             
-            # Generic job description extraction (might need customization)
-            job_title = soup.find(['h1', 'h2'], class_=['job-title', 'title'])
-            company_name = soup.find(['span', 'div'], class_=['company-name', 'employer'])
-            job_description = soup.find(['div', 'section'], class_=['job-description', 'description'])
+            # Structured data of the posting if the page embeds it, guessed from the markup otherwise
+            fields = parse_generic_job_posting(response.text)
             
-            return {
-                "title": job_title.text.strip() if job_title else "N/A",
-                "company": company_name.text.strip() if company_name else "N/A",
-                "raw_description": job_description.text.strip() if job_description else "N/A"
+            job_details = {
+                **fields,
+                "url": url,
+                "extracted_at": datetime.now().isoformat(),
+                # Validators for revalidating the posting when it's refreshed
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
             }
+            self._job_description_cache.put(job_details, overwrite=True)
+            return job_details
         
         except requests.RequestException as e:
             logger.error(f"Request error: {e}")
+            status_code = e.response.status_code if e.response is not None else None
+            self._negative_cache.record_failure(url, 
+                                                f"{type(e).__name__}: {e}", 
+                                                domain_wide=status_code in BLOCKED_STATUS_CODES)
             return {}
     
-    def extract_raw_info_from(self, url: str) -> Tuple[Dict[str, str], bool]:
+    def extract_with_site_adapter(self, url: str) -> Dict[str, str]:
+        """
+        Extract a job posting with the adapter of its site (e.g. the API of an ATS job board)
+        
+        Args:
+            url (str): Job posting URL
+        
+        Returns:
+            Dict containing job details or empty dict if no adapter could extract it (a failed request
+            is recorded in the negative cache)
+        """
+        try:
+            extracted = self._site_adapters.extract(url, self._http_session, self.timeout)
+        except requests.RequestException as e:
+            logger.error(f"Request error: {e}")
+            status_code = e.response.status_code if e.response is not None else None
+            self._negative_cache.record_failure(url, 
+                                                f"{type(e).__name__}: {e}", 
+                                                domain_wide=status_code in BLOCKED_STATUS_CODES)
+            return {}
+        if not extracted:
+            return {}
+        adapter_name, fields = extracted
+        # Adapters scraping the HTML page return it, so it can be parsed again without fetching it
+        page_html = fields.pop(PAGE_HTML_KEY, None)
+        if page_html is not None:
+            self._store_html_snapshot(url, page_html, adapter_name)
+        job_details = {
+            **fields,
+            "url": url,
+            "extracted_at": datetime.now().isoformat()
+        }
+        self._job_description_cache.put(job_details, overwrite=True)
+        logger.info(f"Extracted {url} with the {adapter_name} adapter")
+        return job_details
+    
+    def _timed_path(self, path: str, extract: Callable[..., Dict[str, str]], *args: Any) -> Dict[str, str]:
+        """
+        Run an extraction path that isn't a site adapter, recording it in the adapter counters
+        
+        Args:
+            path (str): Name of the path in the counters
+            extract (Callable): Extraction method
+            *args: Arguments of the method
+        
+        Returns:
+            Dict containing job details or empty dict if the extraction failed
+        """
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            job_details = extract(*args)
+            outcome = "success" if job_details else "miss"
+            return job_details
+        finally:
+            self._site_adapters.record(path, time.perf_counter() - start, outcome)
+    
+    def extraction_stats(self) -> dict[str, dict[str, Any]]:
+        """
+        Retrieve the timing and success counters of each extraction path (site adapters, LinkedIn and generic)
+        
+        Returns:
+            dict: Attempts, outcomes, success rate and latency summary per path
+        """
+        return self._site_adapters.stats()
+    
+    def rate_limit_stats(self) -> dict[str, dict[str, Any]]:
+        """
+        Retrieve the pacing of the requests to each site
+        
+        Returns:
+            dict: Rate, tokens, pause, backoffs and time waited per site
+        """
+        return self._rate_limiter.stats()
+    
+    def is_cached(self, url: str) -> bool:
+        """
+        Check whether a job posting is already cached (so extracting it won't hit its site)
+        
+        Args:
+            url (str): Job posting URL
+        
+        Returns:
+            bool: True if the posting is cached
+        """
+        return self._job_description_cache.exists(url)
+    
+    def http_stats(self) -> dict[str, int]:
+        """
+        Retrieve the counters of the plain HTTP requests
+        
+        Returns:
+            dict: Requests sent, requests answered with 304 Not Modified and bytes downloaded
+        """
+        with self._http_counts_lock:
+            return {name: self._http_counts[name] for name in ("requests", "not_modified", "bytes_downloaded")}
+    
+    def _count_http(self, name: str, amount: int = 1):
+        # Extractions run concurrently in the scheduler workers
+        with self._http_counts_lock:
+            self._http_counts[name] += amount
+    
+    def extract_raw_info_from(self, url: str, refresh: bool = False) -> Tuple[Dict[str, str], bool]:
         """
         Main extraction method with platform-specific logic using pattern matching
         
         Args:
             url (str): The URL to extract job details from
+            refresh (bool, optional): Extract cached postings again. Plain HTTP postings are only
+                downloaded again if they changed
         
         Returns:
             Extracted job details and whether it was a cache hit or not
         """
+        # Equivalent URLs (tracking parameters, collection pages...) resolve to the same posting
+        requested_url, url = url, self._url_canonicalizer.canonicalize(url)
 
         # Check cache first
         cached_job = self._job_description_cache.get(url)
-        if cached_job:
+        if cached_job and not refresh:
             logger.info(f"Retrieved job description from cache: {url}")
             return cached_job, True
         
+        # Don't retry known-bad URLs (or blocked sites) until their retry window is over
+        failure = self._negative_cache.blocked(url)
+        if failure:
+            logger.warning(f"Skipping {failure['key']} until {failure['retry_after']} "
+                           f"after {failure['failures']} failures (last one: {failure['reason']})")
+            return {}, False
+        
         # If not in cache, proceed with extraction
         match url:
             case url if "linkedin.com/jobs" in url:
-                return self.extract_linkedin_job_description(url, *self._get_linkedin_credentials()), False
+                # The browser is only needed when the public guest page doesn't have the posting (and
+                # LinkedIn isn't blocking us, which the guest page found out)
+                job_details = self._timed_path("linkedin_guest", self.extract_linkedin_guest_job_description, url)
+                if not job_details and not self._negative_cache.blocked(url):
+                    job_details = self._timed_path("linkedin_browser", 
+                                                   self.extract_linkedin_job_description, 
+                                                   url, 
+                                                   *self._get_linkedin_credentials())
             case _:
-                return self.extract_generic_job_description(url), False
+                # Sites with an adapter are extracted from their structured data, the rest by guessing (unless
+                # the adapter request just failed, as the page would be requested from the same site again)
+                job_details = self.extract_with_site_adapter(url)
+                if not job_details and not self._negative_cache.blocked(url):
+                    job_details = self._timed_path("generic", self.extract_generic_job_description, url, cached_job)
+        
+        if job_details:
+            self._negative_cache.record_success(url)
+            # The posting was stored under its canonical URL, so the URL requested becomes an alias
+            self._url_canonicalizer.canonicalize(requested_url, record_alias=True)
+        return job_details, job_details is cached_job
+    
+    def scheduler(self) -> "CrawlScheduler":
+        """
+        Retrieve the crawl scheduler running the extractions of this extractor, creating it on first use
+        
+        Tool calls and batch extractions (extract_many) are queued in it, so the interactive ones run
+        ahead of the batch ones within the same rate limits.
+        
+        Returns:
+            CrawlScheduler: The scheduler of the extractor
+        """
+        # Imported here, as the scheduler module imports this one
+        from auto_cv.tools.crawl_scheduler import CrawlScheduler
+        
+        with self._scheduler_lock:
+            if self._scheduler is None:
+                self._scheduler = CrawlScheduler(self, 
+                                                 max_workers=self.max_workers, 
+                                                 rate_limiter=self._rate_limiter, 
+                                                 max_per_domain=self.max_per_domain)
+            return self._scheduler
+    
+    def extract_many(self, 
+                     urls: Iterable[str], 
+                     refresh: bool = False,
+                     priority: int | None = None) -> Iterator[Tuple[str, Dict[str, str], bool]]:
+        """
+        Extract several job postings concurrently, streaming the results as they're ready
+        
+        URLs of the same posting are extracted once and cache hits are returned straight away (unless refreshing,
+        in which case every posting is revalidated or extracted again). The misses are queued in the
+        scheduler of the extractor, so they run behind the interactive extractions, within the rate
+        limits of each site and with at most max_per_domain of them hitting the same site at the same time.
+        
+        Args:
+            urls (Iterable[str]): URLs to extract job details from
+            refresh (bool, optional): Extract the cached postings again (see extract_raw_info_from)
+            priority (int, optional): Priority of the extractions in the scheduler. Defaults to BATCH_PRIORITY
+        
+        Yields:
+            tuple: Canonical URL, extracted job details (empty if the extraction failed) and whether it was a cache hit
+        """
+        from auto_cv.tools.crawl_scheduler import BATCH_PRIORITY
+        
+        # First URL requested for each posting, so it's recorded as an alias if the posting is extracted
+        requested_urls: dict[str, str] = {}
+        for requested_url in urls:
+            requested_urls.setdefault(self._url_canonicalizer.canonicalize(requested_url), requested_url)
+        
+        scheduler = self.scheduler()
+        futures: dict[Future, str] = {}
+        for url, requested_url in requested_urls.items():
+            cached_job = None if refresh else self._job_description_cache.get(url)
+            if cached_job:
+                yield url, cached_job, True
+            else:
+                futures[scheduler.submit(requested_url, BATCH_PRIORITY if priority is None else priority, refresh)] = url
+        if not futures:
+            return
+        logger.info(f"Queued the extraction of {len(futures)} job postings")
+        
+        try:
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    yield url, *future.result()
+                except Exception as e:
+                    logger.error(f"Extraction of {url} failed: {e}")
+                    yield url, {}, False
+        finally:
+            # Don't run the pending extractions if the caller stops consuming the results
+            for future in futures:
+                future.cancel()
 
 # Example usage
 if __name__ == "__main__":
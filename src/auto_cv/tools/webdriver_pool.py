@@ -0,0 +1,292 @@
+import atexit
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+import threading
+import time
+from typing import Any, Callable, Iterator
+
+from llm_foundation import logger
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+
+@dataclass
+class PooledDriver:
+    """
+    WebDriver managed by a WebDriverPool, with its usage bookkeeping
+    
+    The state dict is kept for the lifetime of the driver, so borrowers can remember things
+    like the sites the browser is already logged into.
+    """
+    
+    driver: WebDriver
+    created_at: float = field(default_factory=time.monotonic)
+    last_used_at: float = field(default_factory=time.monotonic)
+    pages: int = 0
+    state: dict[str, Any] = field(default_factory=dict)
+
+
+class WebDriverPool:
+    """
+    Bounded, thread-safe pool of warm WebDriver instances
+    
+    Drivers are borrowed and returned instead of being started and quit for each page. Idle
+    drivers are health checked before being handed out, and are retired when they've been idle
+    for too long, after serving a number of pages (to contain browser memory growth) or when
+    the borrower reports them as broken.
+    """
+    
+    def __init__(self,
+                 factory: Callable[[], WebDriver],
+                 max_size: int = 2,
+                 max_pages: int | None = 50,
+                 idle_timeout: float | None = 300.0,
+                 acquire_timeout: float = 120.0):
+        """
+        Initialize an empty pool (drivers are started on demand)
+        
+        Args:
+            factory (Callable[[], WebDriver]): Starts a new driver
+            max_size (int, optional): Maximum number of drivers alive at the same time
+            max_pages (int, optional): Pages served after which a driver is recycled. None disables recycling
+            idle_timeout (float, optional): Seconds after which an idle driver is quit. None keeps them forever
+            acquire_timeout (float, optional): Default seconds to wait for a free driver
+        """
+        self.factory = factory
+        self.max_size = max_size
+        self.max_pages = max_pages
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        
+        self._condition = threading.Condition()
+        self._idle: list[PooledDriver] = []
+        self._size = 0
+        self._closed = False
+        
+        # Counters
+        self._created = 0
+        self._reused = 0
+        self._retired = 0
+        
+        atexit.register(self.close)
+    
+    @staticmethod
+    def _is_healthy(pooled: PooledDriver) -> bool:
+        """
+        Cheap check that the browser behind a driver still responds
+        
+        Args:
+            pooled (PooledDriver): Driver to check
+        
+        Returns:
+            bool: True if the browser responded
+        """
+        try:
+            pooled.driver.execute_script("return 1")
+            return True
+        except WebDriverException as e:
+            logger.warning(f"Pooled WebDriver failed its health check: {e}")
+            return False
+    
+    def _retire(self, pooled: PooledDriver, reason: str) -> PooledDriver:
+        """
+        Free the slot of a driver (must be called holding the condition lock)
+        
+        The driver has to be quit afterwards with _quit(), without holding the lock, as a hung
+        browser can take long to quit.
+        
+        Args:
+            pooled (PooledDriver): Driver to retire
+            reason (str): Why it's retired, for the logs
+        
+        Returns:
+            PooledDriver: The retired driver
+        """
+        self._size -= 1
+        self._retired += 1
+        self._condition.notify()
+        logger.info(f"Retiring WebDriver after {pooled.pages} pages ({reason})")
+        return pooled
+    
+    @staticmethod
+    def _quit(retired: list[PooledDriver]):
+        """
+        Quit retired drivers (must be called without holding the condition lock)
+        
+        Args:
+            retired (list[PooledDriver]): Drivers to quit
+        """
+        for pooled in retired:
+            try:
+                pooled.driver.quit()
+            except Exception as e:
+                logger.warning(f"Error quitting WebDriver: {e}")
+    
+    def _reap_idle(self) -> list[PooledDriver]:
+        """
+        Retire the drivers idle for longer than the idle timeout (must be called holding the condition lock)
+        
+        Returns:
+            list[PooledDriver]: Retired drivers, to be quit with _quit()
+        """
+        if self.idle_timeout is None:
+            return []
+        now = time.monotonic()
+        expired = [pooled for pooled in self._idle if now - pooled.last_used_at > self.idle_timeout]
+        for pooled in expired:
+            self._idle.remove(pooled)
+            self._retire(pooled, "idle timeout")
+        return expired
+    
+    def acquire(self, timeout: float | None = None) -> PooledDriver:
+        """
+        Borrow a driver, starting a new one if none is idle and the pool isn't full
+        
+        Args:
+            timeout (float, optional): Seconds to wait for a free driver. Defaults to the pool acquire timeout
+        
+        Returns:
+            PooledDriver: Borrowed driver, to be given back with release()
+        
+        Raises:
+            TimeoutError: If no driver becomes available in time
+        """
+        deadline = time.monotonic() + (self.acquire_timeout if timeout is None else timeout)
+        while True:
+            candidate, retired = None, []
+            try:
+                with self._condition:
+                    while True:
+                        if self._closed:
+                            raise RuntimeError("The WebDriver pool is closed")
+                        retired += self._reap_idle()
+                        if self._idle:
+                            # Most recently used first, so the least used ones can time out. It keeps
+                            # its slot while it's checked
+                            candidate = self._idle.pop()
+                            break
+                        if self._size < self.max_size:
+                            self._size += 1
+                            break
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0 or not self._condition.wait(remaining):
+                            raise TimeoutError(f"No WebDriver available after waiting for the {self.max_size} in use")
+            finally:
+                self._quit(retired)
+            
+            if candidate is None:
+                break
+            # Checked without holding the lock, as a hung browser would block every borrower
+            if self._is_healthy(candidate):
+                with self._condition:
+                    self._reused += 1
+                return candidate
+            with self._condition:
+                self._retire(candidate, "failed health check")
+            self._quit([candidate])
+        
+        # Start the browser without holding the lock
+        try:
+            pooled = PooledDriver(self.factory())
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._created += 1
+        return pooled
+    
+    def release(self, pooled: PooledDriver, healthy: bool = True):
+        """
+        Give back a borrowed driver
+        
+        Args:
+            pooled (PooledDriver): Driver obtained with acquire()
+            healthy (bool, optional): False if the driver misbehaved and must be quit
+        """
+        pooled.pages += 1
+        pooled.last_used_at = time.monotonic()
+        with self._condition:
+            retired = self._reap_idle()
+            if self._closed or not healthy:
+                retired.append(self._retire(pooled, "closed pool" if self._closed else "reported as broken"))
+            elif self.max_pages is not None and pooled.pages >= self.max_pages:
+                retired.append(self._retire(pooled, "page limit"))
+            else:
+                self._idle.append(pooled)
+                self._condition.notify()
+        self._quit(retired)
+    
+    @contextmanager
+    def borrow(self, timeout: float | None = None) -> Iterator[PooledDriver]:
+        """
+        Borrow a driver for the duration of a block of code
+        
+        The driver is retired instead of returned if a WebDriverException escapes the block.
+        
+        Args:
+            timeout (float, optional): Seconds to wait for a free driver
+        
+        Yields:
+            PooledDriver: Borrowed driver
+        """
+        pooled = self.acquire(timeout)
+        healthy = True
+        try:
+            yield pooled
+        except WebDriverException:
+            healthy = False
+            raise
+        finally:
+            self.release(pooled, healthy)
+    
+    def close(self):
+        """
+        Quit all the idle drivers. Borrowed ones are quit when they're released
+        """
+        with self._condition:
+            self._closed = True
+            retired = [self._retire(pooled, "closed pool") for pooled in self._idle]
+            self._idle.clear()
+            self._condition.notify_all()
+        self._quit(retired)
+    
+    def stats(self) -> dict[str, Any]:
+        """
+        Retrieve the usage counters of the pool
+        
+        Returns:
+            dict: Drivers alive, idle and in use, and the number of drivers created, reused and retired
+        """
+        with self._condition:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "created": self._created,
+                "reused": self._reused,
+                "retired": self._retired,
+            }
+
+
+_shared_pools: dict[str, WebDriverPool] = {}
+_shared_pools_lock = threading.Lock()
+
+
+def shared_pool(name: str, factory: Callable[[], WebDriver], **pool_options: Any) -> WebDriverPool:
+    """
+    Retrieve the pool shared by the whole process under a name, creating it on first use
+    
+    Args:
+        name (str): Name of the pool
+        factory (Callable[[], WebDriver]): Starts a new driver (only used when the pool is created)
+        **pool_options: Options of the pool (only used when the pool is created)
+    
+    Returns:
+        WebDriverPool: The shared pool
+    """
+    with _shared_pools_lock:
+        if name not in _shared_pools:
+            _shared_pools[name] = WebDriverPool(factory, **pool_options)
+        return _shared_pools[name]
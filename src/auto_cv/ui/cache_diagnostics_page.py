@@ -0,0 +1,49 @@
+from typing import Any
+
+from shiny import reactive
+from shiny.express import ui, module, render
+
+from auto_cv.ui.job_extractor_page import extracted_job_description_cache
+
+
+# Seconds between refreshes of the diagnostics
+STATS_REFRESH_INTERVAL = 5
+
+
+def format_cache_stats(stats: dict[str, Any]) -> str:
+    """
+    Format the stats of a cache for display
+    
+    Args:
+        stats (dict): Stats returned by the cache
+    
+    Returns:
+        str: Formatted markdown text
+    """
+    latencies = stats.get("latencies", {})
+    counters = {name: value for name, value in stats.items() if name != "latencies"}
+    
+    formatted_text = "#### Counters\n| Counter | Value |\n|---|---|\n"
+    for name, value in counters.items():
+        formatted_value = f"{value:.2%}" if name == "hit_rate" else f"{value:.3f}" if isinstance(value, float) else f"{value:,}"
+        formatted_text += f"| {name} | {formatted_value} |\n"
+    
+    formatted_text += "\n#### Latencies (ms)\n| Operation | Count | Mean | p50 | p90 | p99 | Max |\n|---|---|---|---|---|---|---|\n"
+    for operation, summary in latencies.items():
+        formatted_text += (f"| {operation} | {summary['count']:,} | {summary['mean_ms']:.3f} | {summary['p50_ms']:.3f} | "
+                           f"{summary['p90_ms']:.3f} | {summary['p99_ms']:.3f} | {summary['max_ms']:.3f} |\n")
+    return formatted_text
+
+@module
+def cache_diagnostics_page(input, output, session):
+    
+    ui.h1("Cache Diagnostics")
+    
+    with ui.card():
+        ui.card_header("Extracted Job Descriptions Cache")
+        ui.help_text(f"{extracted_job_description_cache.cache_file} (refreshed every {STATS_REFRESH_INTERVAL}s)")
+        
+        @render.ui
+        def extracted_cache_stats():
+            reactive.invalidate_later(STATS_REFRESH_INTERVAL)
+            return ui.markdown(format_cache_stats(extracted_job_description_cache.stats()))
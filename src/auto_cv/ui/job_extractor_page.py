@@ -7,7 +7,7 @@ from pyvis.network import Network
 from shiny.express import ui, module, render
 from shiny import reactive
 
-from auto_cv.cache import BasicInMemoryCache
+from auto_cv.cache import EXTRACTED_JOB_DESCRIPTION_CACHE, URL_ALIAS_CACHE, CanonicalKeyCache, UrlCanonicalizer, create_cache
 
 from llm_foundation import logger
 
@@ -21,11 +21,20 @@ from shiny.express import ui
 from shiny.ui import page_fillable
 
 
-extracted_job_description_cache = BasicInMemoryCache(
-    app_name="auto-cv", 
-    cache_subdir="extracted_job_descriptions_cache", 
-    cache_file="extracted_job_descriptions.jsonl", 
-    cache_key_name="url"
+# Keyed by canonical URL, so any URL of a posting finds it
+extracted_job_description_cache = CanonicalKeyCache(
+    create_cache(
+        "auto-cv", 
+        *EXTRACTED_JOB_DESCRIPTION_CACHE, 
+        cache_key_name="url",
+        lazy=True,
+        indexed_fields=("company", "title", "location", "extracted_at"),
+        search_fields=("title", "company", "raw_description", "markdown_description"),
+        snapshot_every=1000,
+        compressed_fields=("raw_description", "markdown_description"),
+        follow=True
+    ),
+    UrlCanonicalizer(create_cache("auto-cv", *URL_ALIAS_CACHE, cache_key_name="alias"))
 )
 
 def get_job_details(url_idx: str, url: str):
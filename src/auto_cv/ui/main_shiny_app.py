@@ -8,6 +8,7 @@ from watchfiles import Change
 from auto_cv.utils import DirWatcher
 from auto_cv.ui.shared import WWW
 
+from .cache_diagnostics_page import cache_diagnostics_page
 from .cv_adaptor_page import  cv_adaptor_page
 from .job_extractor_page import  job_extractor_page
 from .pipeline_page import pipeline_page
@@ -82,3 +83,6 @@ with ui.nav_panel("CV Project Creation Pipeline"):
 
 with ui.nav_panel("CV Tailoring Process"):
     cv_adaptor_page("cv_adaptor_page")
+
+with ui.nav_panel("Cache Diagnostics"):
+    cache_diagnostics_page("cache_diagnostics_page")